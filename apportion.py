@@ -0,0 +1,42 @@
+import numpy as np
+
+# ------------------------------------------------------------
+# LARGEST-REMAINDER APPORTIONMENT
+# ------------------------------------------------------------
+
+def largest_remainder(quotas, groups, totals) -> np.ndarray:
+    """
+    Apportion integer totals over the rows of every group at once.
+
+    quotas: (n,) or (n, k) non-negative float shares, one column per quantity
+    groups: (n,) group code per row, in 0..g-1
+    totals: (g,) or (g, k) integer total per group and quantity
+
+    Each row gets int(quota); the group's remainder (total minus those) is then dealt one
+    unit at a time in order of decreasing fractional part, ties keeping row order, cycling
+    through the group again if it exceeds the group size. A negative remainder deals nothing.
+    Returns int64 values shaped like quotas.
+    """
+    quotas = np.asarray(quotas, dtype=np.float64)
+    single = quotas.ndim == 1
+    quotas = quotas[:, None] if single else quotas
+    totals = np.asarray(totals, dtype=np.int64).reshape(-1, quotas.shape[1])
+    groups = np.asarray(groups, dtype=np.int64)
+
+    sizes = np.bincount(groups, minlength=len(totals))
+    starts = np.cumsum(sizes) - sizes
+    row_sizes = sizes[groups]
+
+    result = quotas.astype(np.int64)
+    for j in range(quotas.shape[1]):
+        dealt = np.zeros(len(totals), dtype=np.int64)
+        np.add.at(dealt, groups, result[:, j])
+        remainder = np.maximum(totals[:, j] - dealt, 0)[groups]
+
+        # Rank of every row within its group by decreasing fractional part (stable)
+        order = np.lexsort((-(quotas[:, j] - result[:, j]), groups))
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = np.arange(len(order)) - starts[groups[order]]
+
+        result[:, j] += remainder // row_sizes + (ranks < remainder % row_sizes)
+    return result[:, 0] if single else result
@@ -21,7 +21,7 @@ def greedy_tsp(buildings):
         return []
 
     # Extract centroids
-    centroids = [(b, t, b.geometry.centroid) for b, t in buildings]
+    centroids = [(b, t, b.centroid) for b, t in buildings]
 
     # Start at north-west corner: max Y, min X
     start = max(centroids, key=lambda x: (x[2].y, -x[2].x))
@@ -54,6 +54,7 @@ def greedy_tsp(buildings):
 def assign_aliases(dataset: Dataset, ALPHA=0.5):
     """Assign aliases using greedy TSP through island, ignoring tract boundaries."""
     letter_codes = generate_letter_codes()
+    dataset.materialize_centroids()
 
     for s in dataset.venice.sestieri:
         for i in s.islands:
@@ -81,6 +82,9 @@ def assign_aliases(dataset: Dataset, ALPHA=0.5):
 
             print(f"🌴 {i.code} island: total buildings = {len(ordered_buildings)}")
 
+    # Aliases changed: refresh the alias lookups
+    dataset.reindex()
+
 # === Convert Buildings to GeoDataFrame ===
 def buildings_to_gdf(dataset):
     rows = []
@@ -130,7 +134,7 @@ def main():
     print(f"📊 Original buildings: {len(original_gdf)}")
 
     print("🧠 Building dataset hierarchy...")
-    dataset = Dataset(FILTERED_GEOJSON)
+    dataset = Dataset(FILTERED_GEOJSON, cache=True)
 
     print("🏷️ Generating aliases directly in objects using greedy TSP...")
     assign_aliases(dataset, ALPHA=0.7)  # tune ALPHA here
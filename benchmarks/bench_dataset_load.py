@@ -0,0 +1,87 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import time
+import pandas as pd
+from dataset import Dataset
+from datatypes import Meter
+from constants import ALIAS_GEOJSON, FILTERED_ADDRESS_CSV, FILTERED_WATER_CSV
+
+REPEATS = 3
+
+def load_frames():
+    addr_df = pd.read_csv(FILTERED_ADDRESS_CSV)
+    water_df = pd.read_csv(FILTERED_WATER_CSV)
+    addr_df["Full_sesti"] = addr_df["Full_sesti"].astype(str).str.strip().str.upper()
+    water_df["ProcessedAddress"] = water_df["ProcessedAddress"].astype(str).str.strip().str.upper()
+    meters_map = water_df.groupby("ProcessedAddress")["FID"].apply(list).to_dict()
+    return addr_df, water_df, meters_map
+
+def attach_meters_scan(addr_df, water_df, meters_map):
+    """Previous approach: filter the whole water table once per meter FID."""
+    total = 0
+    for _, row in addr_df.iterrows():
+        addr_code = row["Full_sesti"].strip().upper()
+        meters_list = []
+        for fid in meters_map.get(addr_code, []):
+            meter_row = water_df[water_df["FID"] == fid]
+            if not meter_row.empty:
+                comp = meter_row["Componenti"].iloc[0]
+                consumo = meter_row["Consumo_medio_2024"].iloc[0]
+                rate = meter_row["Cat_Tariffa"].iloc[0]
+                meters_list.append(
+                    Meter(
+                        id=int(fid),
+                        componenti=int(comp) if pd.notna(comp) else 1,
+                        consumo_2024=float(consumo) if pd.notna(consumo) else 0,
+                        rate=rate if pd.notna(rate) else None
+                    )
+                )
+            else:
+                meters_list.append(Meter(id=int(fid), componenti=1, consumo_2024=0))
+        total += len(meters_list)
+    return total
+
+def attach_meters_indexed(addr_df, water_df, meters_map):
+    """Current approach: one FID lookup built in a single pass."""
+    ds = Dataset.__new__(Dataset)
+    meter_lookup = ds._build_meter_lookup(water_df)
+    total = 0
+    for addr_code in addr_df["Full_sesti"]:
+        total += len(ds._build_meters(meters_map.get(addr_code.strip().upper(), []), meter_lookup))
+    return total
+
+def best_of(fn, *args, repeats=REPEATS):
+    best = None
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    print("📂 Loading address and water CSVs...")
+    frames = load_frames()
+    print(f"📊 {len(frames[0])} addresses, {len(frames[1])} meters")
+
+    scan_time, scan_count = best_of(attach_meters_scan, *frames, repeats=1)
+    indexed_time, indexed_count = best_of(attach_meters_indexed, *frames)
+    if scan_count != indexed_count:
+        raise RuntimeError(f"❌ Meter counts differ: scan={scan_count}, indexed={indexed_count}")
+
+    print(f"⏱️ Meter attachment (per-FID scan): {scan_time:8.2f} s")
+    print(f"⏱️ Meter attachment (FID index):    {indexed_time:8.2f} s")
+    print(f"🚀 Speed-up: {scan_time / indexed_time:.0f}x for {indexed_count} meters")
+
+    if Path(ALIAS_GEOJSON).exists():
+        start = time.perf_counter()
+        Dataset(str(ALIAS_GEOJSON))
+        print(f"⏱️ Full Dataset load: {time.perf_counter() - start:.2f} s")
+    else:
+        print(f"⚠️ {Path(ALIAS_GEOJSON).name} not found, skipping full Dataset load")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import math
+import subprocess
+import constants
+from constants import ROOT_DIR, ALIAS_GEOJSON
+from generators.synthetic_city_generator import SYNTHETIC_DIR, generate_city, relocate
+
+SCALES = [1, 10, 100]                   # 100x (~1.5M buildings) needs roughly 16 GB of RAM
+REPEATS = 1
+# Stages faster than this at the smaller scale are too noisy to fit a growth exponent
+MIN_TIME = 0.05
+# Growth exponent above which a stage is flagged: time ~ n^exponent between consecutive scales
+SUPERLINEAR = 1.3
+
+# ------------------------------------------------------------
+# WORKER (one process per scale and repeat, pointed at a synthetic root)
+# ------------------------------------------------------------
+
+def use_root(root):
+    """Point every project path in constants at root; must run before the pipeline modules are imported."""
+    for name, value in vars(constants).copy().items():
+        if isinstance(value, Path) and value.is_relative_to(ROOT_DIR):
+            setattr(constants, name, relocate(value, root))
+        elif isinstance(value, list) and value and all(isinstance(p, Path) for p in value):
+            setattr(constants, name, [relocate(p, root) if p.is_relative_to(ROOT_DIR) else p for p in value])
+
+def run_worker(root: Path, report_path: Path, jobs: int):
+    use_root(root)
+    from dataset import Dataset
+    from estimation_v4 import estimation_v4
+    from instrumentation import RunReport
+
+    report = RunReport(f"bench_scaling {root.name}")
+    with report.stage("Dataset") as record:
+        ds = Dataset(str(relocate(ALIAS_GEOJSON, root)))
+        record["items"] = len(ds.buildings)
+    estimation_v4(ds, None, audit_formats=("csv",), jobs=jobs, report=report)
+    with report.stage("export_hierarchy_text", len(ds.buildings)):
+        ds.export_hierarchy_text(constants.ESTIMATES_HIERARCHY_TXT)
+    report.save(report_path)
+
+# ------------------------------------------------------------
+# DRIVER
+# ------------------------------------------------------------
+
+def run_scale(scale: int, jobs: int, repeats: int, seed: int) -> dict:
+    """Best-of-repeats stage times (and the last report) for one scale, generating its city if needed."""
+    root = SYNTHETIC_DIR / f"x{scale}"
+    if not relocate(ALIAS_GEOJSON, root).exists():
+        print(f"🏙️ Generating synthetic city x{scale}...")
+        generate_city(root, scale, seed)
+
+    best = None
+    for i in range(repeats):
+        report_path = root / "estimates" / f"run_report-jobs{jobs}.json"
+        log_path = root / "estimates" / f"run-jobs{jobs}.log"
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        print(f"⏱️ x{scale} run {i + 1}/{repeats} (log: {log_path})")
+        with open(log_path, "w", encoding="utf-8") as log:
+            subprocess.run(
+                [sys.executable, __file__, "--worker", str(root), "--report", str(report_path), "--jobs", str(jobs)],
+                stdout=log, stderr=subprocess.STDOUT, check=True,
+            )
+        with open(report_path, encoding="utf-8") as f:
+            report = json.load(f)
+        if best is None:
+            best = report
+        else:
+            previous = {r["name"]: r for r in best["stages"]}
+            for record in report["stages"]:
+                if record["name"] in previous:
+                    record["wall_s"] = min(record["wall_s"], previous[record["name"]]["wall_s"])
+            report["wall_s"] = min(report["wall_s"], best["wall_s"])
+            best = report
+    return best
+
+def growth(t_small, t_large, n_small, n_large):
+    """Exponent k of time ~ n^k between two scales (None when either time is too small to tell)."""
+    if not t_small or not t_large or t_small < MIN_TIME or n_small == n_large:
+        return None
+    return math.log(t_large / t_small) / math.log(n_large / n_small)
+
+def print_table(reports: dict):
+    scales = sorted(reports)
+    names = []
+    for scale in scales:
+        names += [r["name"] for r in reports[scale]["stages"] if r["name"] not in names]
+    stages = {scale: {r["name"]: r for r in reports[scale]["stages"]} for scale in scales}
+    items = {scale: reports[scale]["meta"].get("buildings") or 0 for scale in scales}
+
+    header = f"{'stage':<36}" + "".join(f"{f'x{s} (s)':>12}" for s in scales) + f"{'growth':>10}"
+    print("\n" + header)
+    print("-" * len(header))
+    for name in names:
+        times = [stages[s].get(name, {}).get("wall_s") for s in scales]
+        depth = 0
+        parent = stages[scales[-1]].get(name, {}).get("parent")
+        while parent:
+            depth += 1
+            parent = stages[scales[-1]].get(parent, {}).get("parent")
+        exponents = [
+            growth(times[i], times[i + 1], items[scales[i]], items[scales[i + 1]])
+            for i in range(len(scales) - 1)
+        ]
+        exponents = [k for k in exponents if k is not None]
+        k = exponents[-1] if exponents else None
+        flag = " ⚠️" if k is not None and k > SUPERLINEAR else ""
+        cells = "".join(f"{t:>12.2f}" if t is not None else f"{'-':>12}" for t in times)
+        label = ("  " * depth + name)[:36]
+        k_cell = f"{k:>10.2f}" if k is not None else f"{'-':>10}"
+        print(f"{label:<36}{cells}{k_cell}{flag}")
+    totals = "".join(f"{reports[s]['wall_s']:>12.2f}" for s in scales)
+    print(f"{'total':<36}{totals}")
+    print(f"{'peak RSS (MB)':<36}" + "".join(f"{reports[s]['peak_rss_mb'] or 0:>12.0f}" for s in scales))
+    print(f"\n📈 growth: exponent k of time ~ buildings^k between the two largest scales; ⚠️ above {SUPERLINEAR}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each Dataset / estimation_v4 stage on synthetic cities.")
+    parser.add_argument("scales", nargs="*", type=int, default=SCALES, help="multiples of Venice's building count")
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--worker", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--report", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        run_worker(args.worker, args.report, args.jobs)
+        return
+
+    reports = {}
+    for scale in args.scales:
+        reports[scale] = run_scale(scale, args.jobs, args.repeats, args.seed)
+        print(f"✅ x{scale}: {reports[scale]['meta'].get('buildings')} buildings in {reports[scale]['wall_s']:.2f} s")
+
+    print_table(reports)
+    summary_path = SYNTHETIC_DIR / f"bench_scaling-jobs{args.jobs}.json"
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump({f"x{scale}": report for scale, report in reports.items()}, f, indent=2)
+    print(f"💾 Saved scaling results to {summary_path}")
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,18 @@ CHECKLISTS_DIR = ROOT_DIR / "checklists"
 FIELDWORK_DIR = ROOT_DIR / "fieldwork"
 SUMMARY_DIR = ROOT_DIR / "summaries"
 ESTIMATES_DIR = ROOT_DIR / "estimates"
+CACHE_DIR = ROOT_DIR / "cache"
+FINAL_DIR = ROOT_DIR / "final"
 
 ESTIMATES_CSV = ESTIMATES_DIR / "VPC_Estimates_V4-new.csv"
+ESTIMATES_PARQUET = ESTIMATES_DIR / "VPC_Estimates_V4-new.parquet"
+ESTIMATES_FEATHER = ESTIMATES_DIR / "VPC_Estimates_V4-new.feather"
+ESTIMATES_GEOPARQUET = ESTIMATES_DIR / "VPC_Estimates_V4-new_layer.parquet"
+ESTIMATES_STATE = ESTIMATES_DIR / "VPC_Estimates_V4-state.npz"
+ESTIMATES_GEOJSON = ESTIMATES_DIR / "VPC_Estimates_V4-new.geojson"
+ESTIMATES_HIERARCHY_TXT = ESTIMATES_DIR / "Venice_hierarchy-new.txt"
+ESTIMATES_RUN_REPORT = ESTIMATES_DIR / "VPC_Estimates_V4-run_report.json"
+PIPELINE_STATE = CACHE_DIR / "pipeline_state.json"
 
 #Input
 RAW_GEOJSON = DATA_DIR / "VPC_Buildings_Total_1.geojson"
@@ -45,6 +55,20 @@ UNINHABITED_CSV = DATA_DIR / "VPC_Buildings_Uninhabited_V1.csv"
 UNIT_INFO_CSV = DATA_DIR / "VPC_Unit_Info.csv"
 LIN_REG_CSV = DATA_DIR / "LinReg_Models.csv"
 
+#Output
+FINAL_CSV = FINAL_DIR / "V25B_Estimates_Final.csv"
+FINAL_GEOJSON = FINAL_DIR / "V25B_Estimates_Final.geojson"
+
+# Files read by Dataset besides the GeoJSON (snapshot cache key)
+DATASET_INPUTS = [
+    FILTERED_CSV,
+    FILTERED_ADDRESS_CSV,
+    FILTERED_WATER_CSV,
+    FILTERED_HOTEL_CSV,
+    FILTERED_HOTELS_EXTRA_CSV,
+    FILTERED_STR_CSV,
+]
+
 BUILDING_FIELD = "TARGET_FID_12_13"         # unique buidling identifier
 TRACT_FIELD = "SEZ21"                       # unique tract identifier
 ISLAND_FIELD = "Codice"                     # unique island identifier
@@ -0,0 +1,124 @@
+import threading
+import pandas as pd
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from constants import (
+    FILTERED_CSV,
+    FILTERED_ADDRESS_CSV,
+    FILTERED_WATER_CSV,
+    FILTERED_HOTEL_CSV,
+    FILTERED_HOTELS_EXTRA_CSV,
+    FILTERED_STR_CSV,
+    UNIT_INFO_CSV,
+    FILTERED_SURVEY_CSV,
+    TOTAL_FIELDWORK_CSV,
+    UNINHABITED_CSV,
+    LIN_REG_CSV,
+)
+
+MAX_WORKERS = 4
+
+# ------------------------------------------------------------
+# SCHEMAS
+# ------------------------------------------------------------
+
+# Explicit dtypes per project CSV (keyed by file name); columns not listed are inferred.
+# "category" columns are converted after parsing so numeric codes such as SEZ21 keep
+# integer categories instead of read_csv's string ones.
+CSV_SCHEMAS = {
+    FILTERED_CSV.name: {
+        "TARGET_FID_12_13": "int64",
+        "Qu_Terra": "float64",
+        "Qu_Gronda": "float64",
+        "Superficie": "float64",
+        "SEZ21": "category",
+        "TP_CLS_ED": "category",
+    },
+    FILTERED_ADDRESS_CSV.name: {
+        "TARGET_FID_12_13": "float64",
+        "Full_sesti": "str",
+        "Codice_1": "str",
+    },
+    FILTERED_WATER_CSV.name: {
+        "FID": "int64",
+        "Cat_Tariffa": "category",
+        "Condominio": "category",
+        "Componenti": "float64",
+        "Nuclei_domestici": "float64",
+        "Nuclei_commerciali": "float64",
+        "Nuclei_non_residenti": "float64",
+        "Consumo_medio_2024": "float64",
+        "ProcessedAddress": "str",
+    },
+    FILTERED_HOTEL_CSV.name: {"FID": "int64", "ADDRESS": "str"},
+    FILTERED_HOTELS_EXTRA_CSV.name: {"FID": "int64", "ADDRESS": "str"},
+    FILTERED_STR_CSV.name: {"FID": "int64", "ADDRESS": "str"},
+    UNIT_INFO_CSV.name: {
+        "short_alias": "str",
+        "building_id": "int64",
+        "num_strs": "int64",
+        "num_zero_consumption_meters": "int64",
+    },
+    FILTERED_SURVEY_CSV.name: {"short_alias": "str"},
+    TOTAL_FIELDWORK_CSV.name: {"short_alias": "str", "TP_CLS_ED": "category", "Measured Height": "float64"},
+    UNINHABITED_CSV.name: {"full_alias": "str"},
+    LIN_REG_CSV.name: {"TP_CLS_ED": "str"},
+}
+
+# ------------------------------------------------------------
+# LOADER
+# ------------------------------------------------------------
+
+_cache = {}
+_lock = threading.Lock()
+_executor = None
+
+def _read(path: Path) -> pd.DataFrame:
+    schema = CSV_SCHEMAS.get(path.name, {})
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes = {col: dtype for col, dtype in schema.items() if col in header and dtype != "category"}
+    categories = [col for col, dtype in schema.items() if col in header and dtype == "category"]
+
+    df = pd.read_csv(path, dtype=dtypes)
+    for col in categories:
+        df[col] = df[col].astype("category")
+    return df
+
+def _submit(path) -> Future:
+    global _executor
+    key = str(Path(path).resolve())
+    stat = Path(path).stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _cache.get(key)
+        if cached is None or cached[0] != stamp:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="csv")
+            cached = _cache[key] = (stamp, _executor.submit(_read, Path(path)))
+    return cached[1]
+
+def read_csv(path) -> pd.DataFrame:
+    """
+    Load a project CSV with its explicit schema, memoized per path until the file's
+    modification time or size changes (a regenerated file is read again).
+    The returned frame is shared: callers must not modify it in place.
+    """
+    future = _submit(path)
+    try:
+        return future.result()
+    except Exception:
+        with _lock:
+            key = str(Path(path).resolve())
+            if _cache.get(key, (None, None))[1] is future:
+                del _cache[key]
+        raise
+
+def read_csvs(*paths) -> tuple:
+    """Load several project CSVs concurrently on the loader's thread pool (see read_csv)."""
+    futures = [_submit(path) for path in paths]
+    return tuple(read_csv(path) for path, _ in zip(paths, futures))
+
+def clear_csv_cache():
+    """Forget every memoized frame (e.g. after regenerating a CSV)."""
+    with _lock:
+        _cache.clear()
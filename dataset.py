@@ -1,11 +1,18 @@
+import json
+import math
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass, field
-from datatypes import Meter, Address, Building, Tract, Island, Sestiere, Venice
-from file_utils import load_geojson
+from datatypes import Meter, Address, Building, BuildingTable, Tract, Island, Sestiere, Venice, LAZY, materialize_geometry
+from csv_loader import read_csvs
+from file_utils import load_geojson, iter_geojson_features
 from pathlib import Path
 from shapely.geometry import shape
-from typing import List, Optional
+from snapshot import hash_files, load_snapshot, save_snapshot
+from typing import Iterable, List, Optional
 from constants import (
+    CACHE_DIR,
+    DATASET_INPUTS,
     BUILDING_FIELD, 
     TRACT_FIELD, 
     ISLAND_FIELD, 
@@ -21,26 +28,112 @@ from constants import (
     TOTAL_FIELDWORK_CSV
 )
 
+# Modules that decide what the hierarchy holds: editing any of them invalidates existing
+# snapshots, and the pipeline reruns every stage that builds a Dataset
+DATASET_CODE = [Path(__file__).with_name(name) for name in (
+    "dataset.py", "datatypes.py", "snapshot.py", "csv_loader.py", "file_utils.py", "constants.py",
+)]
+
+# Building fields written by export_hierarchy_jsonl (geometry is left to the GeoJSON outputs)
+JSONL_BUILDING_FIELDS = [
+    name for name in Building.FIELDS
+    if name not in ("island", "centroid", "geometry", "addresses", "raw_geometry")
+]
+
+def _json_value(value):
+    """Plain JSON value: NumPy scalars unwrapped, NaN as null."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
 @dataclass
 class Dataset:
     features: List[dict] = field(default_factory=list)
     venice: Optional[Venice] = None
     source: Optional[str] = None
 
-    def __init__(self, geojson_path: str):
+    def __init__(self, geojson_path: str, cache: bool = False, lazy_geometry: bool = False, stream: bool = False,
+                 islands: Optional[Iterable[str]] = None, sestieri: Optional[Iterable[str]] = None):
         path = Path(geojson_path)
         if not path.exists():
             raise FileNotFoundError(f"GeoJSON file not found: {path}")
-
-        print(f"📂 Loading GeoJSON: {path.name}")
-        data = load_geojson(str(path))
-        self.features = data.get("features", [])
         self.source = str(path)
-        print(f"✅ Loaded {len(self.features)} features")
+        self.features = []
+        self.lazy_geometry = lazy_geometry
+
+        # Optional load scope: island codes match exactly, sestieri by name or 2-letter code
+        self.islands = {str(i).strip() for i in islands} if islands is not None else None
+        self.sestieri = {str(s).strip().upper() for s in sestieri} if sestieri is not None else None
+        if self.islands is not None or self.sestieri is not None:
+            print(f"🔎 Load scope: islands={sorted(self.islands or [])} sestieri={sorted(self.sestieri or [])}")
+
+        snapshot_path = self.snapshot_path(path, self.islands, self.sestieri) if cache else None
+        if snapshot_path is not None and snapshot_path.exists():
+            print(f"⚡ Loading hierarchy snapshot: {snapshot_path.name}")
+            self.venice = load_snapshot(snapshot_path, lazy_geometry)
+            self._index_hierarchy()
+            print(f"🏗️ Loaded hierarchy with {len(self.venice.sestieri)} sestieri")
+            return
+
+        if stream:
+            # Features are consumed one at a time and never kept on the Dataset
+            print(f"📂 Streaming GeoJSON: {path.name}")
+            self.venice = self._build_hierarchy(iter_geojson_features(str(path)))
+            print(f"✅ Streamed {self.feature_count} features")
+        else:
+            print(f"📂 Loading GeoJSON: {path.name}")
+            data = load_geojson(str(path))
+            self.features = data.get("features", [])
+            print(f"✅ Loaded {len(self.features)} features")
+            self.venice = self._build_hierarchy()
 
-        self.venice = self._build_hierarchy()
         print(f"🏗️ Built hierarchy with {len(self.venice.sestieri)} sestieri")
 
+        if snapshot_path is not None:
+            self.save_snapshot(snapshot_path)
+
+    # === Snapshot cache ===
+    @staticmethod
+    def snapshot_path(geojson_path, islands=None, sestieri=None) -> Path:
+        """
+        Snapshot location for a GeoJSON, keyed by a hash of it, every DATASET_INPUTS file,
+        the DATASET_CODE modules and the load scope.
+        """
+        geojson_path = Path(geojson_path)
+        scope = ""
+        if islands is not None or sestieri is not None:
+            scope = f"islands={sorted(islands or [])};sestieri={sorted(sestieri or [])}"
+        key = hash_files([geojson_path, *DATASET_INPUTS, *DATASET_CODE], extra=scope)
+        return CACHE_DIR / f"{geojson_path.stem}-{key}.npz"
+
+    def save_snapshot(self, path) -> Path:
+        """Persist the current hierarchy to a binary snapshot."""
+        path = save_snapshot(self.venice, path)
+        print(f"💾 Hierarchy snapshot saved to {path}")
+        return path
+
+    @classmethod
+    def from_snapshot(cls, path, source: Optional[str] = None, lazy_geometry: bool = False) -> "Dataset":
+        """Build a Dataset directly from a snapshot written by save_snapshot()."""
+        ds = cls.__new__(cls)
+        ds.features = []
+        ds.source = source or str(path)
+        ds.lazy_geometry = lazy_geometry
+        ds.islands = ds.sestieri = None
+        ds.venice = load_snapshot(path, lazy_geometry)
+        ds._index_hierarchy()
+        return ds
+
+    # === Geometry ===
+    def materialize_centroids(self, buildings=None):
+        """
+        Build geometries and centroids for all (or the given) lazy buildings in one batch.
+        Spatial stages call this up front so per-building access is just an attribute read.
+        """
+        materialize_geometry(self._buildings if buildings is None else buildings)
+
     # === Helpers ===
     def _normalize_str(self, raw):
         if raw is None:
@@ -50,26 +143,60 @@ class Dataset:
             s = s[1:-1].strip()
         return s
 
-    def _build_hierarchy(self) -> Venice:
-        addr_df = pd.read_csv(FILTERED_ADDRESS_CSV)
-        water_df = pd.read_csv(FILTERED_WATER_CSV)
-        hotels_df = pd.read_csv(FILTERED_HOTEL_CSV)
-        hotels_extra_df = pd.read_csv(FILTERED_HOTELS_EXTRA_CSV)
-        str_df = pd.read_csv(FILTERED_STR_CSV)
-        building_csv = pd.read_csv(FILTERED_CSV)
-
-        # Standardize addresses
-        addr_df["Full_sesti"] = addr_df["Full_sesti"].astype(str).str.strip().str.upper()
-        water_df["ProcessedAddress"] = water_df["ProcessedAddress"].astype(str).str.strip().str.upper()
-        hotels_df["ADDRESS"] = hotels_df["ADDRESS"].astype(str).str.strip().str.upper()
-        hotels_extra_df["ADDRESS"] = hotels_extra_df["ADDRESS"].astype(str).str.strip().str.upper()
-        str_df["ADDRESS"] = str_df["ADDRESS"].astype(str).str.strip().str.upper()
-
-        # Address → FIDs mapping
-        meters_map = water_df.groupby("ProcessedAddress")["FID"].apply(list).to_dict()
-        hotels_map = hotels_df.groupby("ADDRESS")["FID"].apply(list).to_dict()
-        hotels_extra_map = hotels_extra_df.groupby("ADDRESS")["FID"].apply(list).to_dict()
-        strs_map = str_df.groupby("ADDRESS")["FID"].apply(list).to_dict()
+    def _build_meter_lookup(self, water_df: pd.DataFrame) -> dict:
+        """Index water meter rows by FID → (componenti, consumo_2024, rate), first row wins."""
+        first_rows = water_df.drop_duplicates(subset="FID", keep="first")
+        lookup = {}
+        for fid, comp, consumo, rate in zip(
+            first_rows["FID"],
+            first_rows["Componenti"],
+            first_rows["Consumo_medio_2024"],
+            first_rows["Cat_Tariffa"],
+        ):
+            lookup[fid] = (
+                int(comp) if pd.notna(comp) else 1,
+                float(consumo) if pd.notna(consumo) else 0,
+                rate if pd.notna(rate) else None,
+            )
+        return lookup
+
+    def _build_meters(self, fids, meter_lookup: dict) -> List[Meter]:
+        """Build fresh Meter objects for the given FIDs from the pre-built lookup."""
+        meters_list = []
+        for fid in fids:
+            values = meter_lookup.get(fid)
+            if values is not None:
+                comp, consumo, rate = values
+                meters_list.append(Meter(id=int(fid), componenti=comp, consumo_2024=consumo, rate=rate))
+            else:
+                meters_list.append(Meter(id=int(fid), componenti=1, consumo_2024=0))
+        return meters_list
+
+    def _in_scope(self, s_name: str, i_code: str) -> bool:
+        """Whether a feature falls inside the requested islands/sestieri load scope."""
+        if self.islands is not None and i_code not in self.islands:
+            return False
+        if self.sestieri is not None:
+            s_code = s_name[:2].upper() if s_name != "Unknown" else "00"
+            if s_name.upper() not in self.sestieri and s_code not in self.sestieri:
+                return False
+        return True
+
+    def _build_hierarchy(self, features=None) -> Venice:
+        """Build the hierarchy from the given feature iterable (defaults to self.features)."""
+        if features is None:
+            features = self.features
+        addr_df, water_df, hotels_df, hotels_extra_df, str_df, building_csv = read_csvs(
+            FILTERED_ADDRESS_CSV, FILTERED_WATER_CSV, FILTERED_HOTEL_CSV,
+            FILTERED_HOTELS_EXTRA_CSV, FILTERED_STR_CSV, FILTERED_CSV,
+        )
+
+        # Standardize addresses (assign() copies: the loaded frames are shared)
+        addr_df = addr_df.assign(Full_sesti=addr_df["Full_sesti"].astype(str).str.strip().str.upper())
+        water_df = water_df.assign(ProcessedAddress=water_df["ProcessedAddress"].astype(str).str.strip().str.upper())
+        hotels_df = hotels_df.assign(ADDRESS=hotels_df["ADDRESS"].astype(str).str.strip().str.upper())
+        hotels_extra_df = hotels_extra_df.assign(ADDRESS=hotels_extra_df["ADDRESS"].astype(str).str.strip().str.upper())
+        str_df = str_df.assign(ADDRESS=str_df["ADDRESS"].astype(str).str.strip().str.upper())
 
         # Map building CSV rows
         building_data_map = building_csv.set_index("TARGET_FID_12_13").to_dict(orient="index")
@@ -77,7 +204,7 @@ class Dataset:
         # --- Compute tract-level ABI21 and POP21 ---
         tract_aggregates = {}
         if "ABI21" in building_csv.columns and "POP21" in building_csv.columns:
-            for tract_id, group in building_csv.groupby([ISLAND_FIELD, TRACT_FIELD]):
+            for tract_id, group in building_csv.groupby([ISLAND_FIELD, TRACT_FIELD], observed=True):
                 tract_key = f"{tract_id[0]}_{tract_id[1]}"
                 abi21_val = group["ABI21"].iloc[0]
                 pop21_val = group["POP21"].iloc[0]
@@ -85,24 +212,34 @@ class Dataset:
                 edi21_val = group["EDI21"].iloc[0]
                 tract_aggregates[tract_key] = {"ABI21": abi21_val, "POP21": pop21_val, "FAM21": fam21_val, "EDI21": edi21_val}
 
+        table = BuildingTable()
         sestiere_map = {}
-        building_map = {}
+        island_map = {}
+        tract_map = {}
 
-        for idx, feature in enumerate(self.features, start=1):
+        self.feature_count = 0
+        for idx, feature in enumerate(features, start=1):
+            self.feature_count = idx
             props = feature.get("properties", {})
-            geom = feature.get("geometry")
 
             s_name = str(props.get(SESTIERE_FIELD, "Unknown")).strip()
             i_code = str(props.get(ISLAND_FIELD, "0")).strip()
+            if not self._in_scope(s_name, i_code):
+                continue
+
+            geom = feature.get("geometry")
             t_id = str(props.get(TRACT_FIELD, "0")).strip()
             b_id = props.get(BUILDING_FIELD, idx)
 
-            try:
-                geom_shape = shape(geom)
-                centroid = geom_shape.centroid if geom_shape else None
-            except Exception:
-                geom_shape = None
-                centroid = None
+            if self.lazy_geometry:
+                geom_shape = centroid = LAZY
+            else:
+                try:
+                    geom_shape = shape(geom)
+                    centroid = geom_shape.centroid if geom_shape else None
+                except Exception:
+                    geom_shape = None
+                    centroid = None
 
             # --- Sestiere ---
             if s_name not in sestiere_map:
@@ -111,14 +248,15 @@ class Dataset:
             sestiere = sestiere_map[s_name]
 
             # --- Island ---
-            island = next((i for i in sestiere.islands if i.code == i_code), None)
+            island = island_map.get((s_name, i_code))
             if island is None:
                 island = Island(code=i_code, name=i_code)
                 sestiere.islands.append(island)
+                island_map[(s_name, i_code)] = island
 
             # --- Tract ---
             tract_key = f"{i_code}_{t_id}"
-            tract = next((t for t in island.tracts if t.id == tract_key), None)
+            tract = tract_map.get((s_name, tract_key))
             if tract is None:
                 tract = Tract(id=tract_key)
                 census_values = tract_aggregates.get(tract_key, {})
@@ -127,13 +265,17 @@ class Dataset:
                 tract.fam21 = census_values.get("FAM21", 0)
                 tract.edi21 = census_values.get("EDI21", 0)
                 island.tracts.append(tract)
+                tract_map[(s_name, tract_key)] = tract
 
             # --- Building ---
             b_row = building_data_map.get(b_id, {})
             building = Building(
                 id=b_id,
+                table=table,
+                island=i_code,
                 centroid=centroid,
                 geometry=geom_shape,
+                raw_geometry=geom if self.lazy_geometry else None,
                 full_alias=props.get("full_alias"),
                 short_alias=props.get("short_alias"),
                 alias_segment=props.get("alias_segment"),
@@ -147,39 +289,41 @@ class Dataset:
             )
 
             tract.buildings.append(building)
-            building_map[b_id] = building
+
+        # Index before attaching addresses so they go to the building ds.building(id) returns
+        self.venice = Venice(sestieri=list(sestiere_map.values()), table=table)
+        self._index_hierarchy()
+        building_map = self._buildings_by_id
+
+        # --- Restrict address-level tables to the loaded buildings ---
+        if self.islands is not None or self.sestieri is not None:
+            addr_df = addr_df[addr_df["TARGET_FID_12_13"].isin(building_map.keys())]
+            addr_codes = set(addr_df["Full_sesti"].str.strip().str.upper())
+            # Keep every row of a kept FID so the lookup still resolves to its first occurrence
+            water_fids = water_df.loc[water_df["ProcessedAddress"].isin(addr_codes), "FID"]
+            water_df = water_df[water_df["FID"].isin(water_fids)]
+            hotels_df = hotels_df[hotels_df["ADDRESS"].isin(addr_codes)]
+            hotels_extra_df = hotels_extra_df[hotels_extra_df["ADDRESS"].isin(addr_codes)]
+            str_df = str_df[str_df["ADDRESS"].isin(addr_codes)]
+
+        # Address → FIDs mapping
+        meters_map = water_df.groupby("ProcessedAddress")["FID"].apply(list).to_dict()
+        hotels_map = hotels_df.groupby("ADDRESS")["FID"].apply(list).to_dict()
+        hotels_extra_map = hotels_extra_df.groupby("ADDRESS")["FID"].apply(list).to_dict()
+        strs_map = str_df.groupby("ADDRESS")["FID"].apply(list).to_dict()
 
         # --- Attach addresses with meters including componenti and 2024 consumption ---
-        for _, row in addr_df.iterrows():
-            b_id = row["TARGET_FID_12_13"]
-            addr_code = row["Full_sesti"].strip().upper()
+        meter_lookup = self._build_meter_lookup(water_df)
+
+        for b_id, addr_code in zip(addr_df["TARGET_FID_12_13"], addr_df["Full_sesti"]):
             building = building_map.get(b_id)
             if building is None:
                 continue
 
-            # Build meters list
-            meters_list = []
-            for fid in meters_map.get(addr_code, []):
-                meter_row = water_df[water_df["FID"] == fid]
-                if not meter_row.empty:
-                    comp = meter_row["Componenti"].iloc[0]
-                    consumo = meter_row["Consumo_medio_2024"].iloc[0]
-                    rate = meter_row["Cat_Tariffa"].iloc[0] 
-
-                    meters_list.append(
-                        Meter(
-                            id=int(fid),
-                            componenti=int(comp) if pd.notna(comp) else 1,
-                            consumo_2024=float(consumo) if pd.notna(consumo) else 0,
-                            rate=rate if pd.notna(rate) else None
-                        )
-                    )
-                else:
-                    meters_list.append(Meter(id=int(fid), componenti=1, consumo_2024=0))
-
+            addr_code = addr_code.strip().upper()
             address_obj = Address(
                 address=addr_code,
-                meters=meters_list,
+                meters=self._build_meters(meters_map.get(addr_code, []), meter_lookup),
                 hotels=hotels_map.get(addr_code, []),
                 hotels_extras=hotels_extra_map.get(addr_code, []),
                 strs=strs_map.get(addr_code, [])
@@ -204,89 +348,228 @@ class Dataset:
                     print(f" │    │    ├── Tract {tr.id}  (Buildings: {len(tr.buildings)})")
         print("\n")"""
 
-        return Venice(sestieri=list(sestiere_map.values()))
+        return self.venice
+
+    def _index_hierarchy(self):
+        """
+        Build lookup indexes and flat lists in hierarchy order. Codes, keys and aliases keep
+        their first occurrence; a repeated building id maps to its last one (with a warning),
+        the building _build_hierarchy attaches that id's addresses to.
+        """
+        self._sestieri_by_code = {}
+        self._islands_by_code = {}
+        self._tracts_by_key = {}
+        self._tracts = []
+        self._buildings = []
+        for s in self.venice.sestieri:
+            self._sestieri_by_code.setdefault(s.code.upper(), s)
+            for island in s.islands:
+                self._islands_by_code.setdefault(island.code, island)
+                for tract in island.tracts:
+                    self._tracts_by_key.setdefault(tract.id, tract)
+                    self._tracts.append(tract)
+                    self._buildings.extend(tract.buildings)
+        self._buildings_by_id = {}
+        for b in self._buildings:
+            self._buildings_by_id[b.id] = b
+        duplicates = len(self._buildings) - len(self._buildings_by_id)
+        if duplicates:
+            print(f"⚠️ {duplicates} buildings share an id with a later building; lookups by id return the last one")
+        self._index_aliases()
+
+    def _index_aliases(self):
+        self._buildings_by_short_alias = {}
+        self._buildings_by_full_alias = {}
+        for b in self._buildings:
+            if b.short_alias:
+                self._buildings_by_short_alias.setdefault(b.short_alias.strip().upper(), b)
+            if b.full_alias:
+                self._buildings_by_full_alias.setdefault(b.full_alias.strip().upper(), b)
+
+    def reindex(self):
+        """Rebuild every index; call after changing the hierarchy or reassigning aliases."""
+        self._index_hierarchy()
+
+    # === Flat views ===
+    @property
+    def buildings(self) -> List[Building]:
+        """Every building in hierarchy order (cached; do not mutate)."""
+        return self._buildings
+
+    @property
+    def tracts(self) -> List[Tract]:
+        """Every tract in hierarchy order (cached; do not mutate)."""
+        return self._tracts
+
+    def buildings_on_islands(self, islands=None) -> List[Building]:
+        """Buildings whose island code starts with any of the given prefixes (all buildings if none given)."""
+        if not islands:
+            return list(self._buildings)
+        return [
+            b
+            for s in self.venice.sestieri
+            for i in s.islands if any(i.code.startswith(isl) for isl in islands)
+            for t in i.tracts
+            for b in t.buildings
+        ]
+
+    # === Lookups ===
+    def sestiere(self, code: str) -> Optional[Sestiere]:
+        """Return the sestiere with the given two-letter code (case-insensitive), or None."""
+        return self._sestieri_by_code.get(str(code).strip().upper())
+
+    def island(self, code: str) -> Optional[Island]:
+        """Return the island with the given code (e.g. "FILI"), or None."""
+        return self._islands_by_code.get(str(code).strip())
+
+    def tract(self, key: str) -> Optional[Tract]:
+        """Return the tract with the given key ("<island code>_<SEZ21>"), or None."""
+        return self._tracts_by_key.get(str(key).strip())
+
+    def building(self, b_id) -> Optional[Building]:
+        """Return the building with the given id, or None."""
+        return self._buildings_by_id.get(b_id)
+
+    def building_by_short_alias(self, alias: str) -> Optional[Building]:
+        """Return the building with the given short alias (e.g. "FILI-001", case-insensitive), or None."""
+        return self._buildings_by_short_alias.get(str(alias).strip().upper())
+
+    def building_by_full_alias(self, alias: str) -> Optional[Building]:
+        """Return the building with the given full alias (case-insensitive), or None."""
+        return self._buildings_by_full_alias.get(str(alias).strip().upper())
     
+    # === Export ===
     def export_hierarchy_text(self, path: str):
-        """Export Venice hierarchy to a text file with full building, address, and meter info (updated V4 fields)."""
+        """
+        Export Venice hierarchy to a text file with full building, address, and meter info (updated V4 fields).
+        Lines are written tract by tract to a buffered handle, so memory stays flat on full-city exports.
+        """
+        with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+            lines = []
+            sep = ""
+            for s in self.venice.sestieri:
+                lines.append(f"\nSestiere: {s.code}")
+                for isl in s.islands:
+                    lines.append(f"\n    Island: {isl.code}")
+                    for tr in isl.tracts:
+                        lines.extend(self._tract_text_lines(tr))
+                        # Flush per tract so only one tract's lines are held at a time
+                        f.write(sep + "\n".join(lines))
+                        sep = "\n"
+                        lines = []
+            if lines:
+                f.write(sep + "\n".join(lines))
+
+        print(f"✅ Hierarchy exported to {path}")
+
+    def _tract_text_lines(self, tr: Tract) -> List[str]:
+        """Text export lines for one tract and its buildings."""
         lines = []
+        tr_alias = tr.buildings[0].full_alias or tr.buildings[0].short_alias or ''
+        lines.append(f"\n        Tract Code: {'-'.join(tr_alias.split('-')[:3])} Tract ID: {tr.id}  (Buildings: {len(tr.buildings)})")
+        lines.append(f"         POP21: {tr.pop21}, ABI21: {tr.abi21}, FAM21: {tr.fam21}, EDI21: {tr.edi21}")
+        
+        for b in tr.buildings:
+            # Safe defaults for percentages and adjusted heights
+            res_pct = getattr(b, "res_pct", 0.0) or 0.0
+            nr_pct = getattr(b, "nr_pct", 0.0) or 0.0
+            empty_pct = getattr(b, "empty_pct", 0.0) or 0.0
+
+            res_adj_height = getattr(b, "res_adj_height", 0.0) or 0.0
+            nr_adj_height = getattr(b, "nr_adj_height", 0.0) or 0.0
+            empty_adj_height = getattr(b, "empty_adj_height", 0.0) or 0.0
+
+            upperonly_res_adj_height = getattr(b, "upperonly_res_adj_height", 0.0) or 0.0
+            upperonly_nr_adj_height = getattr(b, "upperonly_nr_adj_height", 0.0) or 0.0
+            upperonly_empty_adj_height = getattr(b, "upperonly_empty_adj_height", 0.0) or 0.0
+
+            res_livable_space = getattr(b, "res_liveable_space", 0.0) or 0.0
+            nr_livable_space = getattr(b, "nr_liveable_space", 0.0) or 0.0
+            livable_space = getattr(b, "liveable_space", 0.0) or 0.0
+
+            ground_floor_height = getattr(b, "ground_floor_height", 0.0) or 0.0
+            upper_floors_height = getattr(b, "upper_floors_height", 0.0) or 0.0
+
+            lines.append(f"\n            Building Alias: {b.full_alias}, {b.short_alias}, ID: {b.id}")
+            lines.append(f"                Type: {b.tp_cls}, Dest_Pt_An: {b.dest_pt_an}, Full_NR?: {b.full_nr}")
+            lines.append(f"                Height: {b.height}, NormHeight: {b.normalized_height}, FloorsEst: {b.floors_est}")
+            lines.append(f"                Superficie: {b.superficie}, NormSuperficie: {b.normalized_superficie}, LiveableSpace: {livable_space}")
+            lines.append(f"                GroundFloorHeight: {ground_floor_height}, UpperFloorsHeight: {upper_floors_height}")
+            lines.append(f"                UnitsMeters: {b.units_est_meters}, UnitsVolume: {b.units_est_volume}, UnitsMerged: {b.units_est_merged}")
+            lines.append(
+                f"                Res_Primary: {b.units_res_primary}, "
+                f"Res_Empty: {b.units_res_empty}, "
+                f"Res_Total: {b.units_res}, "
+                f"Res_Pct: {res_pct:.2f}, "
+                f"Res_AdjHeight: {res_adj_height:.2f}, "
+                f"UpperOnly_Res_AdjHeight: {upperonly_res_adj_height:.2f}, "
+                f"Res_LivableSpace: {res_livable_space}"
+            )
+            lines.append(
+                f"                NR_Secondary: {b.units_nr_secondary}, "
+                f"NR_Empty: {b.units_nr_empty}, "
+                f"NR_STR: {b.units_nr_secondary_str}, "
+                f"NR_Students: {b.units_nr_secondary_students}, "
+                f"NR_Total: {b.units_nr}, "
+                f"NR_Pct: {nr_pct:.2f}, "
+                f"NR_AdjHeight: {nr_adj_height:.2f}, "
+                f"UpperOnly_NR_AdjHeight: {upperonly_nr_adj_height:.2f}, "
+                f"NR_LivableSpace: {nr_livable_space}, "
+                f"Has_Hotel?: {(b.has_hotel or 0):.2f}"
+            )
+            lines.append(
+                f"                Empty_Pct: {empty_pct:.2f}, Empty_AdjHeight: {empty_adj_height:.2f}, UpperOnly_Empty_AdjHeight: {upperonly_empty_adj_height:.2f}, "
+                f"PopEst: {b.pop_est}"
+            )
+            lines.append(f"                Measured: {getattr(b, 'measured', False)}, Surveyed: {getattr(b, 'surveyed', False)}")
 
-        for s in self.venice.sestieri:
-            lines.append(f"\nSestiere: {s.code}")
-            for isl in s.islands:
-                lines.append(f"\n    Island: {isl.code}")
-                for tr in isl.tracts:
-                    tr_alias = tr.buildings[0].full_alias or tr.buildings[0].short_alias or ''
-                    lines.append(f"\n        Tract Code: {'-'.join(tr_alias.split('-')[:3])} Tract ID: {tr.id}  (Buildings: {len(tr.buildings)})")
-                    lines.append(f"         POP21: {tr.pop21}, ABI21: {tr.abi21}, FAM21: {tr.fam21}, EDI21: {tr.edi21}")
-                    
-                    for b in tr.buildings:
-                        # Safe defaults for percentages and adjusted heights
-                        res_pct = getattr(b, "res_pct", 0.0) or 0.0
-                        nr_pct = getattr(b, "nr_pct", 0.0) or 0.0
-                        empty_pct = getattr(b, "empty_pct", 0.0) or 0.0
-
-                        res_adj_height = getattr(b, "res_adj_height", 0.0) or 0.0
-                        nr_adj_height = getattr(b, "nr_adj_height", 0.0) or 0.0
-                        empty_adj_height = getattr(b, "empty_adj_height", 0.0) or 0.0
-
-                        upperonly_res_adj_height = getattr(b, "upperonly_res_adj_height", 0.0) or 0.0
-                        upperonly_nr_adj_height = getattr(b, "upperonly_nr_adj_height", 0.0) or 0.0
-                        upperonly_empty_adj_height = getattr(b, "upperonly_empty_adj_height", 0.0) or 0.0
-
-                        res_livable_space = getattr(b, "res_liveable_space", 0.0) or 0.0
-                        nr_livable_space = getattr(b, "nr_liveable_space", 0.0) or 0.0
-                        livable_space = getattr(b, "liveable_space", 0.0) or 0.0
-
-                        ground_floor_height = getattr(b, "ground_floor_height", 0.0) or 0.0
-                        upper_floors_height = getattr(b, "upper_floors_height", 0.0) or 0.0
-
-                        lines.append(f"\n            Building Alias: {b.full_alias}, {b.short_alias}, ID: {b.id}")
-                        lines.append(f"                Type: {b.tp_cls}, Dest_Pt_An: {b.dest_pt_an}, Full_NR?: {b.full_nr}")
-                        lines.append(f"                Height: {b.height}, NormHeight: {b.normalized_height}, FloorsEst: {b.floors_est}")
-                        lines.append(f"                Superficie: {b.superficie}, NormSuperficie: {b.normalized_superficie}, LiveableSpace: {livable_space}")
-                        lines.append(f"                GroundFloorHeight: {ground_floor_height}, UpperFloorsHeight: {upper_floors_height}")
-                        lines.append(f"                UnitsMeters: {b.units_est_meters}, UnitsVolume: {b.units_est_volume}, UnitsMerged: {b.units_est_merged}")
-                        lines.append(
-                            f"                Res_Primary: {b.units_res_primary}, "
-                            f"Res_Empty: {b.units_res_empty}, "
-                            f"Res_Total: {b.units_res}, "
-                            f"Res_Pct: {res_pct:.2f}, "
-                            f"Res_AdjHeight: {res_adj_height:.2f}, "
-                            f"UpperOnly_Res_AdjHeight: {upperonly_res_adj_height:.2f}, "
-                            f"Res_LivableSpace: {res_livable_space}"
-                        )
+            for addr in b.addresses:
+                lines.append(f"\n                Address: {addr.address}")
+                lines.append(f"                    STRs: {addr.strs}, Hotels: {addr.hotels}, HotelsExtras: {addr.hotels_extras}")
+                if addr.meters:
+                    for m in addr.meters:
                         lines.append(
-                            f"                NR_Secondary: {b.units_nr_secondary}, "
-                            f"NR_Empty: {b.units_nr_empty}, "
-                            f"NR_STR: {b.units_nr_secondary_str}, "
-                            f"NR_Students: {b.units_nr_secondary_students}, "
-                            f"NR_Total: {b.units_nr}, "
-                            f"NR_Pct: {nr_pct:.2f}, "
-                            f"NR_AdjHeight: {nr_adj_height:.2f}, "
-                            f"UpperOnly_NR_AdjHeight: {upperonly_nr_adj_height:.2f}, "
-                            f"NR_LivableSpace: {nr_livable_space}, "
-                            f"Has_Hotel?: {(b.has_hotel or 0):.2f}"
+                            f"                    Meter: {m.id} (Comp: {m.componenti}, Consumo2024: {m.consumo_2024}, Rate: {m.rate})"
                         )
-                        lines.append(
-                            f"                Empty_Pct: {empty_pct:.2f}, Empty_AdjHeight: {empty_adj_height:.2f}, UpperOnly_Empty_AdjHeight: {upperonly_empty_adj_height:.2f}, "
-                            f"PopEst: {b.pop_est}"
-                        )
-                        lines.append(f"                Measured: {getattr(b, 'measured', False)}, Surveyed: {getattr(b, 'surveyed', False)}")
-
-                        for addr in b.addresses:
-                            lines.append(f"\n                Address: {addr.address}")
-                            lines.append(f"                    STRs: {addr.strs}, Hotels: {addr.hotels}, HotelsExtras: {addr.hotels_extras}")
-                            if addr.meters:
-                                for m in addr.meters:
-                                    lines.append(
-                                        f"                    Meter: {m.id} (Comp: {m.componenti}, Consumo2024: {m.consumo_2024}, Rate: {m.rate})"
-                                    )
-                            else:
-                                lines.append(f"                    Meters: []")
-
-        # Write to file
-        with open(path, "w", encoding="utf-8") as f:
-            f.write("\n".join(lines))
-
-        print(f"✅ Hierarchy exported to {path}")
+                else:
+                    lines.append(f"                    Meters: []")
+        return lines
+
+    def export_hierarchy_jsonl(self, path: str):
+        """
+        Export the hierarchy as JSON Lines: one record per building with its sestiere, island
+        and tract, every Building field except geometry, and nested addresses and meters.
+        """
+        count = 0
+        with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+            for s in self.venice.sestieri:
+                for isl in s.islands:
+                    for tr in isl.tracts:
+                        for b in tr.buildings:
+                            record = {"sestiere": s.code, "island": isl.code, "tract": tr.id}
+                            for name in JSONL_BUILDING_FIELDS:
+                                record[name] = _json_value(getattr(b, name))
+                            record["addresses"] = [
+                                {
+                                    "address": addr.address,
+                                    "strs": [_json_value(x) for x in addr.strs],
+                                    "hotels": [_json_value(x) for x in addr.hotels],
+                                    "hotels_extras": [_json_value(x) for x in addr.hotels_extras],
+                                    "meters": [
+                                        {
+                                            "id": _json_value(m.id),
+                                            "componenti": _json_value(m.componenti),
+                                            "consumo_2024": _json_value(m.consumo_2024),
+                                            "rate": _json_value(m.rate),
+                                        }
+                                        for m in addr.meters
+                                    ],
+                                }
+                                for addr in b.addresses
+                            ]
+                            f.write(json.dumps(record, ensure_ascii=False))
+                            f.write("\n")
+                            count += 1
+
+        print(f"✅ Hierarchy exported to {path} ({count} buildings)")
 
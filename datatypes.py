@@ -1,7 +1,278 @@
+import numpy as np
+import shapely
 from dataclasses import dataclass, field
-from shapely.geometry import Point, shape   
+from shapely.geometry import Point, shape
 from typing import List, Optional
 
+class _Lazy:
+    """Sentinel for a geometry that has not been built yet."""
+    def __repr__(self):
+        return "<lazy>"
+
+LAZY = _Lazy()
+
+# Per-row column state: unset (ad-hoc attribute never assigned), None, or a stored value
+UNSET, NONE, VALUE = 0, 1, 2
+
+class Column:
+    """
+    Field descriptor for a Building column stored in its BuildingTable.
+    Typed columns (float/int/bool) live in a NumPy array; a value of any other type
+    promotes the column to object dtype so every value reads back exactly as written.
+    Ad-hoc columns (declared=False) stay unset until assigned, like a missing attribute.
+    """
+    def __init__(self, kind=object, default=None, factory=None, declared=True, repr=True, compare=True):
+        self.kind = kind
+        self.default = default
+        self.factory = factory
+        self.declared = declared
+        self.repr = repr
+        self.compare = compare
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            return obj._table.columns[self.name].get(obj._row)
+        except AttributeError:
+            raise AttributeError(f"'{type(obj).__name__}' object has no attribute '{self.name}'") from None
+
+    def __set__(self, obj, value):
+        obj._table.columns[self.name].set(obj._row, value)
+
+    def __delete__(self, obj):
+        obj._table.columns[self.name].state[obj._row] = UNSET
+
+class LazyGeometry(Column):
+    """
+    Column descriptor for Building.geometry / Building.centroid.
+    Left as LAZY, the shapely object is built from raw_geometry on first access.
+    """
+    def __init__(self):
+        super().__init__(object, default=LAZY)
+
+    def __get__(self, obj, objtype=None):
+        value = super().__get__(obj, objtype)
+        if value is LAZY:
+            materialize_geometry([obj])
+            value = super().__get__(obj, objtype)
+        return value
+
+class _ColumnData:
+    """NumPy storage for one column: values plus a per-row UNSET/NONE/VALUE state."""
+    __slots__ = ("kind", "data", "state")
+
+    def __init__(self, spec: Column, capacity: int):
+        self.kind = spec.kind
+        if self.kind is object:
+            self.data = np.full(capacity, spec.default, dtype=object)
+        else:
+            self.data = np.full(capacity, spec.default if spec.default is not None else 0, dtype=self.kind)
+        if not spec.declared or spec.factory is not None:
+            state = UNSET
+        else:
+            state = NONE if spec.default is None else VALUE
+        self.state = np.full(capacity, state, dtype=np.int8)
+
+    def grow(self, spec: Column, capacity: int):
+        fill = _ColumnData(spec, capacity - len(self.data))
+        self.data = np.concatenate([self.data, fill.data.astype(self.data.dtype)])
+        self.state = np.concatenate([self.state, fill.state])
+
+    def get(self, row: int):
+        state = self.state[row]
+        if state == VALUE:
+            value = self.data[row]
+            return value if self.kind is object else self.kind(value)
+        if state == NONE:
+            return None
+        raise AttributeError(row)
+
+    def set(self, row: int, value):
+        if value is None:
+            self.state[row] = NONE
+            if self.kind is object:
+                self.data[row] = None
+            return
+        if self.kind is not object and (type(value) is not self.kind or (self.kind is int and not -2**63 <= value < 2**63)):
+            self.promote()
+        self.data[row] = value
+        self.state[row] = VALUE
+
+    def copy_from(self, other: "_ColumnData", rows, other_rows):
+        """Copy values and states from other's rows, promoting to object dtype if other was."""
+        if other.kind is object and self.kind is not object:
+            self.promote()
+        self.data[rows] = other.data[other_rows]
+        self.state[rows] = other.state[other_rows]
+
+    def promote(self):
+        """Switch to object dtype, keeping stored values as Python scalars."""
+        data = np.full(len(self.data), None, dtype=object)
+        rows = np.flatnonzero(self.state == VALUE)
+        for row, value in zip(rows.tolist(), self.data[rows].tolist()):
+            data[row] = value
+        self.data = data
+        self.kind = object
+
+class BuildingTable:
+    """
+    Columnar backing store for Building rows: one NumPy array per Building column,
+    indexed by row and grown geometrically. Buildings are __slots__ views over a row,
+    so estimation stages can read or write whole columns at once.
+    """
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.capacity = max(int(capacity), 1)
+        self.columns = {name: _ColumnData(spec, self.capacity) for name, spec in Building.COLUMNS.items()}
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, size: int):
+        if size <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < size:
+            capacity *= 2
+        for name, spec in Building.COLUMNS.items():
+            self.columns[name].grow(spec, capacity)
+        self.capacity = capacity
+
+    def _append(self, count: int = 1) -> range:
+        rows = range(self.size, self.size + count)
+        self._reserve(self.size + count)
+        self.size += count
+        for name, spec in Building.COLUMNS.items():
+            if spec.factory is not None:
+                column = self.columns[name]
+                for row in rows:
+                    column.data[row] = spec.factory()
+                column.state[rows.start:rows.stop] = VALUE
+        return rows
+
+    def extend(self, count: int) -> List["Building"]:
+        """Append `count` default rows and return their Building views."""
+        return [self.building(row) for row in self._append(count)]
+
+    def building(self, row: int) -> "Building":
+        """Building view over an existing row."""
+        building = Building.__new__(Building)
+        building._table = self
+        building._row = row
+        return building
+
+    def column(self, name: str) -> np.ndarray:
+        """Raw values for every row (a view, not a copy); see mask() for which rows hold a value."""
+        return self.columns[name].data[:self.size]
+
+    def mask(self, name: str) -> np.ndarray:
+        """True where the row holds a non-None value."""
+        return self.columns[name].state[:self.size] == VALUE
+
+    def take(self, rows, names) -> "BuildingTable":
+        """New table holding copies of the named columns for the given rows (in that order)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        table = BuildingTable(capacity=len(rows))
+        table._append(len(rows))
+        for name in names:
+            table.columns[name].copy_from(self.columns[name], slice(0, len(rows)), rows)
+        return table
+
+    def put(self, rows, other: "BuildingTable", names):
+        """Write the named columns of other (row i) back into the given rows of this table."""
+        rows = np.asarray(rows, dtype=np.int64)
+        for name in names:
+            self.columns[name].copy_from(other.columns[name], rows, slice(0, len(rows)))
+
+    def set_column(self, name: str, values, rows=None):
+        """Assign a whole column (or the given rows); arrays matching the column dtype are copied in one go."""
+        column = self.columns[name]
+        rows = np.arange(self.size) if rows is None else np.asarray(rows, dtype=np.int64)
+        if isinstance(values, np.ndarray) and column.kind is not object and values.dtype == np.dtype(column.kind):
+            column.data[rows] = values
+            column.state[rows] = VALUE
+            return
+        for row, value in zip(rows.tolist(), values):
+            column.set(row, value)
+
+def _shape_or_none(raw):
+    try:
+        return shape(raw)
+    except Exception:
+        return None
+
+def _stored(b, name):
+    """Stored column value without triggering lazy geometry."""
+    return b._table.columns[name].get(b._row)
+
+def materialize_geometry(buildings):
+    """
+    Build shapely geometries and centroids for every lazy building in one batch.
+    WKB is decoded and centroids are computed with vectorized shapely calls.
+    """
+    pending = [b for b in buildings if _stored(b, "geometry") is LAZY or _stored(b, "centroid") is LAZY]
+    if not pending:
+        return
+
+    geoms = np.empty(len(pending), dtype=object)
+    wkb_rows, wkb_values = [], []
+    for i, b in enumerate(pending):
+        geom = _stored(b, "geometry")
+        raw = _stored(b, "raw_geometry")
+        if geom is not LAZY:
+            geoms[i] = geom
+        elif isinstance(raw, (bytes, bytearray)):
+            wkb_rows.append(i)
+            wkb_values.append(raw)
+        elif raw is not None:
+            geoms[i] = _shape_or_none(raw)
+    if wkb_rows:
+        geoms[wkb_rows] = shapely.from_wkb(np.array(wkb_values, dtype=object))
+
+    valid = ~(shapely.is_missing(geoms) | shapely.is_empty(geoms))
+    centroids = np.full(len(pending), None, dtype=object)
+    centroids[valid] = shapely.centroid(geoms[valid])
+
+    for b, geom, centroid in zip(pending, geoms, centroids):
+        b.geometry = geom
+        if _stored(b, "centroid") is LAZY:
+            b.centroid = centroid
+        b.raw_geometry = None
+
+def _rows_by_table(buildings):
+    """(table, positions in buildings, table rows) for each BuildingTable behind buildings."""
+    groups = {}
+    for i, b in enumerate(buildings):
+        _, positions, rows = groups.setdefault(id(b._table), (b._table, [], []))
+        positions.append(i)
+        rows.append(b._row)
+    return [(table, np.asarray(positions, dtype=np.int64), np.asarray(rows, dtype=np.int64))
+            for table, positions, rows in groups.values()]
+
+def column_values(buildings, name: str) -> np.ndarray:
+    """One stored value per building as an object array (None where unset), read column by column."""
+    values = np.full(len(buildings), None, dtype=object)
+    for table, positions, rows in _rows_by_table(buildings):
+        column = table.columns[name]
+        held = column.state[rows] == VALUE
+        data = column.data[rows[held]]
+        values[positions[held]] = data if column.kind is object else data.tolist()
+    return values
+
+def set_column_values(buildings, name: str, values):
+    """Assign one scalar value per building through BuildingTable.set_column, a table at a time."""
+    values = values if isinstance(values, np.ndarray) else np.asarray(values, dtype=object)
+    for table, positions, rows in _rows_by_table(buildings):
+        part = values[positions]
+        kind = table.columns[name].kind
+        if kind is object or part.dtype != np.dtype(kind):
+            part = part.tolist()
+        table.set_column(name, part, rows)
+
 @dataclass
 class Meter:
     id: int
@@ -17,73 +288,132 @@ class Address:
     hotels: List[int] = field(default_factory=list)
     hotels_extras: List[int] = field(default_factory=list)
 
-@dataclass
 class Building:
+    """
+    View over one BuildingTable row. Attribute access reads and writes the row's
+    columns, so existing code keeps using b.height etc. while the data stays columnar.
+    """
+    __slots__ = ("_table", "_row")
 
-    id: int
-    centroid: Point
-    geometry: shape
-    addresses: List[Address] = field(default_factory=list)
-    has_hotel: Optional[bool] = None
+    id = Column(int)
+    island = Column()  # code of the Island the building belongs to
+    centroid = LazyGeometry()
+    geometry = LazyGeometry()
+    addresses = Column(factory=list)
+    has_hotel = Column(bool)
 
-    full_alias: Optional[str] = None
-    short_alias: Optional[str] = None
-    alias_segment: Optional[int] = None
+    full_alias = Column()
+    short_alias = Column()
+    alias_segment = Column(int)
 
-    qu_terra: Optional[float] = None
-    qu_gronda: Optional[float] = None
+    qu_terra = Column(float)
+    qu_gronda = Column(float)
 
-    tp_cls: Optional[str] = None
-    tipo_fun: Optional[str] = None
-    spec_fun: Optional[str] = None
-    dest_pt_an: Optional[str] = None
+    tp_cls = Column()
+    tipo_fun = Column()
+    spec_fun = Column()
+    dest_pt_an = Column()
 
-    height: Optional[float] = None
-    superficie: Optional[float] = None
-    normalized_height: Optional[float] = None
-    normalized_superficie: Optional[float] = None
+    height = Column(float)
+    superficie = Column(float)
+    normalized_height = Column(float)
+    normalized_superficie = Column(float)
 
-    floors_est: Optional[int] = None
-    units_est_meters: Optional[int] = None
-    units_est_volume: Optional[int] = None
-    units_est_merged: Optional[int] = None
-    pop_est: Optional[int] = None
+    floors_est = Column(int)
+    units_est_meters = Column(int)
+    units_est_volume = Column(int)
+    units_est_merged = Column(int)
+    pop_est = Column(int)
 
-    full_nr: bool = False
+    full_nr = Column(bool, default=False)
 
-    liveable_space: Optional[float] = None
-    res_liveable_space: Optional[float] = None
-    nr_liveable_space: Optional[float] = None
+    liveable_space = Column(float)
+    res_liveable_space = Column(float)
+    nr_liveable_space = Column(float)
 
-    ground_floor_height: Optional[float] = None
-    upper_floors_height: Optional[float] = None
+    ground_floor_height = Column(float)
+    upper_floors_height = Column(float)
 
-    units_res: Optional[int] = None
-    units_res_empty: Optional[int] = None
-    units_res_primary: Optional[int] = None
+    units_res = Column(int)
+    units_res_empty = Column(int)
+    units_res_primary = Column(int)
 
-    units_nr: Optional[int] = None
-    units_nr_empty: Optional[int] = None
-    units_nr_secondary: Optional[int] = None
-    units_nr_secondary_str: Optional[int] = None
-    units_nr_secondary_students: Optional[int] = None
+    units_nr = Column(int)
+    units_nr_empty = Column(int)
+    units_nr_secondary = Column(int)
+    units_nr_secondary_str = Column(int)
+    units_nr_secondary_students = Column(int)
 
     # Percentages
-    res_pct: Optional[float] = None
-    nr_pct: Optional[float] = None
-    empty_pct: Optional[float] = None
+    res_pct = Column(float)
+    nr_pct = Column(float)
+    empty_pct = Column(float)
 
     # Adjusted heights
-    res_adj_height: Optional[float] = None
-    nr_adj_height: Optional[float] = None
-    empty_adj_height: Optional[float] = None
+    res_adj_height = Column(float)
+    nr_adj_height = Column(float)
+    empty_adj_height = Column(float)
+
+    upperonly_res_adj_height = Column(float)
+    upperonly_nr_adj_height = Column(float)
+    upperonly_empty_adj_height = Column(float)
+
+    measured = Column(bool)
+    surveyed = Column(bool)
+
+    # Raw GeoJSON geometry dict or WKB bytes, kept until geometry/centroid is first read
+    raw_geometry = Column(repr=False, compare=False)
+
+    # Ad-hoc estimator attributes: unset (AttributeError) until a stage assigns them
+    units_str = Column(int, declared=False)
+    units_empty = Column(int, declared=False)
+    units_calc = Column(int, declared=False)
+    units_primary = Column(int, declared=False)
+    units_secondary = Column(int, declared=False)
+    total_units = Column(int, declared=False)
+    livable_space = Column(float, declared=False)
+    _m_res = Column(int, declared=False)
+    _m_res_empty = Column(int, declared=False)
+    _m_nr = Column(int, declared=False)
+    _m_nr_empty = Column(int, declared=False)
+    _meter_total = Column(int, declared=False)
+    _merged = Column(int, declared=False)
+    _ratios_applied = Column(bool, declared=False)
+    nr_reasons = Column(int, declared=False)  # NR reason bitmask, see estimation_v4.decode_nr_reasons
+
+    def __init__(self, id, table: Optional[BuildingTable] = None, **values):
+        # A building created without a table gets a private one-row table, freed with it
+        if table is None:
+            table = BuildingTable(capacity=1)
+        self._table = table
+        self._row = table._append().start
+        self.id = id
+        for name, value in values.items():
+            if name not in Building.FIELDS:
+                raise TypeError(f"Building.__init__() got an unexpected keyword argument '{name}'")
+            setattr(self, name, value)
+
+    def _compare_values(self):
+        return tuple(getattr(self, name) for name in Building.FIELDS if Building.COLUMNS[name].compare)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        if self is other or (self._table is other._table and self._row == other._row):
+            return True
+        # Distinct ids settle it without reading (and materialising) every column
+        if self.id != other.id:
+            return False
+        return self._compare_values() == other._compare_values()
+
+    __hash__ = None
 
-    upperonly_res_adj_height: Optional[float] = None
-    upperonly_nr_adj_height: Optional[float] = None
-    upperonly_empty_adj_height: Optional[float] = None
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in Building.FIELDS if Building.COLUMNS[name].repr)
+        return f"Building({fields})"
 
-    measured: Optional[bool] = None
-    surveyed: Optional[bool] = None
+Building.COLUMNS = {name: spec for name, spec in vars(Building).items() if isinstance(spec, Column)}
+Building.FIELDS = tuple(name for name, spec in Building.COLUMNS.items() if spec.declared)
 
 @dataclass
 class Tract:
@@ -118,4 +448,6 @@ class Sestiere:
 
 @dataclass
 class Venice:
-    sestieri: List[Sestiere] = field(default_factory=list)
\ No newline at end of file
+    sestieri: List[Sestiere] = field(default_factory=list)
+    # Columnar store behind every Building in the hierarchy
+    table: Optional[BuildingTable] = field(default=None, repr=False, compare=False)
@@ -11,7 +11,6 @@ AVERAGE_UNIT_AREA = 125.0
 def estimation_v0(ds, islands=None):
 
     bcsv = load_csv(FILTERED_CSV)
-    building_map = {b.id: b for s in ds.venice.sestieri for i in s.islands for t in i.tracts for b in t.buildings}
 
     tract_building_counts = bcsv.groupby("SEZ21")["TARGET_FID_12_13"].count().to_dict()
 
@@ -19,7 +18,7 @@ def estimation_v0(ds, islands=None):
     
     for _, row in bcsv.iterrows():
         b_id = row["TARGET_FID_12_13"]
-        building = building_map.get(b_id)
+        building = ds.building(b_id)
         if building is None:
             continue
 
@@ -58,5 +57,5 @@ def estimation_v0(ds, islands=None):
     # save CSV
     pd.DataFrame(results).to_csv(ESTIMATES_DIR / "VPC_Estimates_V0.csv", index=False)
 
-    print(f"✅ V0 estimation populated for {len(building_map)} buildings")
+    print(f"✅ V0 estimation populated for {len(ds.buildings)} buildings")
     return ds
\ No newline at end of file
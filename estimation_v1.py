@@ -1,8 +1,8 @@
 import pandas as pd
-import numpy as np
 from math import ceil
 import os
 from file_utils import load_csv
+from imputation import has_valid_gronda, impute_qu_gronda, normalized_superficie
 from constants import (
     ESTIMATES_DIR,
     FILTERED_CSV,
@@ -32,46 +32,27 @@ def calc_units_from_meter_data(building, meter_df):
 # ------------------------------------------------------------
 # NORMALIZATION HELPER
 # ------------------------------------------------------------
-def set_normalized_height_and_superficie(building, all_buildings, k=K_NEIGHBORS, debug=False):
-    # ------------------------
-    # Height & Normalized Height
-    # ------------------------
+def set_normalized_height_and_superficie(building, avg_qu_gronda, norm_superficie, debug=False):
+    """
+    avg_qu_gronda and norm_superficie come from the batched neighbour imputation
+    (impute_qu_gronda / normalized_superficie).
+    """
     if building.qu_terra is None:
         building.qu_terra = 0
 
-    if building.qu_gronda not in [None, 0, 9999]:
+    if has_valid_gronda(building):
         building.height = building.qu_gronda - building.qu_terra
         building.normalized_height = building.height
         if debug:
             print(f"Building {building.id} valid qu_gronda: height={building.height:.2f}")
+    elif avg_qu_gronda is not None:
+        building.height = 0
+        building.normalized_height = round(avg_qu_gronda - building.qu_terra, 2)
     else:
-        neighbors = [
-            b for b in all_buildings
-            if b != building
-            and getattr(b, "island", None) == getattr(building, "island", None)
-            and b.qu_gronda not in [None, 0, 9999]
-        ]
-        if neighbors:
-            neighbors = sorted(neighbors, key=lambda b2: building.centroid.distance(b2.centroid))[:k]
-            avg_qu_gronda = np.mean([b2.qu_gronda for b2 in neighbors])
-            building.height = 0
-            building.normalized_height = round(avg_qu_gronda - building.qu_terra,2)
-        else:
-            building.height = 0
-            building.normalized_height = 0
-
-    # ------------------------
-    # Normalized Superficie
-    # ------------------------
-    if building.superficie is not None and 0 < building.superficie < 30000:
-        building.normalized_superficie = building.superficie
-    else:
-        neighbors_s = [b for b in all_buildings if b != building and b.superficie is not None and 0 < b.superficie < 30000]
-        if neighbors_s:
-            neighbors_s = sorted(neighbors_s, key=lambda b2: building.centroid.distance(b2.centroid))[:k]
-            building.normalized_superficie = round(np.mean([b2.superficie for b2 in neighbors_s]),2)
-        else:
-            building.normalized_superficie = 0
+        building.height = 0
+        building.normalized_height = 0
+
+    building.normalized_superficie = norm_superficie
 
 # ------------------------------------------------------------
 # V1 ESTIMATION
@@ -83,20 +64,23 @@ def estimation_v1(ds, islands=None, debug=False):
     """
 
     bcsv = load_csv(FILTERED_CSV)
-    building_map = {b.id: b for s in ds.venice.sestieri for i in s.islands for t in i.tracts for b in t.buildings}
-    all_buildings = list(building_map.values())
+    all_buildings = ds.buildings
+    ds.materialize_centroids(all_buildings)
     meter_df = pd.read_csv(FILTERED_WATER_CSV)
 
     results = []
 
-    for building in all_buildings:
+    avg_qu_gronda = impute_qu_gronda(all_buildings, K_NEIGHBORS)
+    norm_superficie = normalized_superficie(all_buildings, K_NEIGHBORS)
+
+    for idx, building in enumerate(all_buildings):
 
         # optional island filter
         if islands and not any(building.short_alias.startswith(isl) for isl in islands):
             continue
 
         # normalize height & superficie
-        set_normalized_height_and_superficie(building, all_buildings, k=K_NEIGHBORS, debug=debug)
+        set_normalized_height_and_superficie(building, avg_qu_gronda[idx], norm_superficie[idx], debug=debug)
 
         # units
         building.units_est_meters = calc_units_from_meter_data(building, meter_df)
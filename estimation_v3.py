@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from imputation import has_valid_gronda, impute_qu_gronda, normalized_superficie
 from constants import (
     ESTIMATES_DIR,
     FILTERED_CSV,
@@ -32,38 +33,25 @@ def calc_units_from_meter_data(building, meter_df):
 # ------------------------------------------------------------
 # NORMALIZATION HELPER
 # ------------------------------------------------------------
-def set_normalized_height_and_superficie(building, all_buildings, k=K_NEIGHBORS, debug=False):
+def set_normalized_height_and_superficie(building, avg_qu_gronda, norm_superficie, debug=False):
+    """
+    avg_qu_gronda and norm_superficie come from the batched neighbour imputation
+    (impute_qu_gronda / normalized_superficie).
+    """
     if building.qu_terra is None:
         building.qu_terra = 0
 
-    if building.qu_gronda not in [None, 0, 9999]:
+    if has_valid_gronda(building):
         building.height = building.qu_gronda - building.qu_terra
         building.normalized_height = building.height
+    elif avg_qu_gronda is not None:
+        building.height = 0
+        building.normalized_height = round(avg_qu_gronda - building.qu_terra, 2)
     else:
-        neighbors = [
-            b for b in all_buildings
-            if b != building
-            and getattr(b, "island", None) == getattr(building, "island", None)
-            and b.qu_gronda not in [None, 0, 9999]
-        ]
-        if neighbors:
-            neighbors = sorted(neighbors, key=lambda b2: building.centroid.distance(b2.centroid))[:k]
-            avg_qu_gronda = np.mean([b2.qu_gronda for b2 in neighbors])
-            building.height = 0
-            building.normalized_height = round(avg_qu_gronda - building.qu_terra, 2)
-        else:
-            building.height = 0
-            building.normalized_height = 0
+        building.height = 0
+        building.normalized_height = 0
 
-    if building.superficie is not None and 0 < building.superficie < 30000:
-        building.normalized_superficie = building.superficie
-    else:
-        neighbors_s = [b for b in all_buildings if b != building and b.superficie is not None and 0 < b.superficie < 30000]
-        if neighbors_s:
-            neighbors_s = sorted(neighbors_s, key=lambda b2: building.centroid.distance(b2.centroid))[:k]
-            building.normalized_superficie = round(np.mean([b2.superficie for b2 in neighbors_s]), 2)
-        else:
-            building.normalized_superficie = 0
+    building.normalized_superficie = norm_superficie
 
 # ------------------------------------------------------------
 # ATTACH NR INFO
@@ -88,17 +76,8 @@ def attach_nr_info(ds):
     measured_map = dict(zip(field_df["short_alias"], field_df.get("Measured Height", [np.nan]*len(field_df))))
     surveyed_set = set(survey_df["short_alias"])
 
-    # Flatten buildings from all sestieri → islands → tracts
-    all_buildings = [
-        b
-        for s in ds.venice.sestieri
-        for isl in s.islands
-        for t in isl.tracts
-        for b in t.buildings
-    ]
-
     # Update building objects
-    for b in all_buildings:
+    for b in ds.buildings:
         sha = (b.short_alias or "").strip().upper()
         b.units_str = int(units_str_map.get(sha, 0))
         b.units_empty = int(units_empty_map.get(sha, 0))
@@ -116,15 +95,10 @@ def estimation_v3(ds, islands=None, debug=False):
     # ---------------------- NR INFO ----------------------
     print("[STEP] Attaching NR info")
 
-    all_buildings = []
-    for s in ds.venice.sestieri:
-        for i in s.islands:
-            if islands and not any(i.code.startswith(isl) for isl in islands):
-                continue
-            for t in i.tracts:
-                all_buildings.extend(t.buildings)
+    all_buildings = ds.buildings_on_islands(islands)
 
     print(f"[INFO] Total buildings to process: {len(all_buildings)}")
+    ds.materialize_centroids(all_buildings)
 
     # ---------------------- Load CSVs ----------------------
     print("[STEP] Loading CSVs and creating mappings")
@@ -143,8 +117,11 @@ def estimation_v3(ds, islands=None, debug=False):
 
     # ---------------------- Compute normalized + floors + livable ----------------------
     print("[STEP] Computing normalized height, superficie, floors, meter units, livable space")
+    avg_qu_gronda = impute_qu_gronda(all_buildings, K_NEIGHBORS)
+    norm_superficie = normalized_superficie(all_buildings, K_NEIGHBORS)
+
     for idx, b in enumerate(all_buildings, 1):
-        set_normalized_height_and_superficie(b, all_buildings, debug=debug)
+        set_normalized_height_and_superficie(b, avg_qu_gronda[idx - 1], norm_superficie[idx - 1], debug=debug)
 
         # Floors estimation
         row = linreg_map.get(b.tp_cls)
@@ -1,9 +1,23 @@
-import os
+import hashlib
 import pandas as pd
+import geopandas as gpd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 import numpy as np
+import shapely
 from rtree import index
+from apportion import largest_remainder
+from csv_loader import read_csvs
+from datatypes import Building, column_values, set_column_values, materialize_geometry
+from imputation import has_valid_gronda, impute_qu_gronda, normalized_superficie
+from instrumentation import RunReport, activate, active_report, stage
+from snapshot import hash_files, load_columns, save_columns
 from constants import (
-    ESTIMATES_DIR,
+    ESTIMATES_CSV,
+    ESTIMATES_PARQUET,
+    ESTIMATES_FEATHER,
+    ESTIMATES_GEOPARQUET,
+    ESTIMATES_STATE,
     FILTERED_CSV,
     FILTERED_WATER_CSV,
     LIN_REG_CSV,
@@ -16,6 +30,17 @@ from constants import (
 K_NEIGHBORS = 5
 EMPTY_UNIT_CUTOFF = 0.5
 ALPHA_MERGE = 0.6
+# Metered neighbours an unmetered building borrows its res/NR/empty ratios from
+RATIO_NEIGHBORS = 1
+
+# Audit outputs: CSV (with WKT geometry), Parquet/Feather attributes, GeoParquet layer (WKB geometry)
+AUDIT_PATHS = {
+    "csv": ESTIMATES_CSV,
+    "parquet": ESTIMATES_PARQUET,
+    "feather": ESTIMATES_FEATHER,
+    "geoparquet": ESTIMATES_GEOPARQUET,
+}
+AUDIT_FORMATS = ("csv", "geoparquet")
 
 # ------------------------------------------------------------
 # UTILITY FUNCTIONS
@@ -31,149 +56,211 @@ def val_zero(x, is_number=True):
 # UNITS FROM WATER METERS
 # ------------------------------------------------------------
 
-def calc_units_from_meter_data(building, meter_df):
+METER_UNIT_COLUMNS = ["Nuclei_domestici", "Nuclei_commerciali", "Nuclei_non_residenti"]
+# Per-building raw meter counts (componenti): res, res empty, NR, NR empty
+METER_COLUMNS = ["_m_res", "_m_res_empty", "_m_nr", "_m_nr_empty"]
+
+def meter_units_by_address(meter_df):
     """
-    Calculate building units from water meter readings.
-    Filters out public usage and non-relevant meters.
+    Units per ProcessedAddress from water meter readings, computed once for the city.
+    Filters out condominium (Condominio == "X") and public usage meters; each meter
+    counts its Nuclei_* total times Componenti (1 when missing).
     """
-    total_units = 0
-    for addr in building.addresses:
-        addr_meters = meter_df[meter_df["ProcessedAddress"] == addr.address]
-        filtered = addr_meters[addr_meters["Condominio"] != "X"]
-        filtered = filtered[filtered["Cat_Tariffa"].str.strip().str.lower() != "uso pubblico"]
+    kept = meter_df[(meter_df["Condominio"] != "X") & ~_is_public(meter_df["Cat_Tariffa"])]
+    units = kept[METER_UNIT_COLUMNS].sum(axis=1) * kept["Componenti"].fillna(1)
+    return units.groupby(kept["ProcessedAddress"]).sum().to_dict()
+
+def _is_public(rates):
+    return rates.str.strip().str.lower() == "uso pubblico"
 
-        for _, row in filtered.iterrows():
-            multiplier = row["Componenti"] if pd.notna(row["Componenti"]) and row["Componenti"] != "" else 1
-            subtotal = row[["Nuclei_domestici", "Nuclei_commerciali", "Nuclei_non_residenti"]].sum()
-            total_units += subtotal * multiplier
-    return int(total_units)
+def meter_table(meter_df, empty_cutoff=EMPTY_UNIT_CUTOFF):
+    """
+    Typed per-meter table, built once per run: upper-cased address, componenti
+    (1 when missing or not positive) and is_res / is_empty / is_public flags.
+    is_empty means Consumo_medio_2024 below empty_cutoff (a missing reading is not empty).
+    """
+    rates = meter_df["Cat_Tariffa"]
+    componenti = meter_df["Componenti"]
+    return pd.DataFrame({
+        "address": meter_df["ProcessedAddress"].str.upper(),
+        "componenti": componenti.where(componenti > 0, 1).astype(np.int64),
+        "is_res": rates.str.lower().str.contains("uso domestico residente", regex=False, na=False).astype(bool),
+        "is_empty": (meter_df["Consumo_medio_2024"] < empty_cutoff).to_numpy(),
+        "is_public": _is_public(rates).fillna(False).astype(bool),
+    })
+
+def calc_units_from_meter_data(building, units_by_address):
+    """
+    Calculate building units from water meter readings,
+    rolling up the per-address totals from meter_units_by_address.
+    """
+    return int(sum(units_by_address.get(addr.address, 0) for addr in building.addresses))
 
 # ------------------------------------------------------------
 # HEIGHT & SUPERFICIE NORMALIZATION
 # ------------------------------------------------------------
 
-def set_normalized_height_and_superficie(building, all_buildings, k=K_NEIGHBORS, debug=False):
+def set_normalized_height_and_superficie(building, avg_qu_gronda, norm_superficie, debug=False):
     """
     Compute normalized height and surface area for a building.
-    Falls back to neighbors if direct values are missing.
+    avg_qu_gronda and norm_superficie come from the batched neighbour imputation
+    (impute_qu_gronda / normalized_superficie).
     """
     if building.qu_terra is None:
         building.qu_terra = 0
 
-    building.normalized_height = _compute_normalized_height(building, all_buildings, k)
-    building.normalized_superficie = _compute_normalized_superficie(building, all_buildings, k)
+    building.normalized_height = _compute_normalized_height(building, avg_qu_gronda)
+    building.normalized_superficie = norm_superficie
 
-def _compute_normalized_height(building, all_buildings, k):
-    """Compute normalized height using neighbors if qu_gronda is missing."""
-    if building.qu_gronda not in [None, 0, 9999]:
+def _compute_normalized_height(building, avg_qu_gronda):
+    """Compute normalized height, using the neighbours' mean qu_gronda if it is missing."""
+    if has_valid_gronda(building):
         building.height = building.qu_gronda - building.qu_terra
         return building.height
 
-    neighbors = [
-        b for b in all_buildings
-        if b != building and getattr(b, "island", None) == getattr(building, "island", None)
-        and b.qu_gronda not in [None, 0, 9999]
-    ]
-    if neighbors:
-        neighbors = sorted(neighbors, key=lambda b2: building.centroid.distance(b2.centroid))[:k]
-        avg_qu_gronda = np.mean([b2.qu_gronda for b2 in neighbors])
+    if avg_qu_gronda is not None:
         building.height = 0
         return round(avg_qu_gronda - building.qu_terra, 2)
     return 0
 
-def _compute_normalized_superficie(building, all_buildings, k):
-    """Compute normalized superficie using neighbors if missing or out of bounds."""
-    if building.superficie is not None and 0 < building.superficie < 30000:
-        return building.superficie
-    neighbors = [b for b in all_buildings if b != building and b.superficie is not None and 0 < b.superficie < 30000]
-    if neighbors:
-        neighbors = sorted(neighbors, key=lambda b2: building.centroid.distance(b2.centroid))[:k]
-        return round(np.mean([b2.superficie for b2 in neighbors]), 2)
-    return 0
-
 # ------------------------------------------------------------
 # NON-RESIDENTIAL (NR) INFO
 # ------------------------------------------------------------
 
-def is_full_nr(tipofun, specfun, dest, tp_cls, has_hotel, pop21, abi21, edi21):
-    """
-    Determine if a building is fully non-residential (NR) based on multiple criteria.
-    Returns (bool, list of reasons).
-    """
-    reasons = []
-    if specfun not in ("0", "00", ""):
-        reasons.append(f"specfun={specfun} not in ('0','00','')")
-    if tipofun and tipofun not in ("0", "SP15", "SP16", "SP17"):
-        reasons.append(f"tipofun={tipofun} triggers full NR (not 0/SP15/SP16/SP17)")
-    if tp_cls and tp_cls in ("SU", "SM"):
-        reasons.append(f"tp_cls={tp_cls} triggers full NR (not SU/SM)")
-    if has_hotel:
-        reasons.append("has_hotel=True")
-    if dest not in ("H", "xx"):
-        reasons.append(f"dest={dest} not in ('H','xx')")
-    if any(x == 0 for x in (pop21, abi21, edi21)):
-        pop_str = f"pop21={pop21}, abi21={abi21}, edi21={edi21}"
-        reasons.append(f"one of population fields is 0 ({pop_str})")
-    return len(reasons) > 0, reasons
+# Reasons a building is fully non-residential, one bit each in Building.nr_reasons
+NR_SPECFUN = 1 << 0
+NR_TIPOFUN = 1 << 1
+NR_TP_CLS = 1 << 2
+NR_HOTEL = 1 << 3
+NR_DEST = 1 << 4
+NR_ZERO_CENSUS = 1 << 5
+NR_UNINHABITED = 1 << 6
+
+NR_REASON_LABELS = {
+    NR_SPECFUN: "specfun not in ('0','00','')",
+    NR_TIPOFUN: "tipofun triggers full NR (not 0/SP15/SP16/SP17)",
+    NR_TP_CLS: "tp_cls triggers full NR (SU/SM)",
+    NR_HOTEL: "has_hotel=True",
+    NR_DEST: "dest not in ('H','xx')",
+    NR_ZERO_CENSUS: "one of population fields is 0 (pop21, abi21, edi21)",
+    NR_UNINHABITED: "listed in Uninhabited CSV",
+}
+
+def decode_nr_reasons(mask):
+    """Labels of the NR reasons set in a nr_reasons bitmask (empty for residential buildings)."""
+    return [label for bit, label in NR_REASON_LABELS.items() if mask & bit]
+
+def _truthy(values):
+    return np.fromiter((bool(v) for v in values), dtype=bool, count=len(values))
+
+def full_nr_reasons(tipofun, specfun, dest, tp_cls, has_hotel, pop21, abi21, edi21):
+    """
+    NR reason bitmask for every building from aligned per-building arrays
+    (census values are the building's tract totals). Non-zero means fully non-residential.
+    """
+    tipofun, specfun, dest, tp_cls = (pd.Series(v, dtype=object) for v in (tipofun, specfun, dest, tp_cls))
+    zero_census = pd.Series(pop21, dtype=object).eq(0) | pd.Series(abi21, dtype=object).eq(0) | pd.Series(edi21, dtype=object).eq(0)
+
+    rules = [
+        (NR_SPECFUN, ~specfun.isin(["0", "00", ""])),
+        (NR_TIPOFUN, _truthy(tipofun) & ~tipofun.isin(["0", "SP15", "SP16", "SP17"])),
+        (NR_TP_CLS, tp_cls.isin(["SU", "SM"])),
+        (NR_HOTEL, _truthy(has_hotel)),
+        (NR_DEST, ~dest.isin(["H", "xx"])),
+        (NR_ZERO_CENSUS, zero_census),
+    ]
+    mask = np.zeros(len(specfun), dtype=np.int64)
+    for bit, hit in rules:
+        mask[np.asarray(hit, dtype=bool)] |= bit
+    return mask
 
 def attach_nr_info(ds):
     """
-    Attach non-residential info and measured/survey flags to all buildings.
+    Attach non-residential info and measured/survey flags to all buildings,
+    computed column-wise for the whole city.
     """
-    unit_info_df = pd.read_csv(UNIT_INFO_CSV)
-    survey_df = pd.read_csv(FILTERED_SURVEY_CSV)
-    field_df = pd.read_csv(TOTAL_FIELDWORK_CSV)
-    uninhabited_df = pd.read_csv(UNINHABITED_CSV)
+    unit_info_df, survey_df, field_df, uninhabited_df = read_csvs(
+        UNIT_INFO_CSV, FILTERED_SURVEY_CSV, TOTAL_FIELDWORK_CSV, UNINHABITED_CSV
+    )
 
     uninhabited_aliases = set(uninhabited_df["full_alias"].astype(str).str.upper().str.strip())
-    unit_info_df["short_alias"] = unit_info_df["short_alias"].str.upper()
-    survey_df["short_alias"] = survey_df["short_alias"].str.upper()
-    field_df["short_alias"] = field_df["short_alias"].str.upper()
-
-    units_str_map = dict(zip(unit_info_df["short_alias"], unit_info_df.get("num_strs", [0]*len(unit_info_df))))
-    units_empty_map = dict(zip(unit_info_df["short_alias"], unit_info_df.get("num_zero_consumption_meters", [0]*len(unit_info_df))))
-    measured_map = dict(zip(field_df["short_alias"], field_df.get("Measured Height", [np.nan]*len(field_df))))
-    surveyed_set = set(survey_df["short_alias"])
-
-    all_tracts = [t for s in ds.venice.sestieri for isl in s.islands for t in isl.tracts]
-
-    for t in all_tracts:
-        for b in t.buildings:
-            sha = (b.short_alias or "").strip().upper()
-            fa = (b.full_alias or "").strip().upper()
-
-            b.units_str = int(units_str_map.get(sha, 0))
-            b.units_empty = int(units_empty_map.get(sha, 0))
-            b.measured = pd.notna(measured_map.get(sha, None))
-            b.surveyed = sha in surveyed_set
-
-            nr_flag, nr_reasons = is_full_nr(b.tipo_fun, b.spec_fun, b.dest_pt_an, b.tp_cls, b.has_hotel, t.pop21, t.abi21, t.edi21)
-            csv_flag = fa in uninhabited_aliases
-            if csv_flag:
-                nr_reasons.append("listed in Uninhabited CSV")
-            b.full_nr = nr_flag or csv_flag
+    unit_aliases = unit_info_df["short_alias"].str.upper()
+    field_aliases = field_df["short_alias"].str.upper()
+
+    units_str_map = dict(zip(unit_aliases, unit_info_df.get("num_strs", [0]*len(unit_info_df))))
+    units_empty_map = dict(zip(unit_aliases, unit_info_df.get("num_zero_consumption_meters", [0]*len(unit_info_df))))
+    measured_map = dict(zip(field_aliases, field_df.get("Measured Height", [np.nan]*len(field_df))))
+    surveyed_set = set(survey_df["short_alias"].str.upper())
+
+    buildings, census = [], []
+    for t in ds.tracts:
+        buildings.extend(t.buildings)
+        census.extend([(t.pop21, t.abi21, t.edi21)] * len(t.buildings))
+    pop21, abi21, edi21 = (list(v) for v in zip(*census)) if census else ([], [], [])
+
+    sha = pd.Series(column_values(buildings, "short_alias"), dtype=object).fillna("").str.strip().str.upper()
+    fa = pd.Series(column_values(buildings, "full_alias"), dtype=object).fillna("").str.strip().str.upper()
+
+    set_column_values(buildings, "units_str", sha.map(units_str_map).fillna(0).to_numpy(dtype=np.int64))
+    set_column_values(buildings, "units_empty", sha.map(units_empty_map).fillna(0).to_numpy(dtype=np.int64))
+    set_column_values(buildings, "measured", sha.map(measured_map).notna().to_numpy())
+    set_column_values(buildings, "surveyed", sha.isin(surveyed_set).to_numpy())
+
+    reasons = full_nr_reasons(
+        column_values(buildings, "tipo_fun"), column_values(buildings, "spec_fun"),
+        column_values(buildings, "dest_pt_an"), column_values(buildings, "tp_cls"),
+        column_values(buildings, "has_hotel"), pop21, abi21, edi21,
+    )
+    reasons[fa.isin(uninhabited_aliases).to_numpy()] |= NR_UNINHABITED
+    set_column_values(buildings, "nr_reasons", reasons)
+    set_column_values(buildings, "full_nr", reasons != 0)
 
 # ------------------------------------------------------------
 # ESTIMATION V4
 # ------------------------------------------------------------
 
-def estimation_v4(ds, islands=None, debug=False):
+def estimation_v4(ds, islands=None, debug=False, ratio_neighbors=RATIO_NEIGHBORS, audit_formats=AUDIT_FORMATS, jobs=1, incremental=False, report=None):
     """
-    Main function to compute building floor, unit, NR allocations and produce audit CSV.
+    Main function to compute building floor, unit, NR allocations and produce audit outputs.
+    ratio_neighbors > 1 borrows meter ratios from that many metered neighbours,
+    weighted by inverse distance, instead of the single nearest one.
+    audit_formats picks the outputs written (keys of AUDIT_PATHS).
+    jobs > 1 runs the per-building and per-tract stages in a process pool, one task per
+    island partition; results are identical to jobs=1.
+    incremental re-estimates only buildings whose inputs changed since the last incremental
+    run (plus every building of their tracts) and restores the rest from ESTIMATES_STATE.
+    report (an instrumentation.RunReport) records wall/CPU time, memory and item counts
+    per stage; the caller saves it.
     """
-    print("[STEP] Attaching NR info")
-    attach_nr_info(ds)
-
-    all_buildings = _get_all_buildings(ds, islands)
-    print(f"[INFO] Total buildings to process: {len(all_buildings)}")
-
-    bcsv, meter_df, linreg_df, linreg_map = _load_csvs()
-    _assign_building_types(all_buildings, bcsv)
-    _compute_building_metrics(all_buildings, linreg_df, linreg_map, meter_df, debug)
-    _allocate_units_and_population(all_buildings, bcsv)
-    idx_rtree, building_map = _build_meter_index(all_buildings, meter_df)
-    _assign_proportional_units(all_buildings, idx_rtree, building_map)
-    _build_audit_csv(all_buildings)
+    with activate(report):
+        print("[STEP] Attaching NR info")
+        with stage("attach_nr_info", len(ds.buildings)):
+            attach_nr_info(ds)
+
+        all_buildings = _get_all_buildings(ds, islands)
+        print(f"[INFO] Total buildings to process: {len(all_buildings)}")
+        if report is not None:
+            report.meta.update({
+                "islands": sorted(islands) if islands else None,
+                "buildings": len(all_buildings),
+                "jobs": jobs,
+                "incremental": incremental,
+            })
+        with stage("materialize_centroids", len(all_buildings)):
+            ds.materialize_centroids(all_buildings)
+
+        with stage("_load_csvs") as record:
+            bcsv, meter_df, linreg_df, linreg_map = _load_csvs()
+            record["items"] = len(bcsv) + len(meter_df) + len(linreg_df)
+        with stage("_assign_building_types", len(all_buildings)):
+            _assign_building_types(all_buildings, bcsv)
+        inputs = _city_inputs(all_buildings, meter_df, ratio_neighbors)
+        if incremental:
+            _estimate_incremental(all_buildings, bcsv, linreg_df, linreg_map, inputs, ratio_neighbors, jobs, debug)
+        else:
+            _estimate(all_buildings, bcsv, linreg_df, linreg_map, inputs, jobs, debug)
+        with stage("_build_audit_outputs", len(all_buildings)):
+            _build_audit_outputs(all_buildings, audit_formats)
 
     return ds
 
@@ -182,55 +269,323 @@ def estimation_v4(ds, islands=None, debug=False):
 # ------------------------------------------------------------
 
 def _get_all_buildings(ds, islands):
-    """Flatten all buildings in dataset, optionally filtering by islands."""
-    buildings = []
-    for s in ds.venice.sestieri:
-        for i in s.islands:
-            if islands and not any(i.code.startswith(isl) for isl in islands):
-                continue
-            for t in i.tracts:
-                buildings.extend(t.buildings)
-    return buildings
+    """All buildings in dataset, optionally filtering by island code prefixes."""
+    return ds.buildings_on_islands(islands)
 
 def _load_csvs():
     """Load CSV files and build linear regression map."""
-    bcsv = pd.read_csv(FILTERED_CSV)
-    meter_df = pd.read_csv(FILTERED_WATER_CSV)
-    linreg_df = pd.read_csv(LIN_REG_CSV)
+    bcsv, meter_df, linreg_df = read_csvs(FILTERED_CSV, FILTERED_WATER_CSV, LIN_REG_CSV)
     linreg_map = {row["TP_CLS_ED"]: row for _, row in linreg_df.iterrows()}
     return bcsv, meter_df, linreg_df, linreg_map
 
 def _assign_building_types(all_buildings, bcsv):
-    """Assign building type from CSV lookup."""
-    bcsv_by_id = bcsv.set_index("TARGET_FID_12_13")
-    for idx, b in enumerate(all_buildings, 1):
-        b.tp_cls = bcsv_by_id.loc[b.id].get("TP_CLS_ED", "unknown") if b.id in bcsv_by_id.index else "unknown"
-        if idx % 100 == 0 or idx == len(all_buildings):
-            print(f"[PROGRESS] Assigned type to {idx}/{len(all_buildings)} buildings")
+    """Assign building type from CSV lookup with a single merge on building id."""
+    ids = pd.DataFrame({"TARGET_FID_12_13": column_values(all_buildings, "id").astype(np.int64)})
+    types = bcsv[["TARGET_FID_12_13", "TP_CLS_ED"]].drop_duplicates("TARGET_FID_12_13")
+    merged = ids.merge(types, on="TARGET_FID_12_13", how="left", indicator=True)
+    tp_cls = merged["TP_CLS_ED"].astype(object).where(merged["_merge"] == "both", "unknown")
+    set_column_values(all_buildings, "tp_cls", tp_cls.to_numpy(dtype=object))
+    print(f"[PROGRESS] Assigned type to {len(all_buildings)} buildings")
+
+# ------------------------------------------------------------
+# City-wide inputs and partitioned estimation
+# ------------------------------------------------------------
+
+# Columns shipped to and from worker processes (geometry and addresses stay in the parent)
+PARTITION_COLUMNS = [name for name in Building.COLUMNS if name not in ("addresses", "geometry", "centroid", "raw_geometry")]
+
+def _city_inputs(all_buildings, meter_df, ratio_neighbors=RATIO_NEIGHBORS):
+    """
+    Inputs that need the whole city: neighbour imputation of qu_gronda and superficie,
+    meter units per building, meter counts and the ratios unmetered buildings borrow.
+    Returns (avg_qu_gronda, norm_superficie, units_meters, ratios), aligned with all_buildings.
+    """
+    with stage("impute_neighbours", len(all_buildings)):
+        avg_qu_gronda = impute_qu_gronda(all_buildings, K_NEIGHBORS)
+        norm_superficie = normalized_superficie(all_buildings, K_NEIGHBORS)
+    with stage("meter_units", len(all_buildings)):
+        units_by_address = meter_units_by_address(meter_df)
+        units_meters = np.array([calc_units_from_meter_data(b, units_by_address) for b in all_buildings], dtype=np.int64)
+    with stage("_build_meter_index", len(all_buildings)):
+        idx_rtree, building_map = _build_meter_index(all_buildings, meter_table(meter_df))
+    with stage("_borrowed_ratios", len(all_buildings)):
+        ratios = _borrowed_ratios(all_buildings, idx_rtree, building_map, ratio_neighbors)
+    return avg_qu_gronda, norm_superficie, units_meters, ratios
+
+def _estimate(buildings, bcsv, linreg_df, linreg_map, inputs, jobs=1, debug=False):
+    """Run the partition stages over buildings, in a process pool when jobs > 1."""
+    if jobs > 1:
+        with stage("_estimate_partitions", len(buildings)):
+            _estimate_partitions(buildings, bcsv, linreg_df, linreg_map, inputs, jobs, debug)
+    else:
+        _estimate_partition(buildings, bcsv, linreg_df, linreg_map, *inputs, debug=debug)
+
+def _estimate_partition(buildings, bcsv, linreg_df, linreg_map, avg_qu_gronda, norm_superficie, units_meters, ratios, debug=False):
+    """Per-building and per-tract stages for a set of buildings holding whole SEZ21 tracts."""
+    with stage("_compute_building_metrics", len(buildings)):
+        _compute_building_metrics(buildings, linreg_df, linreg_map, avg_qu_gronda, norm_superficie, units_meters, debug)
+    with stage("_allocate_units_and_population", len(buildings)):
+        _allocate_units_and_population(buildings, bcsv)
+    with stage("_assign_proportional_units", len(buildings)):
+        _assign_proportional_units(buildings, ratios)
+
+def _estimate_partition_table(table, trace_memory, *args):
+    """
+    Process pool entry point: run the partition stages over a BuildingTable slice and
+    return it with the worker's stage records (None when trace_memory is None, i.e. the
+    parent is not recording a report).
+    """
+    report = RunReport("partition", trace_memory) if trace_memory is not None else None
+    with activate(report):
+        _estimate_partition([table.building(row) for row in range(len(table))], *args)
+    return table, report.records() if report else None
+
+def _building_tracts(all_buildings, bcsv):
+    """Building ids and the SEZ21 each one is apportioned in (None when missing from the CSV)."""
+    ids = column_values(all_buildings, "id").astype(np.int64)
+    tract_of = bcsv.drop_duplicates("TARGET_FID_12_13").set_index("TARGET_FID_12_13")["SEZ21"].astype(object)
+    tracts = pd.Series(ids).map(tract_of).astype(object)
+    return ids, tracts.where(tracts.notna(), None).to_numpy(dtype=object)
+
+def _partitions(all_buildings, tracts):
+    """
+    Positions in all_buildings grouped by island, merging islands that share a SEZ21 tract
+    so each tract is apportioned within a single partition. Order follows all_buildings.
+    """
+    parent = {}
+
+    def find(key):
+        parent.setdefault(key, key)
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    islands = [("island", island) for island in column_values(all_buildings, "island")]
+    for island, tract in zip(islands, tracts):
+        if tract is not None:
+            parent[find(island)] = find(("tract", tract))
+
+    groups = {}
+    for i, island in enumerate(islands):
+        groups.setdefault(find(island), []).append(i)
+    return [np.asarray(rows, dtype=np.int64) for rows in groups.values()]
+
+def _estimate_partitions(all_buildings, bcsv, linreg_df, linreg_map, inputs, jobs, debug=False):
+    """
+    Run _estimate_partition for every island partition in a process pool and write the
+    results back into the buildings' table. Each partition only depends on its own rows,
+    so the output does not depend on the number of workers.
+    """
+    table = all_buildings[0]._table if all_buildings else None
+    if any(b._table is not table for b in all_buildings):
+        raise ValueError("❌ Parallel estimation needs buildings from a single Dataset")
+    avg_qu_gronda, norm_superficie, units_meters, ratios = inputs
+
+    ids, tracts = _building_tracts(all_buildings, bcsv)
+    partitions = _partitions(all_buildings, tracts)
+    rows = np.array([b._row for b in all_buildings], dtype=np.int64)
+    print(f"[INFO] Estimating {len(partitions)} island partitions with {jobs} processes")
+    report = active_report()
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = []
+        for part in partitions:
+            part_bcsv = bcsv[bcsv["TARGET_FID_12_13"].isin(ids[part]) | bcsv["SEZ21"].isin(tracts[part])]
+            futures.append(pool.submit(
+                _estimate_partition_table, table.take(rows[part], PARTITION_COLUMNS),
+                None if report is None else report.trace_memory, part_bcsv,
+                linreg_df, linreg_map, [avg_qu_gronda[i] for i in part], [norm_superficie[i] for i in part],
+                units_meters[part], ratios[part], debug,
+            ))
+        for part, future in zip(partitions, futures):
+            result, records = future.result()
+            table.put(rows[part], result, PARTITION_COLUMNS)
+            if records:
+                report.merge(records)
+
+# ------------------------------------------------------------
+# Incremental re-estimation
+# ------------------------------------------------------------
+
+# Building columns fingerprinted per input group; every other PARTITION_COLUMNS entry
+# counts as a "building" input. Addresses, the floor model and the city-wide inputs are
+# fingerprinted alongside (see _input_fingerprints).
+INPUT_GROUPS = {
+    "fieldwork": ["units_str", "units_empty", "measured", "surveyed", "nr_reasons", "full_nr"],
+    "meters": METER_COLUMNS + ["_meter_total"],
+}
+BUILDING_INPUT_COLUMNS = [name for name in PARTITION_COLUMNS if not any(name in cols for cols in INPUT_GROUPS.values())]
+FINGERPRINT_GROUPS = ["building", "addresses", "meters", "linreg", "fieldwork"]
+
+def _fingerprint(rows) -> np.ndarray:
+    """64-bit digest of each row tuple (NumPy scalars hashed as the Python values they hold)."""
+    digests = np.empty(len(rows), dtype=np.uint64)
+    for i, row in enumerate(rows):
+        text = repr(tuple(v.item() if isinstance(v, np.generic) else v for v in row))
+        digests[i] = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+    return digests
+
+def _input_fingerprints(all_buildings, tracts, linreg_df, linreg_map, inputs) -> dict:
+    """
+    Fingerprint per building and input group (FINGERPRINT_GROUPS) of everything the
+    partition stages read, taken before they run.
+    """
+    avg_qu_gronda, norm_superficie, units_meters, ratios = inputs
+    fallback = linreg_df.iloc[-1]
+
+    def columns(names):
+        return list(zip(*(column_values(all_buildings, name) for name in names)))
+
+    return {
+        "building": _fingerprint([
+            row + (tract, avg, norm)
+            for row, tract, avg, norm in zip(columns(BUILDING_INPUT_COLUMNS), tracts, avg_qu_gronda, norm_superficie)
+        ]),
+        "addresses": _fingerprint([tuple(a.address for a in b.addresses) for b in all_buildings]),
+        "meters": _fingerprint([
+            row + (units,) + tuple(ratio)
+            for row, units, ratio in zip(columns(INPUT_GROUPS["meters"]), units_meters.tolist(), ratios.tolist())
+        ]),
+        "linreg": _fingerprint([_floor_model(linreg_map, fallback, tp_cls) for tp_cls in column_values(all_buildings, "tp_cls")]),
+        "fieldwork": _fingerprint(columns(INPUT_GROUPS["fieldwork"])),
+    }
+
+def _tract_keys(tracts) -> np.ndarray:
+    """SEZ21 codes as strings, as kept in the state file ("" for none)."""
+    return np.array(["" if t is None else str(t) for t in tracts], dtype=str)
+
+def _tract_fingerprints(bcsv):
+    """SEZ21 keys and a fingerprint of the census totals each tract is apportioned against."""
+    totals = bcsv[["SEZ21", "POP21", "ABI21"]].drop_duplicates("SEZ21")
+    totals = totals[totals["SEZ21"].notna()]
+    return _tract_keys(totals["SEZ21"].astype(object)), _fingerprint(list(totals[["POP21", "ABI21"]].itertuples(index=False, name=None)))
+
+def _state_key(ratio_neighbors) -> str:
+    """Settings and estimation code a saved state is only valid for."""
+    settings = f"{K_NEIGHBORS}|{EMPTY_UNIT_CUTOFF}|{ALPHA_MERGE}|{ratio_neighbors}"
+    code = [Path(__file__), Path(__file__).with_name("apportion.py"), Path(__file__).with_name("imputation.py")]
+    return hash_files(code, extra=settings)
+
+def _stale_buildings(ids, tract_keys, fingerprints, tract_fingerprints, previous):
+    """
+    Mask of buildings to re-estimate against the previous state: new buildings or ones with
+    a changed input group, plus every building of a tract that gained, lost or changed a
+    building or whose census totals changed. Prints what changed.
+    """
+    prev_ids = previous["ids"].tolist()
+    prev_pos = {building_id: i for i, building_id in enumerate(prev_ids)}
+    prev_tracts = previous["tracts"].tolist()
+    matched = np.array([prev_pos.get(building_id, -1) for building_id in ids.tolist()], dtype=np.int64)
+    known = matched >= 0
+
+    changed = ~known
+    counts = {}
+    for group in FINGERPRINT_GROUPS:
+        differs = known.copy()
+        differs[known] = fingerprints[group][known] != previous[f"fp.{group}"][matched[known]]
+        counts[group] = int(differs.sum())
+        changed |= differs
+
+    removed = sorted(set(range(len(prev_ids))) - set(matched[known].tolist()))
+    tract_ids, tract_fps = tract_fingerprints
+    prev_tract_fps = dict(zip(previous["tract_ids"].tolist(), previous["tract_fps"].tolist()))
+    dirty_tracts = {t for t, fp in zip(tract_ids.tolist(), tract_fps.tolist()) if prev_tract_fps.get(t) != fp}
+    dirty_tracts.update(tract_keys[changed].tolist())
+    dirty_tracts.update(prev_tracts[matched[i]] for i in np.flatnonzero(changed & known).tolist())
+    dirty_tracts.update(prev_tracts[i] for i in removed)
+    dirty_tracts.discard("")
+
+    stale = changed | np.isin(tract_keys, list(dirty_tracts))
+    details = ", ".join(f"{group} {count}" for group, count in counts.items() if count)
+    print(f"[INFO] Incremental: {int(changed.sum())} changed buildings ({int((~known).sum())} new"
+          f"{', ' + details if details else ''}), {len(removed)} removed, {len(dirty_tracts)} tracts to re-apportion")
+    return stale
+
+def _estimate_incremental(all_buildings, bcsv, linreg_df, linreg_map, inputs, ratio_neighbors, jobs=1, debug=False, state_path=ESTIMATES_STATE):
+    """
+    Re-estimate only stale buildings (see _stale_buildings) and restore the others'
+    columns from the previous run's state; the outputs match a full run. Falls back to a
+    full run without a usable state, then saves the new state for the next run.
+    """
+    table = all_buildings[0]._table if all_buildings else None
+    if any(b._table is not table for b in all_buildings):
+        raise ValueError("❌ Incremental estimation needs buildings from a single Dataset")
+
+    ids, tracts = _building_tracts(all_buildings, bcsv)
+    with stage("_input_fingerprints", len(all_buildings)):
+        fingerprints = _input_fingerprints(all_buildings, tracts, linreg_df, linreg_map, inputs)
+        tract_fingerprints = _tract_fingerprints(bcsv)
+    key = _state_key(ratio_neighbors)
+    rows = np.array([b._row for b in all_buildings], dtype=np.int64)
+
+    previous = None
+    if Path(state_path).exists():
+        with stage("load_state"):
+            state_table, previous = load_columns(state_path)
+        if str(previous["key"][0]) != key:
+            print("[INFO] Estimation settings or code changed, running a full estimation")
+            previous = None
+
+    if previous is None:
+        _estimate(all_buildings, bcsv, linreg_df, linreg_map, inputs, jobs, debug)
+    else:
+        stale = _stale_buildings(ids, _tract_keys(tracts), fingerprints, tract_fingerprints, previous)
+        clean = np.flatnonzero(~stale)
+        prev_pos = {building_id: i for i, building_id in enumerate(previous["ids"].tolist())}
+        with stage("restore_state", len(clean)):
+            table.put(rows[clean], state_table.take([prev_pos[i] for i in ids[clean].tolist()], PARTITION_COLUMNS), PARTITION_COLUMNS)
+
+        positions = np.flatnonzero(stale)
+        print(f"[INFO] Re-estimating {len(positions)}/{len(all_buildings)} buildings")
+        avg_qu_gronda, norm_superficie, units_meters, ratios = inputs
+        stale_inputs = (
+            [avg_qu_gronda[i] for i in positions], [norm_superficie[i] for i in positions],
+            units_meters[positions], ratios[positions],
+        )
+        if len(positions):
+            _estimate([all_buildings[i] for i in positions], bcsv, linreg_df, linreg_map, stale_inputs, jobs, debug)
+
+    tract_ids, tract_fps = tract_fingerprints
+    arrays = {
+        "key": np.array([key]),
+        "ids": ids,
+        "tract_ids": tract_ids,
+        "tract_fps": tract_fps,
+        "tracts": _tract_keys(tracts),
+        **{f"fp.{group}": fingerprints[group] for group in FINGERPRINT_GROUPS},
+    }
+    with stage("save_state", len(all_buildings)):
+        save_columns(table.take(rows, PARTITION_COLUMNS), PARTITION_COLUMNS, state_path, arrays)
+    print(f"✅ Estimation state saved to {state_path}")
 
 # ------------------------------------------------------------
 # Compute building metrics: normalized height, superficie, floors, units, liveable space
 # ------------------------------------------------------------
-def _compute_building_metrics(all_buildings, linreg_df, linreg_map, meter_df, debug=False):
+def _floor_model(linreg_map, fallback, tp_cls):
+    """(m_qu, b_qu, ground_floor_qu) of the type's regression, or fallback's with fewer than 10 samples."""
+    row = linreg_map.get(tp_cls)
+    model = row if row is not None and row.get("qu_count", 0) >= 10 else fallback
+    return float(model.get("m_qu")), float(model.get("b_qu")), float(model.get("ground_floor_qu", 2.0))
+
+def _compute_building_metrics(all_buildings, linreg_df, linreg_map, avg_qu_gronda, norm_superficie, units_meters, debug=False):
     """
     Compute building metrics: normalized height, floors estimation, units from meters,
-    liveable space.
+    liveable space. The neighbour imputations and meter units come from _city_inputs.
     """
+    fallback = linreg_df.iloc[-1]
+
     for idx, b in enumerate(all_buildings, 1):
-        set_normalized_height_and_superficie(b, all_buildings, debug=debug)
+        set_normalized_height_and_superficie(b, avg_qu_gronda[idx - 1], norm_superficie[idx - 1], debug=debug)
 
         # Floors estimation
-        row = linreg_map.get(b.tp_cls)
-        model = row if row is not None and row.get("qu_count", 0) >= 10 else linreg_df.iloc[-1]
-        m_qu = model.get("m_qu")
-        b_qu = model.get("b_qu")
-        gf_qu = model.get("ground_floor_qu", 2.0)
+        m_qu, b_qu, gf_qu = _floor_model(linreg_map, fallback, b.tp_cls)
 
         b.floors_est = max(1, int(round(m_qu * (b.normalized_height or 0) + b_qu)))
         b.ground_floor_height = gf_qu
         b.upper_floors_height = (b.normalized_height or 0) - b.ground_floor_height
 
-        b.units_est_meters = calc_units_from_meter_data(b, meter_df)
+        b.units_est_meters = int(units_meters[idx - 1])
         b.liveable_space = max(0, (b.floors_est - 1) * (b.normalized_superficie or 0))
 
         if idx % 50 == 0 or idx == len(all_buildings):
@@ -242,279 +597,323 @@ def _compute_building_metrics(all_buildings, linreg_df, linreg_map, meter_df, de
 def _allocate_units_and_population(all_buildings, bcsv):
     """
     Allocate population and units per tract based on liveable space,
-    considering NR and RES buildings.
-    """
-    bcsv_by_id = bcsv.set_index("TARGET_FID_12_13")
-    bcsv_by_tract = bcsv.set_index("SEZ21")
-
-    tract_map = {}
-    for b in all_buildings:
-        if b.id in bcsv_by_id.index:
-            tract_id = bcsv_by_id.loc[b.id].get("SEZ21")
-            tract_map.setdefault(tract_id, []).append(b)
-
-    for tract_id, buildings in tract_map.items():
-        # Tract totals
-        if tract_id in bcsv_by_tract.index:
-            row = bcsv_by_tract.loc[tract_id]
-            if isinstance(row, pd.DataFrame):
-                row = row.iloc[0]
-            pop_total = int(row.get("POP21", 0))
-            unit_total = int(row.get("ABI21", 0))
-        else:
-            pop_total = 0
-            unit_total = 0
-
-        nr_buildings = [b for b in buildings if getattr(b, "full_nr", False)]
-        res_buildings = [b for b in buildings if not getattr(b, "full_nr", False)]
-
-        # NR buildings get zero residential allocation
-        for b in nr_buildings:
-            b.pop_est = 0
-            b.units_est_volume = 0
-            b.units_est_merged = 0
-            b.units_est_meters = 0
-
-        if not res_buildings:
-            continue
-
-        total_liveable = sum(b.liveable_space or 0 for b in res_buildings)
-        if total_liveable == 0:
-            for b in res_buildings:
-                b.pop_est = 0
-                b.units_est_volume = 0
-                b.units_est_merged = 0
-            continue
-
-        # Population allocation
-        raw_pop = [(b, (b.liveable_space / total_liveable) * pop_total) for b in res_buildings]
-        for b, v in raw_pop:
-            b.pop_est = int(v)
-        remainder_pop = pop_total - sum(b.pop_est for b, _ in raw_pop)
-        frac_pop = sorted(raw_pop, key=lambda x: (x[1] - int(x[1])), reverse=True)
-        for i in range(remainder_pop):
-            frac_pop[i % len(frac_pop)][0].pop_est += 1
-
-        # Volume units allocation
-        raw_units = [(b, (b.liveable_space / total_liveable) * unit_total) for b in res_buildings]
-        for b, v in raw_units:
-            b.units_est_volume = int(v)
-        remainder_units = unit_total - sum(b.units_est_volume for b, _ in raw_units)
-        frac_units = sorted(raw_units, key=lambda x: (x[1] - int(x[1])), reverse=True)
-        for i in range(remainder_units):
-            frac_units[i % len(frac_units)][0].units_est_volume += 1
-
-        # Merged units allocation
-        raw_merged = [(b, ALPHA_MERGE * b.units_est_meters + (1 - ALPHA_MERGE) * b.units_est_volume) for b in res_buildings]
-        for b, v in raw_merged:
-            b.units_est_merged = int(v)
-        remainder_merged = unit_total - sum(b.units_est_merged for b, _ in raw_merged)
-        frac_merged = sorted(raw_merged, key=lambda x: (x[1] - int(x[1])), reverse=True)
-        for i in range(remainder_merged):
-            frac_merged[i % len(frac_merged)][0].units_est_merged += 1
+    considering NR and RES buildings. All tracts are apportioned together.
+    """
+    ids = pd.DataFrame({"TARGET_FID_12_13": column_values(all_buildings, "id").astype(np.int64)})
+    tract_of = bcsv[["TARGET_FID_12_13", "SEZ21"]].drop_duplicates("TARGET_FID_12_13")
+    tract_totals = bcsv[["SEZ21", "POP21", "ABI21"]].drop_duplicates("SEZ21")
+    frame = ids.merge(tract_of, on="TARGET_FID_12_13", how="left", indicator=True)
+    in_csv = (frame["_merge"] == "both").to_numpy()
+    frame = frame[in_csv].merge(tract_totals, on="SEZ21", how="left")
+
+    buildings = [all_buildings[i] for i in np.flatnonzero(in_csv)]
+    tracts, tract_ids = pd.factorize(frame["SEZ21"], use_na_sentinel=False)
+    n_tracts = len(tract_ids)
+    pop_total = np.zeros(n_tracts, dtype=np.int64)
+    unit_total = np.zeros(n_tracts, dtype=np.int64)
+    pop_total[tracts] = frame["POP21"].fillna(0).to_numpy(dtype=np.int64)
+    unit_total[tracts] = frame["ABI21"].fillna(0).to_numpy(dtype=np.int64)
+
+    # NR buildings get zero residential allocation
+    full_nr = np.array([bool(v) for v in column_values(buildings, "full_nr")], dtype=bool)
+    nr_buildings = [b for b, nr in zip(buildings, full_nr) if nr]
+    for name in ("pop_est", "units_est_volume", "units_est_merged", "units_est_meters"):
+        set_column_values(nr_buildings, name, np.zeros(len(nr_buildings), dtype=np.int64))
+
+    res_buildings = [b for b, nr in zip(buildings, full_nr) if not nr]
+    tracts = tracts[~full_nr]
+    liveable = np.array([v or 0 for v in column_values(res_buildings, "liveable_space")], dtype=np.float64)
+    total_liveable = np.bincount(tracts, weights=liveable, minlength=n_tracts)[tracts]
+    allocated = total_liveable != 0
+
+    # Population and volume units, then merged units from the allocated volume units
+    share = np.divide(liveable, total_liveable, out=np.zeros_like(liveable), where=allocated)
+    quotas = np.column_stack([share * pop_total[tracts], share * unit_total[tracts]])[allocated]
+    pop_volume = np.zeros((len(res_buildings), 2), dtype=np.int64)
+    pop_volume[allocated] = largest_remainder(quotas, tracts[allocated], np.column_stack([pop_total, unit_total]))
+
+    meters = np.array([v or 0 for v in column_values(res_buildings, "units_est_meters")], dtype=np.int64)
+    merged_quotas = ALPHA_MERGE * meters + (1 - ALPHA_MERGE) * pop_volume[:, 1]
+    merged = np.zeros(len(res_buildings), dtype=np.int64)
+    merged[allocated] = largest_remainder(merged_quotas[allocated], tracts[allocated], unit_total)
+
+    set_column_values(res_buildings, "pop_est", pop_volume[:, 0])
+    set_column_values(res_buildings, "units_est_volume", pop_volume[:, 1])
+    set_column_values(res_buildings, "units_est_merged", merged)
 
 # ------------------------------------------------------------
 # Build meter index for spatial neighbor lookups
 # ------------------------------------------------------------
-def _build_meter_index(all_buildings, meter_df):
+def _build_meter_index(all_buildings, meters):
     """
-    Build spatial index (R-tree) and prepare meter lookup lists per address.
+    Build spatial index (R-tree) over metered buildings after counting each building's
+    meters (componenti) by res/NR and empty with one groupby over the meter table.
     Returns R-tree index and building map.
     """
-    meter_lists = {
-        sha.upper(): [
-            (
-                row["Consumo_medio_2024"],
-                row["Componenti"] if pd.notna(row["Componenti"]) and row["Componenti"] > 0 else 1,
-                row["Cat_Tariffa"] if pd.notna(row["Cat_Tariffa"]) else ""
-            )
-            for _, row in df.iterrows()
-        ]
-        for sha, df in meter_df.groupby("ProcessedAddress")
-    }
-
-    idx_rtree = index.Index()
-    building_map = {}
-
-    for i, b in enumerate(all_buildings):
-        merged = getattr(b, "units_est_merged", 0) or 0
-        b._merged = merged
-
-        # Count raw meters
-        m_res = m_res_empty = m_nr = m_nr_empty = 0
-        for addr in b.addresses:
-            addr_key = addr.address.upper()
-            for consumo, componenti, rate in meter_lists.get(addr_key, []):
-                comp = componenti or 1
-                rate_l = (rate or "").lower()
-                is_res = "uso domestico residente" in rate_l
-                is_empty = consumo is not None and consumo < EMPTY_UNIT_CUTOFF
-
-                if is_res:
-                    if is_empty:
-                        m_res_empty += comp
-                    else:
-                        m_res += comp
-                else:
-                    if is_empty:
-                        m_nr_empty += comp
-                    else:
-                        m_nr += comp
-
-        b._m_res = m_res
-        b._m_res_empty = m_res_empty
-        b._m_nr = m_nr
-        b._m_nr_empty = m_nr_empty
-        b._meter_total = m_res + m_res_empty + m_nr + m_nr_empty
-
-        if b._meter_total > 0:
-            x, y = b.geometry.centroid.x, b.geometry.centroid.y
-            idx_rtree.insert(i, (x, y, x, y))
-            building_map[i] = b
-
+    links = pd.DataFrame(
+        [(i, addr.address.upper()) for i, b in enumerate(all_buildings) for addr in b.addresses],
+        columns=["building", "address"],
+    )
+    linked = links.merge(meters, on="address")
+    comp = linked["componenti"]
+    res, empty = linked["is_res"], linked["is_empty"]
+    counts = pd.DataFrame({
+        "building": linked["building"],
+        "_m_res": comp.where(res & ~empty, 0),
+        "_m_res_empty": comp.where(res & empty, 0),
+        "_m_nr": comp.where(~res & ~empty, 0),
+        "_m_nr_empty": comp.where(~res & empty, 0),
+    }).groupby("building").sum().reindex(range(len(all_buildings)), fill_value=0)
+
+    for name in METER_COLUMNS:
+        set_column_values(all_buildings, name, counts[name].to_numpy(dtype=np.int64))
+    meter_total = counts[METER_COLUMNS].to_numpy(dtype=np.int64).sum(axis=1)
+    set_column_values(all_buildings, "_meter_total", meter_total)
+
+    building_map = {i: all_buildings[i] for i in np.flatnonzero(meter_total > 0).tolist()}
+
+    # Bulk-load the R-tree from a stream instead of inserting buildings one by one
+    if building_map:
+        points = _centroid_coordinates(building_map.values())
+        idx_rtree = index.Index((i, (x, y, x, y), None) for i, (x, y) in zip(building_map, points.tolist()))
+    else:
+        idx_rtree = index.Index()
     return idx_rtree, building_map
 
 # ------------------------------------------------------------
 # Assign proportional units and adjust heights/liveable space
 # ------------------------------------------------------------
-def _assign_proportional_units(all_buildings, idx_rtree, building_map):
+def _meter_matrix(buildings):
+    """Raw meter counts as an N x 4 matrix, columns in METER_COLUMNS order."""
+    return np.column_stack([np.array(column_values(buildings, name), dtype=np.float64) for name in METER_COLUMNS])
+
+def _centroid_coordinates(buildings):
+    return shapely.get_coordinates(np.array([b.centroid for b in buildings], dtype=object))
+
+def _nearest_metered(buildings, idx_rtree, building_map, k=1):
+    """
+    R-tree keys of the k nearest metered buildings for each building, from one batched query,
+    as an (n, k) array padded with -1, plus their centroid distances (inf for padding).
+    Equidistant candidates keep the R-tree's order; extra ties beyond k are dropped.
+    """
+    keys = np.full((len(buildings), k), -1, dtype=np.int64)
+    dists = np.full((len(buildings), k), np.inf)
+    if not buildings or not building_map:
+        return keys, dists
+
+    points = _centroid_coordinates(buildings)
+    ids, counts = idx_rtree.nearest_v(points, points, num_results=k)
+    starts = np.cumsum(counts) - counts
+    for i, (start, count) in enumerate(zip(starts.tolist(), counts.tolist())):
+        found = ids[start:start + min(count, k)]
+        keys[i, :len(found)] = found
+
+    found = keys >= 0
+    neighbour_points = _centroid_coordinates([building_map[key] for key in keys[found].tolist()])
+    dists[found] = np.hypot(*(neighbour_points - np.repeat(points, found.sum(axis=1), axis=0)).T)
+    return keys, dists
+
+def _neighbour_ratios(keys, dists, building_map):
+    """
+    res/res empty/NR/NR empty meter ratios (n x 4) borrowed from each row's neighbours,
+    weighted by inverse distance (neighbours at distance 0 share the weight when present).
+    With a single neighbour these are exactly its own ratios.
+    """
+    found = keys >= 0
+    flat = [building_map[key] for key in keys[found].tolist()]
+    neighbour_ratios = np.zeros(keys.shape + (4,))
+    neighbour_ratios[found] = _meter_matrix(flat) / np.array(column_values(flat, "_meter_total"), dtype=np.float64)[:, None]
+
+    with np.errstate(divide="ignore"):
+        weights = np.where(found, 1 / dists, 0.0)
+    coincident = found & (dists == 0)
+    weights = np.where(coincident.any(axis=1)[:, None], coincident.astype(np.float64), weights)
+    weights /= weights.sum(axis=1, keepdims=True)
+    return (weights[:, :, None] * neighbour_ratios).sum(axis=1)
+
+def _borrowed_ratios(all_buildings, idx_rtree, building_map, ratio_neighbors=RATIO_NEIGHBORS):
+    """
+    Meter ratios (n x 4) each unmetered building borrows from its nearest metered
+    neighbour(s), from one batched query; NaN rows for metered buildings, buildings whose
+    ratios were already applied, or when there is no metered building at all.
+    """
+    meter_total = np.array(column_values(all_buildings, "_meter_total"), dtype=np.float64)
+    applied = np.array([bool(v) for v in column_values(all_buildings, "_ratios_applied")], dtype=bool)
+    borrow = np.flatnonzero((meter_total == 0) & ~applied)
+    keys, dists = _nearest_metered([all_buildings[i] for i in borrow], idx_rtree, building_map, ratio_neighbors)
+    found = keys[:, 0] >= 0
+
+    ratios = np.full((len(all_buildings), 4), np.nan)
+    if found.any():
+        ratios[borrow[found]] = _neighbour_ratios(keys[found], dists[found], building_map)
+    return ratios
+
+def _assign_proportional_units(all_buildings, ratios):
     """
     Assign proportional units per building based on meters and merged units,
     apply NR/res/empty percentages, compute adjusted heights and liveable spaces.
+    Works on arrays: meter counts as an N x 4 matrix (res, res empty, NR, NR empty);
+    unmetered buildings use their borrowed ratios (see _borrowed_ratios).
     """
-    for idx, b in enumerate(all_buildings, 1):
-        merged = getattr(b, "_merged", 0)
-
-        if getattr(b, "has_hotel", False):
-            b.nr_pct = 1.0
-            b.nr_adj_height = b.nr_pct * b.normalized_height
-            continue
-
-        if merged == 0:
-            continue
-
-        m_res, m_res_empty, m_nr, m_nr_empty = b._m_res, b._m_res_empty, b._m_nr, b._m_nr_empty
-        meter_total = b._meter_total
-
-        # Borrow ratios from neighbor if no meters
-        if meter_total == 0 and not getattr(b, "_ratios_applied", False):
-            x, y = b.geometry.centroid.x, b.geometry.centroid.y
-            nearest_candidates = list(idx_rtree.nearest((x, y, x, y), 1))
-            if nearest_candidates:
-                neighbor = building_map[nearest_candidates[0]]
-                r_res = neighbor._m_res / neighbor._meter_total
-                r_res_empty = neighbor._m_res_empty / neighbor._meter_total
-                r_nr = neighbor._m_nr / neighbor._meter_total
-                r_nr_empty = neighbor._m_nr_empty / neighbor._meter_total
-
-                m_res = round(merged * r_res)
-                m_res_empty = round(merged * r_res_empty)
-                m_nr = round(merged * r_nr)
-                m_nr_empty = round(merged * r_nr_empty)
-
-                b._ratios_applied = True
-            meter_total = m_res + m_res_empty + m_nr + m_nr_empty
-
-        # Scale meters → proportional units
-        if meter_total == 0:
-            u_res = u_res_empty = u_nr = 0
-            u_nr_empty = merged
-        else:
-            scale = merged / meter_total
-            u_res = round(m_res * scale)
-            u_res_empty = round(m_res_empty * scale)
-            u_nr = round(m_nr * scale)
-            u_nr_empty = round(m_nr_empty * scale)
-            diff = merged - (u_res + u_res_empty + u_nr + u_nr_empty)
-            if diff != 0:
-                largest = max([("u_res", u_res), ("u_res_empty", u_res_empty), ("u_nr", u_nr), ("u_nr_empty", u_nr_empty)], key=lambda x: x[1])[0]
-                if largest == "u_res":
-                    u_res += diff
-                elif largest == "u_res_empty":
-                    u_res_empty += diff
-                elif largest == "u_nr":
-                    u_nr += diff
-                else:
-                    u_nr_empty += diff
-
-        # Assign units and percentages
-        b.units_res_primary = max(0, u_res)
-        b.units_res_empty = max(0, u_res_empty)
-        b.units_res = b.units_res_primary + b.units_res_empty
-
-        b.units_nr_secondary = max(0, u_nr)
-        b.units_nr_empty = max(0, u_nr_empty)
-        b.units_nr = b.units_est_merged - b.units_res
-
-        b.total_units = (b.units_res or 0) + (b.units_nr or 0)
-        b.res_pct = ((b.units_res or 0) / b.total_units) if b.total_units else 0.0
-        b.nr_pct = ((b.units_nr or 0) / b.total_units) if b.total_units else 0.0
-        b.empty_pct = ((b.units_res_empty or 0) + (b.units_nr_empty or 0)) / b.total_units if b.total_units else 0.0
-
-        b.res_adj_height = (b.normalized_height or 0) * b.res_pct
-        b.nr_adj_height = (b.normalized_height or 0) * b.nr_pct
-        b.empty_adj_height = (b.normalized_height or 0) * b.empty_pct
-
-        b.upperonly_res_adj_height = (b.upper_floors_height or 0) * b.res_pct
-        b.upperonly_nr_adj_height = (b.upper_floors_height or 0) * b.nr_pct
-        b.upperonly_empty_adj_height = (b.upper_floors_height or 0) * b.empty_pct
-
-        b.res_liveable_space = b.liveable_space * b.res_pct
-        b.nr_liveable_space = b.liveable_space * b.nr_pct
+    merged = np.array([v or 0 for v in column_values(all_buildings, "units_est_merged")], dtype=np.int64)
+    set_column_values(all_buildings, "_merged", merged)
+    has_hotel = np.array([bool(v) for v in column_values(all_buildings, "has_hotel")], dtype=bool)
+
+    hotels = [b for b, hotel in zip(all_buildings, has_hotel) if hotel]
+    set_column_values(hotels, "nr_pct", np.ones(len(hotels)))
+    set_column_values(hotels, "nr_adj_height", np.array(column_values(hotels, "normalized_height"), dtype=np.float64))
+
+    active = ~has_hotel & (merged != 0)
+    buildings = [b for b, keep in zip(all_buildings, active) if keep]
+    merged = merged[active]
+    ratios = np.asarray(ratios, dtype=np.float64)[active]
+    meters = _meter_matrix(buildings)
+    meter_total = meters[:, 0] + meters[:, 1] + meters[:, 2] + meters[:, 3]
+
+    # Unmetered buildings take their neighbours' ratios
+    borrow = np.flatnonzero((meter_total == 0) & ~np.isnan(ratios[:, 0]))
+    if len(borrow):
+        meters[borrow] = np.round(merged[borrow, None] * ratios[borrow])
+        meter_total[borrow] = meters[borrow, 0] + meters[borrow, 1] + meters[borrow, 2] + meters[borrow, 3]
+        set_column_values([buildings[i] for i in borrow], "_ratios_applied", np.ones(len(borrow), dtype=bool))
+
+    # Scale meters → proportional units, putting the rounding difference on the largest bucket
+    metered = meter_total != 0
+    scale = np.divide(merged, meter_total, out=np.zeros(len(merged)), where=metered)
+    units = np.round(meters * scale[:, None]).astype(np.int64)
+    rows = np.arange(len(units))
+    units[rows, np.argmax(units, axis=1)] += merged - units.sum(axis=1)
+    units[~metered] = 0
+    units[~metered, 3] = merged[~metered]
+
+    # Assign units and percentages
+    units = np.maximum(units, 0)
+    units_res = units[:, 0] + units[:, 1]
+    units_nr = np.array(column_values(buildings, "units_est_merged"), dtype=np.int64) - units_res
+    total_units = units_res + units_nr
+    has_units = total_units != 0
+    res_pct, nr_pct, empty_pct = (
+        np.divide(count, total_units, out=np.zeros(len(buildings)), where=has_units)
+        for count in (units_res, units_nr, units[:, 1] + units[:, 3])
+    )
+
+    normalized_height = np.array([v or 0 for v in column_values(buildings, "normalized_height")], dtype=np.float64)
+    upper_floors_height = np.array([v or 0 for v in column_values(buildings, "upper_floors_height")], dtype=np.float64)
+    liveable_space = np.array(column_values(buildings, "liveable_space"), dtype=np.float64)
+
+    results = {
+        "units_res_primary": units[:, 0],
+        "units_res_empty": units[:, 1],
+        "units_res": units_res,
+        "units_nr_secondary": units[:, 2],
+        "units_nr_empty": units[:, 3],
+        "units_nr": units_nr,
+        "total_units": total_units,
+        "res_pct": res_pct,
+        "nr_pct": nr_pct,
+        "empty_pct": empty_pct,
+        "res_adj_height": normalized_height * res_pct,
+        "nr_adj_height": normalized_height * nr_pct,
+        "empty_adj_height": normalized_height * empty_pct,
+        "upperonly_res_adj_height": upper_floors_height * res_pct,
+        "upperonly_nr_adj_height": upper_floors_height * nr_pct,
+        "upperonly_empty_adj_height": upper_floors_height * empty_pct,
+        "res_liveable_space": liveable_space * res_pct,
+        "nr_liveable_space": liveable_space * nr_pct,
+    }
+    for name, values in results.items():
+        set_column_values(buildings, name, values)
 
 # ------------------------------------------------------------
-# Build audit CSV
+# Build audit outputs
 # ------------------------------------------------------------
-def _build_audit_csv(all_buildings):
-    """Generate audit CSV for all buildings."""
-    audit_rows = []
-    for idx, b in enumerate(all_buildings, 1):
-        audit_rows.append({
-            "building_id": val_zero(b.id),
-            "full_alias": val_zero(getattr(b, "full_alias", None), is_number=False),
-            "short_alias": val_zero(getattr(b, "short_alias", None), is_number=False),
-            "qu_terra": val_zero(getattr(b, "qu_terra", 0)),
-            "qu_gronda": val_zero(getattr(b, "qu_gronda", 0)),
-            "tp_cls": (b.tp_cls.strip() if isinstance(b.tp_cls, str) and b.tp_cls.strip() else "none"),
-            "tipo_fun": val_zero(getattr(b, "tipo_fun", None), is_number=False),
-            "spec_fun": val_zero(getattr(b, "spec_fun", None), is_number=False),
-            "dest_pt_an": val_zero(getattr(b, "dest_pt_an", None), is_number=False),
-            "height": val_zero(getattr(b, "height", 0)),
-            "superficie": val_zero(getattr(b, "superficie", 0)),
-            "normalized_height": val_zero(getattr(b, "normalized_height", 0)),
-            "normalized_superficie": val_zero(getattr(b, "normalized_superficie", 0)),
-            "floors_est": val_zero(getattr(b, "floors_est", 0)),
-            "units_est_meters": val_zero(getattr(b, "units_est_meters", 0)),
-            "units_est_volume": val_zero(getattr(b, "units_est_volume", 0)),
-            "units_est_merged": val_zero(getattr(b, "units_est_merged", 0)),
-            "pop_est": val_zero(getattr(b, "pop_est", 0)),
-            "full_nr?": int(getattr(b, "full_nr", 0)),
-            "livable_space": val_zero(getattr(b, "liveable_space", 0)),
-            "res_livable_space": val_zero(getattr(b, "res_liveable_space", 0)),
-            "nr_livable_space": val_zero(getattr(b, "nr_liveable_space", 0)),
-            "ground_floor_height": val_zero(getattr(b, "ground_floor_height", 0)),
-            "upper_floors_height": val_zero(getattr(b, "upper_floors_height", 0)),
-            "units_res": val_zero(getattr(b, "units_res", 0)),
-            "units_res_empty": val_zero(getattr(b, "units_res_empty", 0)),
-            "units_res_primary": val_zero(getattr(b, "units_res_primary", 0)),
-            "units_nr": val_zero(getattr(b, "units_nr", 0)),
-            "units_nr_empty": val_zero(getattr(b, "units_nr_empty", 0)),
-            "units_nr_secondary": val_zero(getattr(b, "units_nr_secondary", 0)),
-            "res_pct": val_zero(getattr(b, "res_pct", 0)),
-            "nr_pct": val_zero(getattr(b, "nr_pct", 0)),
-            "empty_pct": val_zero(getattr(b, "empty_pct", 0)),
-            "res_adj_height": val_zero(getattr(b, "res_adj_height", 0)),
-            "nr_adj_height": val_zero(getattr(b, "nr_adj_height", 0)),
-            "empty_adj_height": val_zero(getattr(b, "empty_adj_height", 0)),
-            "upperonly_res_adj_height": val_zero(getattr(b, "upperonly_res_adj_height", 0)),
-            "upperonly_nr_adj_height": val_zero(getattr(b, "upperonly_nr_adj_height", 0)),
-            "upperonly_empty_adj_height": val_zero(getattr(b, "upperonly_empty_adj_height", 0)),
-            "measured": int(getattr(b, "measured", 0)),
-            "surveyed": int(getattr(b, "surveyed", 0)),
-            "geometry": val_zero(getattr(b, "geometry", None), is_number=False),
-        })
-
-    audit_df = pd.DataFrame(audit_rows).sort_values("short_alias")
-    output_path = os.path.join(ESTIMATES_DIR, "VPC_Estimates_V4-new.csv")
-    audit_df.to_csv(output_path, index=False)
-    print(f"✅ Audit CSV saved to {output_path} ({len(audit_rows)} buildings)")
+
+# Audit column → Building attribute
+AUDIT_COLUMNS = {
+    "building_id": "id",
+    "full_alias": "full_alias",
+    "short_alias": "short_alias",
+    "qu_terra": "qu_terra",
+    "qu_gronda": "qu_gronda",
+    "tp_cls": "tp_cls",
+    "tipo_fun": "tipo_fun",
+    "spec_fun": "spec_fun",
+    "dest_pt_an": "dest_pt_an",
+    "height": "height",
+    "superficie": "superficie",
+    "normalized_height": "normalized_height",
+    "normalized_superficie": "normalized_superficie",
+    "floors_est": "floors_est",
+    "units_est_meters": "units_est_meters",
+    "units_est_volume": "units_est_volume",
+    "units_est_merged": "units_est_merged",
+    "pop_est": "pop_est",
+    "full_nr?": "full_nr",
+    "livable_space": "liveable_space",
+    "res_livable_space": "res_liveable_space",
+    "nr_livable_space": "nr_liveable_space",
+    "ground_floor_height": "ground_floor_height",
+    "upper_floors_height": "upper_floors_height",
+    "units_res": "units_res",
+    "units_res_empty": "units_res_empty",
+    "units_res_primary": "units_res_primary",
+    "units_nr": "units_nr",
+    "units_nr_empty": "units_nr_empty",
+    "units_nr_secondary": "units_nr_secondary",
+    "res_pct": "res_pct",
+    "nr_pct": "nr_pct",
+    "empty_pct": "empty_pct",
+    "res_adj_height": "res_adj_height",
+    "nr_adj_height": "nr_adj_height",
+    "empty_adj_height": "empty_adj_height",
+    "upperonly_res_adj_height": "upperonly_res_adj_height",
+    "upperonly_nr_adj_height": "upperonly_nr_adj_height",
+    "upperonly_empty_adj_height": "upperonly_empty_adj_height",
+    "measured": "measured",
+    "surveyed": "surveyed",
+    "geometry": "geometry",
+}
+TEXT_AUDIT_COLUMNS = {"full_alias", "short_alias", "tipo_fun", "spec_fun", "dest_pt_an", "geometry"}
+FLAG_AUDIT_COLUMNS = {"full_nr?", "measured", "surveyed"}
+
+def _audit_column(buildings, column):
+    """One audit column read straight from the building columns (missing → 0 or "")."""
+    values = column_values(buildings, AUDIT_COLUMNS[column])
+    if column == "tp_cls":
+        return [v.strip() if isinstance(v, str) and v.strip() else "none" for v in values]
+    if column in FLAG_AUDIT_COLUMNS:
+        return [int(v or 0) for v in values]
+    is_number = column not in TEXT_AUDIT_COLUMNS
+    return [val_zero(v, is_number) for v in values]
+
+def _audit_frame(all_buildings):
+    """Audit table for all buildings, sorted by short alias; geometry holds shapely objects."""
+    materialize_geometry(all_buildings)
+    audit_df = pd.DataFrame({column: _audit_column(all_buildings, column) for column in AUDIT_COLUMNS})
+    return audit_df.sort_values("short_alias")
+
+def _build_audit_outputs(all_buildings, formats=AUDIT_FORMATS):
+    """
+    Write the audit table in each requested format. CSV keeps WKT geometry for
+    compatibility; Parquet/Feather hold the attributes only and the GeoParquet
+    layer stores geometry as WKB, so nothing downstream has to parse WKT.
+    """
+    unknown = [fmt for fmt in formats if fmt not in AUDIT_PATHS]
+    if unknown:
+        raise ValueError(f"❌ Unknown audit format(s): {', '.join(unknown)} (expected {', '.join(AUDIT_PATHS)})")
+
+    audit_df = _audit_frame(all_buildings)
+    attributes = audit_df.drop(columns="geometry").reset_index(drop=True)
+
+    for fmt in formats:
+        output_path = AUDIT_PATHS[fmt]
+        if fmt == "csv":
+            audit_df.to_csv(output_path, index=False)
+        elif fmt == "parquet":
+            attributes.to_parquet(output_path, index=False)
+        elif fmt == "feather":
+            attributes.to_feather(output_path)
+        else:
+            geometry = [None if isinstance(g, str) else g for g in audit_df["geometry"]]
+            gpd.GeoDataFrame(attributes, geometry=geometry).to_parquet(output_path, index=False)
+        print(f"✅ Audit {fmt} saved to {output_path} ({len(audit_df)} buildings)")
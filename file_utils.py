@@ -1,5 +1,6 @@
 import json
 import pandas as pd
+import geopandas as gpd
 from pathlib import Path
 from shapely import wkt
 from shapely.geometry import mapping
@@ -17,6 +18,120 @@ def save_geojson(data: dict, path: str):
         json.dump(data, f, indent=2)
     print(f"💾 GeoJSON saved to {path}")
 
+# === Streaming GeoJSON ===
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = frozenset(".eE+-0123456789")
+
+class _JSONStream:
+    """Minimal pull reader over a text file for walking a FeatureCollection."""
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size=None) -> bool:
+        if self.eof:
+            return False
+        if self.pos > self.chunk_size:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"❌ Expected '{char}' at offset {self.pos}, found '{found}'")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill(max(self.chunk_size, len(self.buf) - self.pos)):
+                    raise
+                continue
+            # A value ending at the buffer edge, or a number followed by number characters
+            # ("1." of "1.25"), may have been cut at a chunk boundary: read on and decode again
+            truncated = end == len(self.buf) or (
+                isinstance(obj, (int, float)) and self.buf[end] in _NUMBER_CHARS
+            )
+            if truncated and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+def iter_geojson_features(path: str, chunk_size: int = 1 << 16):
+    """
+    Yield the features of a GeoJSON FeatureCollection one at a time.
+    Only the feature being decoded is held in memory, never the whole document.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _JSONStream(f, chunk_size)
+        stream.expect("{")
+        while stream.peek() != "}":
+            key = stream.value()
+            stream.expect(":")
+            if key == "features":
+                stream.expect("[")
+                while stream.peek() != "]":
+                    yield stream.value()
+                    if stream.peek() == ",":
+                        stream.pos += 1
+                stream.expect("]")
+            else:
+                stream.value()
+            if stream.peek() == ",":
+                stream.pos += 1
+        stream.expect("}")
+
+class GeoJSONFeatureWriter:
+    """Write a FeatureCollection feature by feature (same layout as json.dump without indent)."""
+
+    def __init__(self, path: str, ensure_ascii: bool = True):
+        self.path = path
+        self.ensure_ascii = ensure_ascii
+        self.count = 0
+        self.f = open(path, "w", encoding="utf-8")
+        self.f.write('{"type": "FeatureCollection", "features": [')
+
+    def write(self, feature: dict):
+        if self.count:
+            self.f.write(", ")
+        self.f.write(json.dumps(feature, ensure_ascii=self.ensure_ascii))
+        self.count += 1
+
+    def close(self):
+        if not self.f.closed:
+            self.f.write("]}")
+            self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
 def load_csv(path: str) -> dict:
     df = pd.read_csv(path)
     df.columns = df.columns.str.strip()
@@ -88,3 +203,23 @@ def csv_to_geojson(csv_path: str, geometry_column="geometry", save: bool = True)
         print(f"💾 GeoJSON saved to {output_path}")
 
     return geojson
+
+def geoparquet_to_geojson(parquet_path: str, output_path: str = None, save: bool = True):
+    """
+    Convert a GeoParquet layer (WKB geometry) to GeoJSON, at output_path or next to it.
+    Geometries are decoded straight from WKB, with no WKT parsing.
+    """
+    parquet_path = Path(parquet_path)
+    layer = gpd.read_parquet(parquet_path)
+    geojson = {
+        "type": "FeatureCollection",
+        "features": list(layer.iterfeatures(na="null", drop_id=True)),
+    }
+
+    if save:
+        output_path = Path(output_path) if output_path is not None else parquet_path.with_suffix(".geojson")
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(geojson, f, ensure_ascii=False, indent=2)
+        print(f"💾 GeoJSON saved to {output_path}")
+
+    return geojson
@@ -3,7 +3,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from constants import RAW_GEOJSON, FILTERED_CSV, BUILDING_FIELD, ISLAND_FIELD
-import json
+from file_utils import iter_geojson_features
 import pandas as pd
 
 KEEP_FIELDS = [
@@ -25,14 +25,10 @@ KEEP_FIELDS = [
 ]
 
 def main():
-    print("📂 Loading raw GeoJSON...")
-    with open(RAW_GEOJSON, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
     rows = []
 
-    print("🧹 Filtering features...")
-    for feature in data["features"]:
+    print("🧹 Streaming and filtering raw GeoJSON features...")
+    for feature in iter_geojson_features(RAW_GEOJSON):
         props = feature.get("properties", {})
         new_props = {k: props.get(k, None) for k in KEEP_FIELDS}
         new_props["geometry"] = feature.get("geometry")  # optional
@@ -2,15 +2,15 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from constants import ESTIMATES_CSV, ALIAS_CSV
+from constants import ESTIMATES_CSV, ALIAS_CSV, FINAL_CSV, FINAL_GEOJSON
 
 import pandas as pd
 import geopandas as gpd
 from shapely import wkt
 import os
 
-OUTPUT_CSV = "final/V25B_Estimates_Final.csv"
-OUTPUT_GEOJSON = "final/V25B_Estimates_Final.geojson"
+OUTPUT_CSV = FINAL_CSV
+OUTPUT_GEOJSON = FINAL_GEOJSON
 
 # ------------------------------
 # RENAME MAP
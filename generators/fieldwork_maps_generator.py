@@ -10,7 +10,7 @@ from plotter import plot_island_bw
 def generate_bw_maps():
     geojson_path = DATA_DIR / "VPC_Buildings_With_Aliases.geojson"
     print("📂 Loading dataset...")
-    ds = Dataset(geojson_path)
+    ds = Dataset(geojson_path, cache=True)
     # Already called in constructor, no need for ds._build_hierarchy() if constructor does it
 
     for s in ds.venice.sestieri:
@@ -0,0 +1,384 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import argparse
+import json
+import string
+import numpy as np
+import pandas as pd
+from constants import (
+    ROOT_DIR, CACHE_DIR, BUILDING_FIELD, TRACT_FIELD, ISLAND_FIELD, SESTIERE_FIELD,
+    ALIAS_GEOJSON, FILTERED_CSV, FILTERED_ADDRESS_CSV, FILTERED_WATER_CSV,
+    FILTERED_HOTEL_CSV, FILTERED_HOTELS_EXTRA_CSV, FILTERED_STR_CSV,
+    UNIT_INFO_CSV, FILTERED_SURVEY_CSV, TOTAL_FIELDWORK_CSV, UNINHABITED_CSV, LIN_REG_CSV,
+)
+
+# Synthetic cities are written under SYNTHETIC_DIR/x<scale>, mirroring the project layout
+SYNTHETIC_DIR = CACHE_DIR / "synthetic"
+
+# ------------------------------------------------------------
+# DISTRIBUTIONS (fitted by eye to the 2025 Venice inputs)
+# ------------------------------------------------------------
+
+BUILDINGS_PER_SCALE = 15485             # buildings at 1x
+ISLAND_SIZE_MEAN = 123                  # buildings per island: log-normal, long tail
+ISLAND_SIZE_STD = 121
+ISLAND_SIZE_MAX = 700
+TRACT_SIZE = 40                         # buildings per census tract, chunked within an island
+SHARED_TRACT_SHARE = 0.05               # islands whose first tract continues the previous island's
+
+SESTIERI = {"CS": 0.243, "CN": 0.241, "DD": 0.152, "SM": 0.121, "SC": 0.101, "SP": 0.077, "GD": 0.065}
+
+# Building types with the share of buildings, m_qu, b_qu, ground_floor_qu and qu_count of their
+# height model (None: too few samples, the class uses the ground floor only); "misc" comes last
+# as the fallback row
+BUILDING_TYPES = [
+    ("A", 0.03, 0.321, -0.098, 3.423, 14), ("A1", 0.03, 0.155, 1.873, 2.0, 13),
+    ("B", 0.04, 0.269, 0.554, 2.0, 10), ("B1", 0.03, 0.0, 3.0, 2.0, 2),
+    ("Bg", 0.03, 0.268, 0.469, 2.0, 10), ("C", 0.05, 0.264, 0.064, 3.546, 18),
+    ("D", 0.03, 0.019, 3.923, 2.0, 13), ("Kna", 0.03, None, None, 2.0, 0),
+    ("Knt", 0.03, 0.288, 0.032, 3.364, 3), ("Koa", 0.03, None, None, 2.0, 0),
+    ("Kot", 0.03, None, None, 2.0, 0), ("Kt", 0.03, None, None, 2.0, 0),
+    ("Kt/Or", 0.03, None, None, 2.0, 0), ("N", 0.03, None, None, 2.0, 0),
+    ("Nd", 0.04, 0.315, 0.095, 2.875, 5), ("Ne", 0.04, 0.36, -0.946, 5.402, 9),
+    ("Nr", 0.03, 0.341, -0.231, 3.612, 3), ("O", 0.03, None, None, 2.0, 0),
+    ("Or", 0.05, 0.389, -0.516, 3.9, 9), ("SM", 0.06, None, None, 2.0, 0),
+    ("SU", 0.06, 0.049, 2.405, 2.0, 6), ("fa", 0.07, 0.288, 0.361, 2.222, 15),
+    ("pt", 0.07, 0.188, 1.136, 2.0, 10), ("misc", 0.08, 0.236, 0.795, 2.0, 141),
+]
+TIPO_FUN = {"0": 0.80, "SP15": 0.10, "AB01": 0.10}
+SPEC_FUN = {"0": 0.70, "00": 0.25, "S12": 0.05}
+DEST_PT_AN = {"H": 0.60, "xx": 0.30, "C": 0.10}
+GRONDA_PLACEHOLDERS = (0.03, 0.02)      # share of buildings with Qu_Gronda 0 / 9999
+SUPERFICIE_INVALID = (0.01, 0.005)      # share with Superficie 0 / above the valid maximum
+EMPTY_TRACT_SHARE = 0.05                # tracts with no census population
+
+ADDRESSLESS_SHARE = 0.29                # buildings without any civic number
+ADDRESSES_EXTRA_MEAN = 1.9              # extra addresses per addressed building (geometric)
+ADDRESSES_MAX = 110
+ADDRESS_SUFFIX_SHARE = 0.1              # civic numbers with a letter suffix ("CN96B")
+
+METERED_ADDRESS_SHARE = 0.4
+METERS_EXTRA_MEAN = 1.44                # extra meters per metered address (geometric)
+METERS_MAX = 57
+RATES = {
+    "Uso domestico residente": 0.675,
+    "Uso domestico non residente": 0.3075,
+    "Uso Pubblico": 0.0155,
+    "Uso misto domestico e commerciale": 0.002,
+}
+CONDOMINIO_SHARE = 0.025
+COMPONENTI_MISSING_SHARE = 0.46
+CONSUMO_ZERO_SHARE = 0.08
+CONSUMO_SENTINEL_SHARE = 0.003          # 99999 readings
+
+HOTEL_SHARE = 0.006                     # per address
+HOTEL_EXTRA_SHARE = 0.01
+STR_SHARE = 0.079
+STR_EXTRA_MEAN = 0.32
+
+UNINHABITED_SHARE = 0.31                # of buildings without addresses
+SURVEY_SHARE = 0.007
+FIELDWORK_SHARE = 0.08
+MEASURED_SHARE = 0.19                   # of fieldwork rows
+
+# Layout: islands on a square grid, buildings on a jittered sub-grid (degrees, around Venice)
+ORIGIN = (12.30, 45.42)
+ISLAND_SPACING = 0.008
+BUILDING_SPACING = 0.00025
+
+# ------------------------------------------------------------
+# HELPERS
+# ------------------------------------------------------------
+
+def relocate(path, root) -> Path:
+    """The project path as written under a synthetic root (same layout as ROOT_DIR)."""
+    return Path(root) / Path(path).relative_to(ROOT_DIR)
+
+def _pick(rng, choices: dict, n: int) -> np.ndarray:
+    weights = np.array(list(choices.values()), dtype=float)
+    return rng.choice(np.array(list(choices), dtype=object), size=n, p=weights / weights.sum())
+
+def _letters(i: int, width: int = 0) -> str:
+    """Spreadsheet-style letter code: 0 -> A, 25 -> Z, 26 -> AA (left-padded with A to width)."""
+    code = ""
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        code = string.ascii_uppercase[r] + code
+    return code.rjust(width, "A")
+
+def _island_sizes(rng, total: int) -> np.ndarray:
+    sigma = np.sqrt(np.log(1 + (ISLAND_SIZE_STD / ISLAND_SIZE_MEAN) ** 2))
+    mu = np.log(ISLAND_SIZE_MEAN) - sigma ** 2 / 2
+    sizes = []
+    remaining = total
+    while remaining > 0:
+        size = int(np.clip(rng.lognormal(mu, sigma), 1, ISLAND_SIZE_MAX))
+        sizes.append(min(size, remaining))
+        remaining -= sizes[-1]
+    return np.array(sizes, dtype=np.int64)
+
+def _geometric_extra(rng, mean: float, n: int, cap: int) -> np.ndarray:
+    """At least one, plus a geometric count with the given mean, capped (per building/address)."""
+    return np.minimum(rng.geometric(1 / (1 + mean), size=n), cap)
+
+# ------------------------------------------------------------
+# CITY
+# ------------------------------------------------------------
+
+def _buildings(rng, n: int) -> pd.DataFrame:
+    """One row per building: hierarchy, aliases, footprint position and building CSV fields."""
+    sizes = _island_sizes(rng, n)
+    n_islands = len(sizes)
+    island_ses = _pick(rng, SESTIERI, n_islands)
+    island_codes = np.array([_letters(i, 4) for i in range(n_islands)], dtype=object)
+
+    island = np.repeat(np.arange(n_islands), sizes)
+    starts = np.cumsum(sizes) - sizes
+    rank = np.arange(n) - starts[island]                    # position within the island
+    chunk = rank // TRACT_SIZE
+
+    # Tract codes: one per (island, chunk); some islands continue their predecessor's last tract
+    tract_counts = (sizes + TRACT_SIZE - 1) // TRACT_SIZE
+    tract_first = np.cumsum(tract_counts) - tract_counts
+    shared = rng.random(n_islands) < SHARED_TRACT_SHARE
+    shared[0] = False
+    tract_index = tract_first[island] + chunk
+    offsets = np.cumsum(shared)                             # tracts folded into a predecessor so far
+    tract_index = tract_index - offsets[island]
+    sez21 = 270420000000 + 100 * tract_index
+
+    # Position: islands on a grid, buildings on a jittered sub-grid within their island
+    side = int(np.ceil(np.sqrt(n_islands)))
+    sub = np.ceil(np.sqrt(sizes)).astype(np.int64)[island]
+    x = ORIGIN[0] + (island % side) * ISLAND_SPACING + (rank % sub) * BUILDING_SPACING
+    y = ORIGIN[1] + (island // side) * ISLAND_SPACING + (rank // sub) * BUILDING_SPACING
+    x = x + rng.uniform(0, BUILDING_SPACING * 0.2, n)
+    y = y + rng.uniform(0, BUILDING_SPACING * 0.2, n)
+
+    # Building CSV fields
+    types = [t[0] for t in BUILDING_TYPES]
+    weights = np.array([t[1] for t in BUILDING_TYPES])
+    tp_cls = rng.choice(np.array(types, dtype=object), size=n, p=weights / weights.sum())
+    superficie = np.round(rng.lognormal(np.log(444), 0.7, n), 6)
+    placeholder = rng.random(n)
+    superficie[placeholder < SUPERFICIE_INVALID[0]] = 0.0
+    superficie[placeholder > 1 - SUPERFICIE_INVALID[1]] = 40000.0
+    qu_terra = np.round(rng.uniform(0, 2, n), 2)
+    floors = rng.integers(1, 7, n)
+    qu_gronda = qu_terra + floors * rng.normal(3.2, 0.3, n)
+    placeholder = rng.random(n)
+    qu_gronda[placeholder < GRONDA_PLACEHOLDERS[0]] = 0.0
+    qu_gronda[placeholder > 1 - GRONDA_PLACEHOLDERS[1]] = 9999.0
+
+    segment = np.array([_letters(int(c)) for c in chunk], dtype=object)
+    number = pd.Series(rank + 1).map("{:03d}".format).to_numpy(dtype=object)
+    return pd.DataFrame({
+        BUILDING_FIELD: rng.permutation(n) + 1,
+        ISLAND_FIELD: island_codes[island],
+        SESTIERE_FIELD: island_ses[island],
+        TRACT_FIELD: sez21,
+        "full_alias": island_ses[island] + "-" + island_codes[island] + "-" + segment + "-" + number,
+        "short_alias": island_codes[island] + "-" + number,
+        "x": x,
+        "y": y,
+        "Superficie": superficie,
+        "Qu_Terra": qu_terra,
+        "Qu_Gronda": qu_gronda,
+        "Floors": floors,
+        "TP_CLS_ED": tp_cls,
+        "TipoFun": _pick(rng, TIPO_FUN, n),
+        "SpecFun": _pick(rng, SPEC_FUN, n),
+        "Dest_Pt_An": _pick(rng, DEST_PT_AN, n),
+    })
+
+def _census(rng, buildings: pd.DataFrame) -> pd.DataFrame:
+    """POP21/ABI21/FAM21/EDI21 per SEZ21, roughly proportional to the tract's building count."""
+    counts = buildings.groupby(TRACT_FIELD).size()
+    pop = rng.poisson(3.75 * counts.to_numpy())
+    pop[rng.random(len(pop)) < EMPTY_TRACT_SHARE] = 0
+    return pd.DataFrame({
+        TRACT_FIELD: counts.index,
+        "POP21": pop,
+        "ABI21": np.round(pop * rng.uniform(0.5, 0.7, len(pop))).astype(np.int64),
+        "FAM21": np.round(pop * rng.uniform(0.45, 0.55, len(pop))).astype(np.int64),
+        "EDI21": np.where(pop > 0, np.round(counts.to_numpy() * rng.uniform(0.3, 0.5, len(pop))), 0).astype(np.int64),
+    })
+
+def _addresses(rng, buildings: pd.DataFrame) -> pd.DataFrame:
+    """Civic numbers per building, unique per sestiere (Full_sesti = sestiere code + number)."""
+    n = len(buildings)
+    counts = _geometric_extra(rng, ADDRESSES_EXTRA_MEAN, n, ADDRESSES_MAX)
+    counts[rng.random(n) < ADDRESSLESS_SHARE] = 0
+    rows = np.repeat(np.arange(n), counts)
+    ses = buildings[SESTIERE_FIELD].to_numpy()[rows]
+    number = pd.Series(ses).groupby(ses).cumcount().to_numpy() + 1
+    suffix = np.where(rng.random(len(rows)) < ADDRESS_SUFFIX_SHARE, rng.choice(list("ABCD"), len(rows)), "")
+    return pd.DataFrame({
+        BUILDING_FIELD: buildings[BUILDING_FIELD].to_numpy()[rows].astype(float),
+        "Full_sesti": ses + number.astype(str) + suffix,
+        "Codice_1": buildings[ISLAND_FIELD].to_numpy()[rows],
+    })
+
+def _meters(rng, addresses: pd.DataFrame) -> pd.DataFrame:
+    """Water meters on a share of the addresses, with the tariff, household and consumption fields."""
+    n = len(addresses)
+    counts = _geometric_extra(rng, METERS_EXTRA_MEAN, n, METERS_MAX)
+    counts[rng.random(n) >= METERED_ADDRESS_SHARE] = 0
+    rows = np.repeat(np.arange(n), counts)
+    m = len(rows)
+
+    componenti = np.minimum(rng.poisson(1.9, m), 13).astype(float)
+    componenti[rng.random(m) < COMPONENTI_MISSING_SHARE] = np.nan
+    consumo = np.round(rng.lognormal(np.log(5.75), 0.9, m), 2)
+    consumo[rng.random(m) < CONSUMO_ZERO_SHARE] = 0.0
+    consumo[rng.random(m) < CONSUMO_SENTINEL_SHARE] = 99999.0
+    commerciali = np.where(rng.random(m) < 0.012, rng.integers(1, 6, m), np.nan)
+    return pd.DataFrame({
+        "Cat_Tariffa": _pick(rng, RATES, m),
+        "Nuclei_domestici": np.where(rng.random(m) < 0.985, 1.0, np.nan),
+        "Nuclei_commerciali": commerciali,
+        "Nuclei_non_residenti": np.nan,
+        "Condominio": np.where(rng.random(m) < CONDOMINIO_SHARE, "X", None),
+        "Componenti": componenti,
+        "ProcessedAddress": addresses["Full_sesti"].to_numpy()[rows],
+        "Consumo_medio_2024": consumo,
+        "FID": rng.permutation(m) + 1,
+    })
+
+def _listings(rng, addresses: pd.DataFrame, share: float, extra_mean: float = 0.0) -> pd.DataFrame:
+    """Hotel / STR rows on a share of the addresses (FID, ADDRESS)."""
+    hit = np.flatnonzero(rng.random(len(addresses)) < share)
+    counts = rng.poisson(extra_mean, len(hit)) + 1 if extra_mean else np.ones(len(hit), dtype=np.int64)
+    codes = addresses["Full_sesti"].to_numpy()[np.repeat(hit, counts)]
+    return pd.DataFrame({"FID": np.arange(len(codes)) + 1, "ADDRESS": codes})
+
+def _linreg() -> pd.DataFrame:
+    rows = [
+        {"TP_CLS_ED": name, "m_qu": m, "b_qu": b, "ground_floor_qu": ground, "qu_count": count}
+        for name, _, m, b, ground, count in BUILDING_TYPES
+    ]
+    return pd.DataFrame(rows)
+
+def _unit_info(buildings, addresses, meters, hotels, hotels_extra, strs) -> pd.DataFrame:
+    """Per-building counts as unit_info_generator writes them."""
+    b_of_addr = pd.Series(addresses[BUILDING_FIELD].to_numpy().astype(np.int64), index=addresses["Full_sesti"])
+
+    def per_building(codes, weights=None):
+        ids = b_of_addr.reindex(codes).to_numpy()
+        counts = pd.Series(1 if weights is None else weights, index=ids).groupby(level=0).sum()
+        return buildings[BUILDING_FIELD].map(counts).fillna(0)
+
+    zero = (meters["Consumo_medio_2024"] == 0).to_numpy().astype(np.int64)
+    return pd.DataFrame({
+        "full_alias": buildings["full_alias"],
+        "short_alias": buildings["short_alias"],
+        "building_id": buildings[BUILDING_FIELD],
+        "num_addresses": per_building(addresses["Full_sesti"]).astype(np.int64),
+        "num_meters": per_building(meters["ProcessedAddress"]).astype(np.int64),
+        "num_zero_consumption_meters": per_building(meters["ProcessedAddress"], zero).astype(np.int64),
+        "Consumo_medio_2024": per_building(meters["ProcessedAddress"], meters["Consumo_medio_2024"].to_numpy()).round(2),
+        "num_hotels": per_building(hotels["ADDRESS"]).astype(np.int64),
+        "num_hotels_extras": per_building(hotels_extra["ADDRESS"]).astype(np.int64),
+        "num_strs": per_building(strs["ADDRESS"]).astype(np.int64),
+    })
+
+def _write_geojson(buildings: pd.DataFrame, path: Path):
+    """One rectangular footprint per building, sized from Superficie, written feature by feature."""
+    side = np.sqrt(np.clip(buildings["Superficie"].to_numpy(), 25, 2500)) / 111000
+    x0, y0 = buildings["x"].to_numpy(), buildings["y"].to_numpy()
+    x1, y1 = x0 + side, y0 + side * 0.8
+    columns = [BUILDING_FIELD, "full_alias", "short_alias", ISLAND_FIELD, SESTIERE_FIELD, TRACT_FIELD]
+    values = [buildings[c].tolist() for c in columns]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"type": "FeatureCollection", "features": [\n')
+        for i, props in enumerate(zip(*values)):
+            ring = [[x0[i], y0[i]], [x1[i], y0[i]], [x1[i], y1[i]], [x0[i], y1[i]], [x0[i], y0[i]]]
+            feature = {
+                "type": "Feature",
+                "properties": dict(zip(columns, props)),
+                "geometry": {"type": "Polygon", "coordinates": [[[round(a, 9), round(b, 9)] for a, b in ring]]},
+            }
+            f.write(("," if i else "") + json.dumps(feature) + "\n")
+        f.write("]}\n")
+
+# ------------------------------------------------------------
+# GENERATE
+# ------------------------------------------------------------
+
+def generate_city(root, scale: int = 1, seed: int = 0) -> dict:
+    """
+    Write a synthetic city of scale x BUILDINGS_PER_SCALE buildings under root, laid out like
+    the project (data/, fieldwork/): the alias GeoJSON, the filtered building, address, water,
+    hotel and STR CSVs, and the unit info, survey, fieldwork, uninhabited and LinReg CSVs the
+    estimators read. Same scale and seed give the same files. Returns row counts per file.
+    """
+    rng = np.random.default_rng(seed)
+    buildings = _buildings(rng, BUILDINGS_PER_SCALE * scale)
+    census = _census(rng, buildings)
+    addresses = _addresses(rng, buildings)
+    meters = _meters(rng, addresses)
+    hotels = _listings(rng, addresses, HOTEL_SHARE)
+    hotels_extra = _listings(rng, addresses, HOTEL_EXTRA_SHARE)
+    strs = _listings(rng, addresses, STR_SHARE, STR_EXTRA_MEAN)
+
+    addressless = ~buildings[BUILDING_FIELD].isin(addresses[BUILDING_FIELD].astype(np.int64))
+    uninhabited = buildings.loc[addressless & (rng.random(len(buildings)) < UNINHABITED_SHARE), ["full_alias"]]
+    survey = buildings.loc[rng.random(len(buildings)) < SURVEY_SHARE, ["short_alias", "Floors"]]
+    survey = survey.rename(columns={"Floors": "Number of Floors"})
+    fieldwork = buildings.loc[rng.random(len(buildings)) < FIELDWORK_SHARE,
+                              ["short_alias", "TP_CLS_ED", "Qu_Gronda", "Qu_Terra", "Superficie", "Floors"]].copy()
+    measured = rng.random(len(fieldwork)) < MEASURED_SHARE
+    fieldwork.insert(5, "Measured Height", np.where(measured, np.round(fieldwork["Floors"] * rng.normal(3.2, 0.3, len(fieldwork)), 1), np.nan))
+    fieldwork["Floors"] = fieldwork["Floors"].where(measured)
+
+    building_csv = buildings.merge(census, on=TRACT_FIELD, how="left")
+    building_csv["Tipologia"] = "x"
+    building_csv = building_csv[[
+        BUILDING_FIELD, "Qu_Terra", "Tipologia", "Qu_Gronda", TRACT_FIELD, "TP_CLS_ED", "Superficie",
+        "TipoFun", "SpecFun", "Dest_Pt_An", ISLAND_FIELD, "POP21", "ABI21", "FAM21", "EDI21",
+    ]]
+
+    outputs = {
+        FILTERED_CSV: building_csv,
+        FILTERED_ADDRESS_CSV: addresses,
+        FILTERED_WATER_CSV: meters,
+        FILTERED_HOTEL_CSV: hotels,
+        FILTERED_HOTELS_EXTRA_CSV: hotels_extra,
+        FILTERED_STR_CSV: strs,
+        UNIT_INFO_CSV: _unit_info(buildings, addresses, meters, hotels, hotels_extra, strs),
+        FILTERED_SURVEY_CSV: survey,
+        TOTAL_FIELDWORK_CSV: fieldwork,
+        UNINHABITED_CSV: uninhabited,
+        LIN_REG_CSV: _linreg(),
+    }
+    counts = {}
+    for path, df in outputs.items():
+        target = relocate(path, root)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(target, index=False)
+        counts[target.name] = len(df)
+
+    target = relocate(ALIAS_GEOJSON, root)
+    _write_geojson(buildings, target)
+    counts[target.name] = len(buildings)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic city at the given scales.")
+    parser.add_argument("scales", nargs="*", type=int, default=[1], help="multiples of Venice's building count")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=SYNTHETIC_DIR, help="parent directory of the x<scale> roots")
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        root = args.out / f"x{scale}"
+        print(f"🏙️ Generating synthetic city x{scale} in {root}...")
+        for name, rows in generate_city(root, scale, args.seed).items():
+            print(f"   {name:<45} {rows:>10} rows")
+        print(f"💾 Saved x{scale} city to {root}")
+
+if __name__ == "__main__":
+    main()
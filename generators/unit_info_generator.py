@@ -7,7 +7,7 @@ from constants import ALIAS_GEOJSON, FILTERED_WATER_CSV, UNIT_INFO_CSV
 import pandas as pd
 
 print(f"📂 Loading building GeoJSON: {ALIAS_GEOJSON.name}")
-ds = Dataset(str(ALIAS_GEOJSON))
+ds = Dataset(str(ALIAS_GEOJSON), cache=True, lazy_geometry=True)
 
 print("📂 Loading filtered water consumption CSV...")
 water_df = pd.read_csv(FILTERED_WATER_CSV)
@@ -34,67 +34,64 @@ print("📊 Computing units_est + consumo for ALL buildings...")
 rows = []
 
 # --- Loop through every building ---
-for s in ds.venice.sestieri:
-    for isl in s.islands:
-        for tract in isl.tracts:
-            for b in tract.buildings:
+for b in ds.buildings:
 
-                total_units = 0
-                zero_consumption_count = 0
-                building_consumptions = []   # <-- store meter consumption
+    total_units = 0
+    zero_consumption_count = 0
+    building_consumptions = []   # <-- store meter consumption
 
-                for addr in b.addresses:
-                    addr_units = 0
-                    new_meters = []
+    for addr in b.addresses:
+        addr_units = 0
+        new_meters = []
 
-                    if addr.address in address_meters_map:
-                        for fid, comp in address_meters_map[addr.address]:
-                            addr_units += comp
-                            new_meters.append(fid)
+        if addr.address in address_meters_map:
+            for fid, comp in address_meters_map[addr.address]:
+                addr_units += comp
+                new_meters.append(fid)
 
-                            consumo = fid_consumption_map.get(fid, 0)
-                            building_consumptions.append(consumo)
+                consumo = fid_consumption_map.get(fid, 0)
+                building_consumptions.append(consumo)
 
-                            if consumo < 0.5:
-                                zero_consumption_count += 1
+                if consumo < 0.5:
+                    zero_consumption_count += 1
 
-                    addr.meters = new_meters
-                    total_units += addr_units
+        addr.meters = new_meters
+        total_units += addr_units
 
-                # Compute building-level consumption
-                if building_consumptions:
-                    consumo_medio_2024 = sum(building_consumptions) / len(building_consumptions)
-                else:
-                    consumo_medio_2024 = 0
+    # Compute building-level consumption
+    if building_consumptions:
+        consumo_medio_2024 = sum(building_consumptions) / len(building_consumptions)
+    else:
+        consumo_medio_2024 = 0
 
-                def join_list(x):
-                    if isinstance(x, list):
-                        return ";".join(str(i) for i in x)
-                    return ""
+    def join_list(x):
+        if isinstance(x, list):
+            return ";".join(str(i) for i in x)
+        return ""
 
-                rows.append({
-                    "full_alias": b.full_alias,
-                    "short_alias": b.short_alias,
-                    "building_id": b.id,
+    rows.append({
+        "full_alias": b.full_alias,
+        "short_alias": b.short_alias,
+        "building_id": b.id,
 
-                    "num_addresses": len(b.addresses),
-                    "addresses": ";".join(a.address for a in b.addresses),
+        "num_addresses": len(b.addresses),
+        "addresses": ";".join(a.address for a in b.addresses),
 
-                    "num_meters": sum(len(a.meters) for a in b.addresses),
-                    "meters": ";".join(join_list(a.meters) for a in b.addresses),
+        "num_meters": sum(len(a.meters) for a in b.addresses),
+        "meters": ";".join(join_list(a.meters) for a in b.addresses),
 
-                    "num_zero_consumption_meters": zero_consumption_count,
-                    "Consumo_medio_2024": consumo_medio_2024,   # ✅ FIXED
+        "num_zero_consumption_meters": zero_consumption_count,
+        "Consumo_medio_2024": consumo_medio_2024,   # ✅ FIXED
 
-                    "num_hotels": sum(len(a.hotels) for a in b.addresses),
-                    "hotels": ";".join(join_list(a.hotels) for a in b.addresses),
+        "num_hotels": sum(len(a.hotels) for a in b.addresses),
+        "hotels": ";".join(join_list(a.hotels) for a in b.addresses),
 
-                    "num_hotels_extras": sum(len(a.hotels_extras) for a in b.addresses),
-                    "hotels_extras": ";".join(join_list(a.hotels_extras) for a in b.addresses),
+        "num_hotels_extras": sum(len(a.hotels_extras) for a in b.addresses),
+        "hotels_extras": ";".join(join_list(a.hotels_extras) for a in b.addresses),
 
-                    "num_strs": sum(len(a.strs) for a in b.addresses),
-                    "strs": ";".join(join_list(a.strs) for a in b.addresses),
-                })
+        "num_strs": sum(len(a.strs) for a in b.addresses),
+        "strs": ";".join(join_list(a.strs) for a in b.addresses),
+    })
 
 print("📄 Generating CSV...")
 
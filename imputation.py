@@ -0,0 +1,141 @@
+import numpy as np
+import shapely
+from scipy.spatial import cKDTree
+
+# Slack on the KD-tree search radius so candidates tied with (or a rounding error away
+# from) the k-th neighbour are re-ranked with the exact shapely distance
+RADIUS_SLACK = 1e-9
+
+# ------------------------------------------------------------
+# SPATIAL INDEX
+# ------------------------------------------------------------
+
+class CentroidIndex:
+    """
+    KD-tree over building centroids, built once and queried in batch.
+    Results match sorting the candidate list by centroid.distance with a stable sort,
+    i.e. ties keep the candidates' original order.
+    """
+
+    def __init__(self, buildings):
+        self.buildings = [b for b in buildings if b.centroid is not None]
+        self.centroids = np.array([b.centroid for b in self.buildings], dtype=object)
+        self.tree = cKDTree(shapely.get_coordinates(self.centroids)) if self.buildings else None
+
+    def __len__(self):
+        return len(self.buildings)
+
+    def nearest(self, centroids, k: int) -> list:
+        """Candidate positions of the k nearest buildings for each query centroid."""
+        centroids = np.asarray(centroids, dtype=object)
+        k = min(k, len(self))
+        if k == 0 or len(centroids) == 0:
+            return [np.empty(0, dtype=np.int64) for _ in range(len(centroids))]
+
+        points = shapely.get_coordinates(centroids)
+        dist, _ = self.tree.query(points, k=k)
+        radius = dist.reshape(len(points), k)[:, -1] * (1 + RADIUS_SLACK) + RADIUS_SLACK
+        candidates = self.tree.query_ball_point(points, radius)
+
+        result = []
+        for centroid, cand in zip(centroids, candidates):
+            cand = np.sort(np.asarray(cand, dtype=np.int64))
+            exact = shapely.distance(centroid, self.centroids[cand])
+            result.append(cand[np.argsort(exact, kind="stable")[:k]])
+        return result
+
+# ------------------------------------------------------------
+# IMPUTATION
+# ------------------------------------------------------------
+
+def nearest_neighbours(targets, candidates, k: int, group=None) -> list:
+    """
+    For each target building, its k nearest candidate buildings ordered by centroid distance.
+    With group (a key function such as island_of), targets only search candidates sharing
+    their key, through one index per key; a key with no candidates falls back to the
+    city-wide index. Targets without a centroid get no neighbours; candidates without one are skipped.
+    """
+    if group is None:
+        indexes = {}
+        city = CentroidIndex(candidates)
+    else:
+        by_key = {}
+        for b in candidates:
+            by_key.setdefault(group(b), []).append(b)
+        indexes = {key: CentroidIndex(members) for key, members in by_key.items()}
+        city = None
+
+    # Batch the queries per index
+    queries = {}
+    for i, b in enumerate(targets):
+        if b.centroid is None:
+            continue
+        index = indexes.get(group(b)) if group is not None else None
+        if index is None or len(index) == 0:
+            if city is None:
+                city = CentroidIndex(candidates)
+            index = city
+        queries.setdefault(id(index), (index, []))[1].append(i)
+
+    neighbours = [[] for _ in targets]
+    for index, rows in queries.values():
+        found = index.nearest([targets[i].centroid for i in rows], k)
+        for i, positions in zip(rows, found):
+            neighbours[i] = [index.buildings[p] for p in positions]
+    return neighbours
+
+def neighbour_means(targets, candidates, value, k: int, group=None) -> list:
+    """
+    np.mean of value(b) over each target's k nearest candidates (None when there are none),
+    computed over the same ordered values as the per-building scan it replaces.
+    """
+    return [
+        np.mean([value(b) for b in neighbours]) if neighbours else None
+        for neighbours in nearest_neighbours(targets, candidates, k, group)
+    ]
+
+# ------------------------------------------------------------
+# BUILDING ATTRIBUTES
+# ------------------------------------------------------------
+
+SUPERFICIE_MAX = 30000
+
+def island_of(b):
+    """Island code the building was loaded under (None for buildings built outside a Dataset)."""
+    return getattr(b, "island", None)
+
+def has_valid_gronda(b) -> bool:
+    """qu_gronda is usable unless missing, 0 or the 9999 placeholder (NaN passes, as it always has)."""
+    return b.qu_gronda not in [None, 0, 9999]
+
+def has_valid_superficie(b) -> bool:
+    return b.superficie is not None and 0 < b.superficie < SUPERFICIE_MAX
+
+def impute_qu_gronda(buildings, k: int) -> list:
+    """
+    Mean qu_gronda of the k nearest valid buildings on the same island for every building
+    missing it (city-wide when its island has none), from one batched query per island.
+    Aligned with buildings; None where qu_gronda is valid or no valid neighbour exists.
+    """
+    missing = [i for i, b in enumerate(buildings) if not has_valid_gronda(b)]
+    valid = [b for b in buildings if has_valid_gronda(b)]
+    means = neighbour_means([buildings[i] for i in missing], valid, lambda b: b.qu_gronda, k, group=island_of)
+
+    avg_qu_gronda = [None] * len(buildings)
+    for i, mean in zip(missing, means):
+        avg_qu_gronda[i] = mean
+    return avg_qu_gronda
+
+def normalized_superficie(buildings, k: int) -> list:
+    """
+    Footprint per building, aligned with buildings: superficie when in (0, SUPERFICIE_MAX),
+    otherwise the rounded mean of the k nearest valid buildings' superficie (0 if none).
+    """
+    missing = [i for i, b in enumerate(buildings) if not has_valid_superficie(b)]
+    valid = [b for b in buildings if has_valid_superficie(b)]
+    means = neighbour_means([buildings[i] for i in missing], valid, lambda b: b.superficie, k)
+
+    values = [b.superficie for b in buildings]
+    for i, mean in zip(missing, means):
+        values[i] = round(mean, 2) if mean is not None else 0
+    return values
@@ -0,0 +1,179 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# ------------------------------------------------------------
+# MEMORY
+# ------------------------------------------------------------
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+# ------------------------------------------------------------
+# RUN REPORT
+# ------------------------------------------------------------
+
+class RunReport:
+    """
+    Wall time, CPU time, memory and item counts per named stage of a run, written as JSON.
+    Stages may nest (a nested stage's time is included in its parent's). A stage entered
+    several times, or merged from worker processes, accumulates into one record.
+    With trace_memory, tracemalloc records each stage's peak Python allocation too;
+    it slows the run down noticeably, so it is off by default.
+    """
+
+    def __init__(self, name: str, trace_memory: bool = False):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.meta = {}
+        self.stages = {}
+        self._stack = []
+        self._started = datetime.now().isoformat(timespec="seconds")
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str, items: int = None):
+        """Time the enclosed block as stage `name`; the yielded record's "items" may be set inside."""
+        record = self.stages.get(name)
+        if record is None:
+            record = self.stages[name] = {
+                "name": name,
+                "parent": self._stack[-1]["name"] if self._stack else None,
+                "calls": 0,
+                "items": None,
+                "wall_s": 0.0,
+                "cpu_s": 0.0,
+                "peak_rss_mb": None,
+                "tracemalloc_peak_mb": None,
+            }
+        if items is not None:
+            record["items"] = (record["items"] or 0) + int(items)
+
+        frame = {"name": name, "traced_peak": 0}
+        if self.trace_memory:
+            self._fold_traced_peak()
+        self._stack.append(frame)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record["calls"] += 1
+            record["wall_s"] += time.perf_counter() - wall
+            record["cpu_s"] += time.process_time() - cpu
+            record["peak_rss_mb"] = _max(record["peak_rss_mb"], peak_rss_mb())
+            if self.trace_memory:
+                self._fold_traced_peak()
+            self._stack.pop()
+            if self.trace_memory:
+                record["tracemalloc_peak_mb"] = _max(record["tracemalloc_peak_mb"], round(frame["traced_peak"] / 2**20, 1))
+                if self._stack:
+                    self._stack[-1]["traced_peak"] = max(self._stack[-1]["traced_peak"], frame["traced_peak"])
+
+    def _fold_traced_peak(self):
+        """Credit the tracemalloc peak since the last reset to the innermost open stage, then reset it."""
+        if self._stack:
+            self._stack[-1]["traced_peak"] = max(self._stack[-1]["traced_peak"], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+
+    def merge(self, records):
+        """
+        Fold stage records from another report (e.g. a worker process) into this one;
+        its top-level stages nest under the stage currently open here.
+        """
+        for other in records:
+            parent = other["parent"] or (self._stack[-1]["name"] if self._stack else None)
+            record = self.stages.setdefault(other["name"], {**other, "parent": parent, "calls": 0, "items": None, "wall_s": 0.0, "cpu_s": 0.0})
+            record["calls"] += other["calls"]
+            if other["items"] is not None:
+                record["items"] = (record["items"] or 0) + other["items"]
+            record["wall_s"] += other["wall_s"]
+            record["cpu_s"] += other["cpu_s"]
+            record["peak_rss_mb"] = _max(record["peak_rss_mb"], other["peak_rss_mb"])
+            record["tracemalloc_peak_mb"] = _max(record["tracemalloc_peak_mb"], other["tracemalloc_peak_mb"])
+
+    def records(self) -> list:
+        return [dict(record) for record in self.stages.values()]
+
+    def to_dict(self) -> dict:
+        stages = self.records()
+        for record in stages:
+            record["wall_s"] = round(record["wall_s"], 4)
+            record["cpu_s"] = round(record["cpu_s"], 4)
+        return {
+            "run": self.name,
+            "started": self._started,
+            "pid": os.getpid(),
+            "wall_s": round(time.perf_counter() - self._wall, 4),
+            "cpu_s": round(time.process_time() - self._cpu, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "meta": self.meta,
+            "stages": stages,
+        }
+
+    def save(self, path) -> Path:
+        """Write the report as JSON and print a one-line summary per top-level stage."""
+        report = self.to_dict()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        for record in report["stages"]:
+            if record["parent"] is None:
+                print(f"⏱️  {record['name']:<32} {record['wall_s']:>8.2f}s wall {record['cpu_s']:>8.2f}s cpu")
+        print(f"📊 Run report saved to {path}")
+        return path
+
+def _max(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+# ------------------------------------------------------------
+# ACTIVE REPORT
+# ------------------------------------------------------------
+
+_active = None
+
+@contextmanager
+def activate(report):
+    """Make report the target of stage() for the enclosed block (a no-op for None)."""
+    global _active
+    previous = _active
+    if report is not None:
+        _active = report
+    try:
+        yield report
+    finally:
+        _active = previous
+
+@contextmanager
+def stage(name: str, items: int = None):
+    """RunReport.stage on the active report; without one, only yields a scratch record."""
+    if _active is None:
+        yield {}
+        return
+    with _active.stage(name, items) as record:
+        yield record
+
+def active_report():
+    return _active
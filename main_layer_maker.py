@@ -1,5 +1,5 @@
 from dataset import Dataset
-from constants import ALIAS_GEOJSON, ESTIMATES_DIR, ALIAS_CSV, ESTIMATES_CSV
+from constants import ALIAS_GEOJSON, ALIAS_CSV, ESTIMATES_CSV, ESTIMATES_GEOPARQUET, ESTIMATES_GEOJSON, ESTIMATES_HIERARCHY_TXT, ESTIMATES_RUN_REPORT
 import matplotlib.pyplot as plt
 
 from estimation_null import estimation_null
@@ -13,15 +13,20 @@ import pandas as pd
 import geopandas as gpd
 from shapely import wkt
 
-from file_utils import csv_to_geojson
+from file_utils import geoparquet_to_geojson
+from instrumentation import RunReport
 
 def main():
 
-    ds = Dataset(str(ALIAS_GEOJSON))
-    estimation_v4(ds,{"FILI"},False)
+    report = RunReport("main_layer_maker")
+    with report.stage("Dataset") as record:
+        ds = Dataset(str(ALIAS_GEOJSON), cache=True)
+        record["items"] = len(ds.buildings)
+    estimation_v4(ds, {"FILI"}, debug=False, audit_formats=("csv", "geoparquet"), report=report)
     #estimation_v4(ds,{})
-    ds.export_hierarchy_text(ESTIMATES_DIR / "Venice_hierarchy-new.txt")
-    csv_to_geojson(ESTIMATES_DIR / "VPC_Estimates_V4-new.csv")
+    ds.export_hierarchy_text(ESTIMATES_HIERARCHY_TXT)
+    geoparquet_to_geojson(ESTIMATES_GEOPARQUET, ESTIMATES_GEOJSON)
+    report.save(ESTIMATES_RUN_REPORT)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
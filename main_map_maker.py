@@ -4,7 +4,7 @@ from plotter import plot_island_by_tpcls_filtered
 
 # --- Load dataset ---
 print(f"📂 Loading building GeoJSON: {ALIAS_GEOJSON.name}")
-ds = Dataset(str(ALIAS_GEOJSON))
+ds = Dataset(str(ALIAS_GEOJSON), cache=True)
 
 # --- List of islands to plot ---
 my_islands = ["TOLE","ROMA"]
@@ -0,0 +1,297 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List
+from snapshot import hash_files
+from dataset import DATASET_CODE
+from constants import (
+    ROOT_DIR,
+    CACHE_DIR,
+    FIELDWORK_DIR,
+    RAW_GEOJSON,
+    FILTERED_GEOJSON,
+    FILTERED_CSV,
+    ALIAS_GEOJSON,
+    ALIAS_CSV,
+    WATER_CONSUMPTION_CSV,
+    FILTERED_WATER_CSV,
+    ADDRESS_CSV,
+    FILTERED_ADDRESS_CSV,
+    TOTAL_HOTEL_CSV,
+    TOTAL_HOTELS_EXTRA_CSV,
+    TOTAL_STR_CSV,
+    FILTERED_HOTEL_CSV,
+    FILTERED_HOTELS_EXTRA_CSV,
+    FILTERED_STR_CSV,
+    SURVEY_CSV,
+    FILTERED_SURVEY_CSV,
+    TOTAL_FIELDWORK_CSV,
+    INHABITED_CSV,
+    UNINHABITED_CSV,
+    UNIT_INFO_CSV,
+    LIN_REG_CSV,
+    DATASET_INPUTS,
+    ESTIMATES_CSV,
+    ESTIMATES_GEOPARQUET,
+    ESTIMATES_GEOJSON,
+    ESTIMATES_HIERARCHY_TXT,
+    FINAL_CSV,
+    FINAL_GEOJSON,
+    PIPELINE_STATE,
+)
+
+MAX_WORKERS = 4
+LOG_DIR = CACHE_DIR / "pipeline_logs"
+
+# Field team uploads (XX-XXXX-F.csv); the pattern leaves out the generated !TOTAL-F.csv.
+# calc_lin_reg globs "*-F.csv" and matches the prefix case-insensitively, so do the same
+FIELDWORK_FILES = FIELDWORK_DIR / "[A-Za-z][A-Za-z]-[A-Za-z0-9][A-Za-z0-9][A-Za-z0-9]*-F.csv"
+
+# Modules the estimation stage runs besides its own script
+ESTIMATION_CODE = DATASET_CODE + [ROOT_DIR / name for name in (
+    "imputation.py", "apportion.py", "instrumentation.py", "estimation_v4.py",
+)]
+
+# ------------------------------------------------------------
+# STAGE GRAPH
+# ------------------------------------------------------------
+
+@dataclass
+class Stage:
+    """
+    One pipeline script with the files it reads and writes. Inputs may be glob patterns;
+    the script itself is always part of the inputs. Edges come from matching paths:
+    a stage depends on every stage that writes one of its inputs.
+    """
+    name: str
+    script: Path
+    inputs: List[Path] = field(default_factory=list)
+    outputs: List[Path] = field(default_factory=list)
+
+STAGES = [
+    Stage("filter_buildings", ROOT_DIR / "filters/filter_buildings.py", [RAW_GEOJSON], [FILTERED_CSV]),
+    Stage("filter_addresses", ROOT_DIR / "filters/filter_addresses.py", [ADDRESS_CSV], [FILTERED_ADDRESS_CSV]),
+    Stage("filter_water", ROOT_DIR / "filters/filter_water.py", [WATER_CONSUMPTION_CSV], [FILTERED_WATER_CSV]),
+    Stage(
+        "filter_geoids", ROOT_DIR / "filters/filter_geoids.py",
+        [TOTAL_HOTEL_CSV, TOTAL_HOTELS_EXTRA_CSV, TOTAL_STR_CSV],
+        [FILTERED_HOTEL_CSV, FILTERED_HOTELS_EXTRA_CSV, FILTERED_STR_CSV],
+    ),
+    Stage("filter_survey", ROOT_DIR / "filters/filter_survey.py", [SURVEY_CSV], [FILTERED_SURVEY_CSV]),
+    Stage(
+        "assign_aliases", ROOT_DIR / "assign_aliases.py",
+        [FILTERED_GEOJSON, *DATASET_INPUTS, *DATASET_CODE],
+        [ALIAS_GEOJSON, ALIAS_CSV],
+    ),
+    Stage("calc_lin_reg", ROOT_DIR / "calc_lin_reg.py", [FIELDWORK_FILES], [TOTAL_FIELDWORK_CSV, LIN_REG_CSV]),
+    Stage(
+        "unit_info_generator", ROOT_DIR / "generators/unit_info_generator.py",
+        [ALIAS_GEOJSON, *DATASET_INPUTS, *DATASET_CODE],
+        [UNIT_INFO_CSV],
+    ),
+    Stage("uninhabited_generator", ROOT_DIR / "generators/uninhabited_generator.py", [ALIAS_CSV, INHABITED_CSV], [UNINHABITED_CSV]),
+    Stage(
+        "main_layer_maker", ROOT_DIR / "main_layer_maker.py",
+        [ALIAS_GEOJSON, *DATASET_INPUTS, LIN_REG_CSV, FILTERED_SURVEY_CSV, TOTAL_FIELDWORK_CSV, UNIT_INFO_CSV, UNINHABITED_CSV, *ESTIMATION_CODE],
+        [ESTIMATES_CSV, ESTIMATES_GEOPARQUET, ESTIMATES_GEOJSON, ESTIMATES_HIERARCHY_TXT],
+    ),
+    Stage("generate_final_dataset", ROOT_DIR / "generators/!generate_final_dataset.py", [ESTIMATES_CSV, ALIAS_CSV], [FINAL_CSV, FINAL_GEOJSON]),
+]
+
+def _expand(path: Path) -> List[Path]:
+    """The path itself, or the sorted matches of a glob pattern."""
+    if any(c in path.name for c in "*?["):
+        return sorted(path.parent.glob(path.name))
+    return [path]
+
+def dependencies(stages=STAGES) -> dict:
+    """Stage name -> names of the stages that write one of its inputs."""
+    writers = {}
+    for stage in stages:
+        for path in stage.outputs:
+            if path in writers:
+                raise ValueError(f"❌ {path.name} is written by both {writers[path]} and {stage.name}")
+            writers[path] = stage.name
+    return {
+        stage.name: sorted({writers[path] for path in stage.inputs if path in writers} - {stage.name})
+        for stage in stages
+    }
+
+def upstream(names, stages=STAGES) -> set:
+    """The given stage names plus everything they depend on, transitively."""
+    deps = dependencies(stages)
+    unknown = set(names) - set(deps)
+    if unknown:
+        raise ValueError(f"❌ Unknown stage(s): {', '.join(sorted(unknown))}")
+    selected, pending = set(), list(names)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(deps[name])
+    return selected
+
+# ------------------------------------------------------------
+# CONTENT HASHES
+# ------------------------------------------------------------
+
+def _input_paths(stage: Stage) -> List[Path]:
+    return [stage.script] + [p for pattern in stage.inputs for p in _expand(pattern)]
+
+def missing_inputs(stage: Stage) -> List[str]:
+    """Names of missing inputs (a glob pattern with no match counts as missing)."""
+    missing = [p.name for p in [stage.script, *stage.inputs] if not _expand(p)]
+    return missing + [p.name for p in _input_paths(stage) if not p.exists()]
+
+def input_hash(stage: Stage) -> str:
+    """Hash over the stage script and the content of every input (None if one is missing)."""
+    if missing_inputs(stage):
+        return None
+    return hash_files(_input_paths(stage), extra=stage.name)
+
+def output_hash(stage: Stage) -> str:
+    """Hash over the stage outputs (None while any is missing)."""
+    if not all(p.exists() for p in stage.outputs):
+        return None
+    return hash_files(stage.outputs, extra=stage.name)
+
+def load_state(path=PIPELINE_STATE) -> dict:
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_state(state: dict, path=PIPELINE_STATE):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def is_fresh(stage: Stage, state: dict) -> bool:
+    """True if the stage last ran on the same inputs and its outputs are untouched since."""
+    record = state.get(stage.name)
+    if record is None:
+        return False
+    return record.get("inputs") == input_hash(stage) and record.get("outputs") == output_hash(stage)
+
+# ------------------------------------------------------------
+# RUNNER
+# ------------------------------------------------------------
+
+def _run_script(stage: Stage) -> tuple:
+    """Run the stage script from the project root; its output goes to LOG_DIR/<stage>.log."""
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    log_path = LOG_DIR / f"{stage.name}.log"
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        result = subprocess.run(
+            [sys.executable, str(stage.script)], cwd=ROOT_DIR, stdout=log, stderr=subprocess.STDOUT,
+            env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+        )
+    return result.returncode, time.perf_counter() - start, log_path
+
+def run_pipeline(targets=None, force=False, jobs=MAX_WORKERS, dry_run=False, stages=STAGES, state_path=PIPELINE_STATE) -> dict:
+    """
+    Run the stage graph up to targets (default: every stage). A stage is skipped when its
+    input hash matches the last successful run and its outputs are unchanged; stages whose
+    dependencies are done run concurrently on up to `jobs` processes. With dry_run, only
+    report what would run, assuming every stale stage changes its outputs.
+    Returns stage name -> "skipped" / "ran" / "failed" / "blocked" / "would run".
+    """
+    by_name = {stage.name: stage for stage in stages}
+    deps = dependencies(stages)
+    selected = upstream(targets, stages) if targets else set(by_name)
+    pending = {name: set(deps[name]) & selected for name in selected}
+    state = load_state(state_path)
+    status = {}
+
+    def ready():
+        return sorted(name for name, waiting in pending.items() if not waiting)
+
+    def finish(name, result):
+        status[name] = result
+        pending.pop(name, None)
+        for waiting in pending.values():
+            waiting.discard(name)
+        if result in ("failed", "blocked"):
+            # Everything downstream of a failure is blocked
+            for other, other_deps in deps.items():
+                if other in pending and name in other_deps:
+                    print(f"⏭️  {other}: blocked by {name}")
+                    finish(other, "blocked")
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix="stage") as pool:
+        running = {}
+        while pending or running:
+            for name in ready():
+                if any(name == running_name for running_name, _ in running.values()):
+                    continue
+                stage = by_name[name]
+                stale_upstream = any(status.get(dep) in ("ran", "would run") for dep in deps[name])
+                if not force and not (dry_run and stale_upstream) and is_fresh(stage, state):
+                    print(f"✅ {name}: up to date")
+                    finish(name, "skipped")
+                elif missing_inputs(stage) and not (dry_run and stale_upstream):
+                    if output_hash(stage) is not None:
+                        # Raw sources not in this checkout: keep the outputs we have
+                        print(f"⚠️  {name}: missing inputs {', '.join(missing_inputs(stage))}, keeping existing outputs")
+                        finish(name, "skipped")
+                    else:
+                        print(f"❌ {name}: missing inputs {', '.join(missing_inputs(stage))}")
+                        finish(name, "failed")
+                elif dry_run:
+                    print(f"🔁 {name}: would run")
+                    finish(name, "would run")
+                else:
+                    print(f"▶️  {name}: running {stage.script.name}")
+                    running[pool.submit(_run_script, stage)] = (name, input_hash(stage))
+            if not running:
+                if pending and not ready():
+                    raise ValueError(f"❌ Dependency cycle between stages: {', '.join(sorted(pending))}")
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, inputs = running.pop(future)
+                returncode, elapsed, log_path = future.result()
+                if returncode != 0:
+                    print(f"❌ {name}: exit code {returncode} after {elapsed:.1f}s (log: {log_path})")
+                    finish(name, "failed")
+                    continue
+                stage = by_name[name]
+                state[name] = {"inputs": inputs, "outputs": output_hash(stage)}
+                save_state(state, state_path)
+                print(f"✅ {name}: done in {elapsed:.1f}s")
+                finish(name, "ran")
+
+    return status
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Venice estimation pipeline, skipping up-to-date stages.")
+    parser.add_argument("targets", nargs="*", help="stages to bring up to date (default: all)")
+    parser.add_argument("--force", action="store_true", help="run every selected stage")
+    parser.add_argument("--jobs", type=int, default=MAX_WORKERS, help="stages run concurrently")
+    parser.add_argument("--dry-run", action="store_true", help="only print what would run")
+    parser.add_argument("--list", action="store_true", help="print the stage graph and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, deps in dependencies().items():
+            print(f"{name:<24} <- {', '.join(deps) or '-'}")
+        return
+
+    status = run_pipeline(args.targets, force=args.force, jobs=args.jobs, dry_run=args.dry_run)
+    if any(result in ("failed", "blocked") for result in status.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
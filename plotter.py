@@ -8,15 +8,7 @@ import matplotlib.colors as mcolors
 
 def plot_island_by_tract(dataset: Dataset, island_code: str, figsize=(12, 12)):
     # --- Find the island ---
-    island = None
-    for s in dataset.venice.sestieri:
-        for i in s.islands:
-            if i.code == island_code:
-                island = i
-                break
-        if island:
-            break
-
+    island = dataset.island(island_code)
     if not island:
         raise ValueError(f"Island code '{island_code}' not found.")
 
@@ -79,15 +71,7 @@ def plot_island_by_tract(dataset: Dataset, island_code: str, figsize=(12, 12)):
     
 def plot_island_bw(dataset: Dataset, island_code: str, figsize=(12, 12), show=True):
     # --- Find the island ---
-    island = None
-    for s in dataset.venice.sestieri:
-        for i in s.islands:
-            if i.code == island_code:
-                island = i
-                break
-        if island:
-            break
-
+    island = dataset.island(island_code)
     if not island:
         raise ValueError(f"Island code '{island_code}' not found.")
 
@@ -143,18 +127,16 @@ def plot_island_bw(dataset: Dataset, island_code: str, figsize=(12, 12), show=Tr
 def plot_island_with_snake(dataset: Dataset, island_code: str, alias_field="short_alias"):
     # === Extract buildings for this island ===
     rows = []
-    for s in dataset.venice.sestieri:
-        for island in s.islands:
-            if island.code == island_code:
-                for tract in island.tracts:
-                    for b in tract.buildings:
-                        if b.geometry is not None and getattr(b, alias_field, None):
-                            rows.append({
-                                "short_alias": b.short_alias,
-                                "full_alias": b.full_alias,
-                                "geometry": b.geometry,
-                                "centroid": b.centroid
-                            })
+    island = dataset.island(island_code)
+    for tract in (island.tracts if island else []):
+        for b in tract.buildings:
+            if b.geometry is not None and getattr(b, alias_field, None):
+                rows.append({
+                    "short_alias": b.short_alias,
+                    "full_alias": b.full_alias,
+                    "geometry": b.geometry,
+                    "centroid": b.centroid
+                })
 
     if not rows:
         print(f"⚠️ No buildings found for island '{island_code}'")
@@ -190,15 +172,7 @@ def plot_island_with_snake(dataset: Dataset, island_code: str, alias_field="shor
 
 def plot_island_building_info(dataset: Dataset, island_code: str, figsize=(12, 12)):
     # --- Find the island ---
-    island = None
-    for s in dataset.venice.sestieri:
-        for i in s.islands:
-            if i.code == island_code:
-                island = i
-                break
-        if island:
-            break
-
+    island = dataset.island(island_code)
     if not island:
         raise ValueError(f"Island code '{island_code}' not found.")
 
@@ -265,18 +239,10 @@ def plot_island_by_tpcls(dataset: Dataset, island_code: str, figsize=(12, 12)):
         raise ValueError("File must have 'short_alias' and 'TP_CLS_ED' columns.")
 
     # Map short_alias → TP_CLS_ED
-    df = df[["short_alias", "TP_CLS_ED"]].drop_duplicates().set_index("short_alias")
+    tp_by_alias = dict(df[["short_alias", "TP_CLS_ED"]].drop_duplicates("short_alias").itertuples(index=False))
 
     # --- Find the island ---
-    island = None
-    for s in dataset.venice.sestieri:
-        for i in s.islands:
-            if i.code == island_code:
-                island = i
-                break
-        if island:
-            break
-
+    island = dataset.island(island_code)
     if not island:
         raise ValueError(f"Island code '{island_code}' not found.")
 
@@ -291,7 +257,7 @@ def plot_island_by_tpcls(dataset: Dataset, island_code: str, figsize=(12, 12)):
                 continue
 
             alias = b.short_alias or ""
-            tp = df.loc[alias, "TP_CLS_ED"] if alias in df.index else "Unknown"
+            tp = tp_by_alias.get(alias, "Unknown")
 
             rows.append({
                 "geometry": geom,
@@ -346,7 +312,7 @@ def plot_island_by_tpcls_filtered(dataset: Dataset, island_code: str, figsize=(1
     if "short_alias" not in df.columns or "TP_CLS_ED" not in df.columns:
         raise ValueError("File must have 'short_alias' and 'TP_CLS_ED' columns.")
 
-    df = df[["short_alias", "TP_CLS_ED"]].drop_duplicates().set_index("short_alias")
+    tp_by_alias = dict(df[["short_alias", "TP_CLS_ED"]].drop_duplicates("short_alias").itertuples(index=False))
 
     colored_codes = ["Ne", "Or", "B1", "Nd", "Nr", "Knt"]
 
@@ -356,15 +322,7 @@ def plot_island_by_tpcls_filtered(dataset: Dataset, island_code: str, figsize=(1
     WHITE = (1, 1, 1, 1)
 
     # --- Find the island ---
-    island = None
-    for s in dataset.venice.sestieri:
-        for i in s.islands:
-            if i.code == island_code:
-                island = i
-                break
-        if island:
-            break
-
+    island = dataset.island(island_code)
     if not island:
         raise ValueError(f"Island code '{island_code}' not found.")
 
@@ -377,7 +335,7 @@ def plot_island_by_tpcls_filtered(dataset: Dataset, island_code: str, figsize=(1
                 continue
 
             alias = b.short_alias or ""
-            tp = df.loc[alias, "TP_CLS_ED"] if alias in df.index else "Unknown"
+            tp = tp_by_alias.get(alias, "Unknown")
 
             rows.append({
                 "geometry": geom,
@@ -438,12 +396,7 @@ def plot_island_by_tpcls_filtered(dataset: Dataset, island_code: str, figsize=(1
 
 def plot_sestiere_w_str(dataset: Dataset, sestiere_code: str, figsize=(14, 14)):
     # --- Find sestiere ---
-    sestiere = None
-    for s in dataset.venice.sestieri:
-        if s.code.upper() == sestiere_code.upper():
-            sestiere = s
-            break
-
+    sestiere = dataset.sestiere(sestiere_code)
     if not sestiere:
         raise ValueError(f"Sestiere '{sestiere_code}' not found.")
 
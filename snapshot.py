@@ -0,0 +1,358 @@
+import gc
+import hashlib
+import os
+import numpy as np
+import shapely
+from pathlib import Path
+from datatypes import Meter, Address, Building, BuildingTable, Tract, Island, Sestiere, Venice, LAZY, VALUE, materialize_geometry
+
+SNAPSHOT_VERSION = 1
+
+# Tagged columns: every optional attribute is stored as a kind code per row plus
+# one typed array per kind, so None / int / float / str / bool survive the round-trip.
+KIND_NONE, KIND_INT, KIND_FLOAT, KIND_STR, KIND_BOOL = range(5)
+
+BUILDING_FIELDS = [
+    name for name in Building.FIELDS
+    if name not in ("id", "island", "centroid", "geometry", "addresses", "raw_geometry")
+]
+TRACT_FIELDS = ["full_alias", "alias_segment", "pop21", "abi21", "fam21", "edi21"]
+AREA_FIELDS = ["full_alias", "alias_segment"]
+
+# ------------------------------------------------------------
+# CACHE KEY
+# ------------------------------------------------------------
+
+def hash_files(paths, extra: str = "") -> str:
+    """Return a short SHA-256 digest over the contents of the given files."""
+    digest = hashlib.sha256(f"v{SNAPSHOT_VERSION}|{extra}".encode("utf-8"))
+    for path in paths:
+        path = Path(path)
+        digest.update(path.name.encode("utf-8"))
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+# ------------------------------------------------------------
+# COLUMN ENCODING
+# ------------------------------------------------------------
+
+def _encode_column(arrays: dict, name: str, values: list):
+    kinds = np.zeros(len(values), dtype=np.uint8)
+    ints = np.zeros(len(values), dtype=np.int64)
+    floats = np.zeros(len(values), dtype=np.float64)
+    strs = [""] * len(values)
+
+    for i, v in enumerate(values):
+        if v is None:
+            continue
+        if isinstance(v, (bool, np.bool_)):
+            kinds[i] = KIND_BOOL
+            ints[i] = int(v)
+        elif isinstance(v, (int, np.integer)):
+            kinds[i] = KIND_INT
+            ints[i] = int(v)
+        elif isinstance(v, (float, np.floating)):
+            kinds[i] = KIND_FLOAT
+            floats[i] = float(v)
+        elif isinstance(v, str):
+            kinds[i] = KIND_STR
+            strs[i] = v
+        else:
+            raise TypeError(f"❌ Cannot snapshot {name}={v!r} ({type(v).__name__})")
+
+    arrays[f"{name}.kind"] = kinds
+    if (kinds == KIND_INT).any() or (kinds == KIND_BOOL).any():
+        arrays[f"{name}.int"] = ints
+    if (kinds == KIND_FLOAT).any():
+        arrays[f"{name}.float"] = floats
+    if (kinds == KIND_STR).any():
+        arrays[f"{name}.str"] = np.array(strs, dtype=str)
+
+def _decode_column(data, name: str) -> list:
+    kinds = data[f"{name}.kind"]
+    present = np.unique(kinds)
+    if len(present) == 1:
+        # Homogeneous column: convert the typed array in one go
+        kind = int(present[0])
+        if kind == KIND_INT:
+            return data[f"{name}.int"].tolist()
+        if kind == KIND_FLOAT:
+            return data[f"{name}.float"].tolist()
+        if kind == KIND_STR:
+            return data[f"{name}.str"].tolist()
+        if kind == KIND_BOOL:
+            return data[f"{name}.int"].astype(bool).tolist()
+        return [None] * len(kinds)
+
+    kinds = kinds.tolist()
+    ints = data[f"{name}.int"].tolist() if f"{name}.int" in data else None
+    floats = data[f"{name}.float"].tolist() if f"{name}.float" in data else None
+    strs = data[f"{name}.str"].tolist() if f"{name}.str" in data else None
+
+    values = [None] * len(kinds)
+    for i, kind in enumerate(kinds):
+        if kind == KIND_INT:
+            values[i] = ints[i]
+        elif kind == KIND_FLOAT:
+            values[i] = floats[i]
+        elif kind == KIND_STR:
+            values[i] = strs[i]
+        elif kind == KIND_BOOL:
+            values[i] = bool(ints[i])
+    return values
+
+def _encode_lists(arrays: dict, name: str, lists: list):
+    """Store a list of int lists as flat values plus CSR offsets."""
+    lengths = np.fromiter((len(x) for x in lists), dtype=np.int64, count=len(lists))
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    arrays[f"{name}.offsets"] = offsets
+    arrays[f"{name}.values"] = np.fromiter((int(v) for x in lists for v in x), dtype=np.int64, count=int(offsets[-1]))
+
+def _decode_lists(data, name: str) -> list:
+    offsets = data[f"{name}.offsets"].tolist()
+    values = data[f"{name}.values"].tolist()
+    return [values[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+def _offsets(counts: list) -> np.ndarray:
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+# ------------------------------------------------------------
+# SAVE / LOAD
+# ------------------------------------------------------------
+
+def save_snapshot(venice: Venice, path) -> Path:
+    """Write the hierarchy to a binary .npz snapshot (geometry as WKB, attributes as arrays)."""
+    sestieri, islands, tracts, buildings = [], [], [], []
+    island_parent, tract_parent, building_parent = [], [], []
+
+    for s_idx, s in enumerate(venice.sestieri):
+        sestieri.append(s)
+        for isl in s.islands:
+            island_parent.append(s_idx)
+            islands.append(isl)
+            for tr in isl.tracts:
+                tract_parent.append(len(islands) - 1)
+                tracts.append(tr)
+                for b in tr.buildings:
+                    building_parent.append(len(tracts) - 1)
+                    buildings.append(b)
+
+    addresses = [a for b in buildings for a in b.addresses]
+    meters = [m for a in addresses for m in a.meters]
+
+    arrays = {"version": np.array([SNAPSHOT_VERSION])}
+
+    # --- Sestieri / islands / tracts ---
+    arrays["sestiere.code"] = np.array([s.code for s in sestieri], dtype=str)
+    arrays["sestiere.name"] = np.array([s.name for s in sestieri], dtype=str)
+    arrays["island.code"] = np.array([i.code for i in islands], dtype=str)
+    arrays["island.name"] = np.array([i.name for i in islands], dtype=str)
+    arrays["island.parent"] = np.array(island_parent, dtype=np.int64)
+    arrays["tract.id"] = np.array([t.id for t in tracts], dtype=str)
+    arrays["tract.parent"] = np.array(tract_parent, dtype=np.int64)
+    for name in AREA_FIELDS:
+        _encode_column(arrays, f"sestiere.{name}", [getattr(s, name) for s in sestieri])
+        _encode_column(arrays, f"island.{name}", [getattr(i, name) for i in islands])
+    for name in TRACT_FIELDS:
+        _encode_column(arrays, f"tract.{name}", [getattr(t, name) for t in tracts])
+
+    # --- Buildings ---
+    arrays["building.parent"] = np.array(building_parent, dtype=np.int64)
+    _encode_column(arrays, "building.id", [b.id for b in buildings])
+    for name in BUILDING_FIELDS:
+        _encode_column(arrays, f"building.{name}", [getattr(b, name) for b in buildings])
+
+    materialize_geometry(buildings)
+    geoms = np.array([b.geometry for b in buildings], dtype=object)
+    wkbs = shapely.to_wkb(geoms)
+    arrays["building.wkb.offsets"] = _offsets([len(w) if w is not None else 0 for w in wkbs])
+    arrays["building.wkb.values"] = np.frombuffer(b"".join(w for w in wkbs if w is not None), dtype=np.uint8)
+    arrays["building.has_geometry"] = np.array([w is not None for w in wkbs], dtype=bool)
+
+    # --- Addresses ---
+    arrays["building.address_offsets"] = _offsets([len(b.addresses) for b in buildings])
+    arrays["address.address"] = np.array([a.address for a in addresses], dtype=str)
+    arrays["address.meter_offsets"] = _offsets([len(a.meters) for a in addresses])
+    _encode_lists(arrays, "address.hotels", [a.hotels for a in addresses])
+    _encode_lists(arrays, "address.hotels_extras", [a.hotels_extras for a in addresses])
+    _encode_lists(arrays, "address.strs", [a.strs for a in addresses])
+
+    # --- Meters ---
+    arrays["meter.id"] = np.array([m.id for m in meters], dtype=np.int64)
+    _encode_column(arrays, "meter.componenti", [m.componenti for m in meters])
+    _encode_column(arrays, "meter.consumo_2024", [m.consumo_2024 for m in meters])
+    _encode_column(arrays, "meter.rate", [m.rate for m in meters])
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+def load_snapshot(path, lazy_geometry: bool = False) -> Venice:
+    """
+    Rebuild the hierarchy from a snapshot written by save_snapshot().
+    With lazy_geometry, buildings keep their WKB and decode it on first access.
+    """
+    # Object construction only allocates; pausing the cyclic GC avoids repeated full collections
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _load_snapshot(path, lazy_geometry)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+def _load_snapshot(path, lazy_geometry: bool) -> Venice:
+    with np.load(path, allow_pickle=False) as npz:
+        data = {key: npz[key] for key in npz.files}
+
+    if int(data["version"][0]) != SNAPSHOT_VERSION:
+        raise ValueError(f"❌ Snapshot version {int(data['version'][0])} != {SNAPSHOT_VERSION}: {path}")
+
+    # --- Meters ---
+    meter_values = zip(
+        data["meter.id"].tolist(),
+        _decode_column(data, "meter.componenti"),
+        _decode_column(data, "meter.consumo_2024"),
+        _decode_column(data, "meter.rate"),
+    )
+    meters = [Meter(id=m_id, componenti=comp, consumo_2024=consumo, rate=rate) for m_id, comp, consumo, rate in meter_values]
+
+    # --- Addresses ---
+    meter_offsets = data["address.meter_offsets"].tolist()
+    address_values = zip(
+        data["address.address"].tolist(),
+        _decode_lists(data, "address.hotels"),
+        _decode_lists(data, "address.hotels_extras"),
+        _decode_lists(data, "address.strs"),
+    )
+    addresses = [
+        Address(address=code, meters=meters[meter_offsets[i]:meter_offsets[i + 1]], hotels=hotels, hotels_extras=extras, strs=strs)
+        for i, (code, hotels, extras, strs) in enumerate(address_values)
+    ]
+
+    # --- Geometry ---
+    wkb_offsets = data["building.wkb.offsets"].tolist()
+    wkb_bytes = data["building.wkb.values"].tobytes()
+    has_geometry = data["building.has_geometry"].tolist()
+    wkbs = np.array(
+        [wkb_bytes[wkb_offsets[i]:wkb_offsets[i + 1]] if has else None for i, has in enumerate(has_geometry)],
+        dtype=object,
+    )
+    if lazy_geometry:
+        geoms = centroids = np.full(len(wkbs), LAZY, dtype=object)
+    else:
+        geoms = shapely.from_wkb(wkbs)
+        centroids = np.where(shapely.is_empty(geoms) | shapely.is_missing(geoms), None, shapely.centroid(geoms))
+
+    # --- Sestieri / islands / tracts ---
+    sestieri = [
+        Sestiere(code=code, name=name, full_alias=fa, alias_segment=seg)
+        for code, name, fa, seg in zip(
+            data["sestiere.code"].tolist(),
+            data["sestiere.name"].tolist(),
+            _decode_column(data, "sestiere.full_alias"),
+            _decode_column(data, "sestiere.alias_segment"),
+        )
+    ]
+    islands = []
+    for code, name, parent, fa, seg in zip(
+        data["island.code"].tolist(),
+        data["island.name"].tolist(),
+        data["island.parent"].tolist(),
+        _decode_column(data, "island.full_alias"),
+        _decode_column(data, "island.alias_segment"),
+    ):
+        island = Island(code=code, name=name, full_alias=fa, alias_segment=seg)
+        sestieri[parent].islands.append(island)
+        islands.append(island)
+
+    tract_columns = {name: _decode_column(data, f"tract.{name}") for name in TRACT_FIELDS}
+    tract_parents = data["tract.parent"].tolist()
+    tracts = []
+    for i, (t_id, parent) in enumerate(zip(data["tract.id"].tolist(), tract_parents)):
+        tract = Tract(id=t_id, **{name: values[i] for name, values in tract_columns.items()})
+        islands[parent].tracts.append(tract)
+        tracts.append(tract)
+
+    # --- Buildings: filled column by column straight into the table ---
+    parents = data["building.parent"].tolist()
+    table = BuildingTable(capacity=len(parents))
+    buildings = table.extend(len(parents))
+    table.set_column("id", _decode_column(data, "building.id"))
+    table.set_column("island", [islands[tract_parents[parent]].code for parent in parents])
+    table.set_column("geometry", geoms)
+    table.set_column("centroid", centroids)
+    if lazy_geometry:
+        table.set_column("raw_geometry", wkbs)
+    for name in BUILDING_FIELDS:
+        if data[f"building.{name}.kind"].any():
+            table.set_column(name, _decode_column(data, f"building.{name}"))
+
+    address_offsets = data["building.address_offsets"].tolist()
+    for i, (building, parent) in enumerate(zip(buildings, parents)):
+        building.addresses = addresses[address_offsets[i]:address_offsets[i + 1]]
+        tracts[parent].buildings.append(building)
+
+    return Venice(sestieri=sestieri, table=table)
+
+# ------------------------------------------------------------
+# TABLE COLUMNS
+# ------------------------------------------------------------
+
+def save_columns(table: BuildingTable, names, path, arrays: dict = None) -> Path:
+    """
+    Write the named columns of a BuildingTable to an .npz file: each as tagged values plus its
+    per-row UNSET/NONE/VALUE state, so load_columns() gives back rows that read the same.
+    arrays holds extra plain NumPy arrays stored alongside (e.g. keys or fingerprints).
+    """
+    out = {"version": np.array([SNAPSHOT_VERSION]), "columns": np.array(list(names), dtype=str)}
+    for name in names:
+        column = table.columns[name]
+        state = column.state[:table.size]
+        held = state == VALUE
+        values = [None] * table.size
+        for row, value in zip(np.flatnonzero(held).tolist(), column.data[:table.size][held].tolist()):
+            values[row] = value
+        _encode_column(out, f"column.{name}", values)
+        out[f"column.{name}.state"] = state
+    for name, values in (arrays or {}).items():
+        out[f"array.{name}"] = np.asarray(values)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **out)
+    os.replace(tmp_path, path)
+    return path
+
+def load_columns(path):
+    """Read a file written by save_columns(): (BuildingTable with those columns, extra arrays)."""
+    with np.load(path, allow_pickle=False) as npz:
+        data = {key: npz[key] for key in npz.files}
+
+    if int(data["version"][0]) != SNAPSHOT_VERSION:
+        raise ValueError(f"❌ Snapshot version {int(data['version'][0])} != {SNAPSHOT_VERSION}: {path}")
+
+    names = data["columns"].tolist()
+    size = len(data[f"column.{names[0]}.state"]) if names else 0
+    table = BuildingTable(capacity=size)
+    table._append(size)
+    for name in names:
+        state = data[f"column.{name}.state"]
+        held = np.flatnonzero(state == VALUE)
+        values = _decode_column(data, f"column.{name}")
+        table.set_column(name, [values[row] for row in held.tolist()], held)
+        table.columns[name].state[:size] = state
+
+    arrays = {key[len("array."):]: value for key, value in data.items() if key.startswith("array.")}
+    return table, arrays
@@ -1,5 +1,5 @@
-import json
 from pathlib import Path
+from file_utils import iter_geojson_features, GeoJSONFeatureWriter
 
 # Input and output paths
 INPUT_GEOJSON = "estimates/VPC_Estimates_V4.geojson"
@@ -14,41 +14,31 @@ FIELDS = {
     "empty_pct": OUTPUT_EMPTY,
 }
 
-def load_geojson(path):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def save_geojson(path, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False)
-
-def filter_features(features, field):
+def keep_feature(feat, field):
     """
     Keep features where 0 < field <= 1
     """
-    filtered = []
-    for feat in features:
-        val = feat.get("properties", {}).get(field)
-        if isinstance(val, (int, float)) and 0 < val <= 1:
-            filtered.append(feat)
-    return filtered
+    val = feat.get("properties", {}).get(field)
+    return isinstance(val, (int, float)) and 0 < val <= 1
 
 def main():
     if not Path(INPUT_GEOJSON).exists():
         print(f"❌ Input not found: {INPUT_GEOJSON}")
         return
 
-    data = load_geojson(INPUT_GEOJSON)
-    features = data.get("features", [])
+    # Single streaming pass: each feature is routed to every output it qualifies for
+    writers = {field: GeoJSONFeatureWriter(out_path, ensure_ascii=False) for field, out_path in FIELDS.items()}
+    try:
+        for feat in iter_geojson_features(INPUT_GEOJSON):
+            for field, writer in writers.items():
+                if keep_feature(feat, field):
+                    writer.write(feat)
+    finally:
+        for writer in writers.values():
+            writer.close()
 
     for field, out_path in FIELDS.items():
-        filtered = filter_features(features, field)
-        out_data = {
-            "type": "FeatureCollection",
-            "features": filtered,
-        }
-        save_geojson(out_path, out_data)
-        print(f"✅ {field}: {len(filtered)} features → {out_path}")
+        print(f"✅ {field}: {writers[field].count} features → {out_path}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,88 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import contextlib
+import io
+import json
+import tempfile
+import pandas as pd
+import dataset
+from dataset import Dataset
+from constants import (
+    FILTERED_CSV, FILTERED_ADDRESS_CSV, FILTERED_WATER_CSV,
+    FILTERED_HOTEL_CSV, FILTERED_HOTELS_EXTRA_CSV, FILTERED_STR_CSV,
+)
+
+# Two features share TARGET_FID_12_13 = 7, in different tracts; the address belongs to id 7
+FEATURES = [
+    (7, "ISLA", "CN", 270420000100),
+    (8, "ISLA", "CN", 270420000100),
+    (7, "ISLA", "CN", 270420000200),
+]
+
+def _square(x):
+    return {"type": "Polygon", "coordinates": [[[x, 0], [x + 1, 0], [x + 1, 1], [x, 1], [x, 0]]]}
+
+def _write_inputs(root: Path) -> dict:
+    features = [
+        {
+            "type": "Feature",
+            "properties": {"TARGET_FID_12_13": b_id, "Codice": island, "Codice_Ses": ses, "SEZ21": sez,
+                           "short_alias": f"{island}-{i:03d}", "full_alias": f"{ses}-{island}-A-{i:03d}"},
+            "geometry": _square(i * 2),
+        }
+        for i, (b_id, island, ses, sez) in enumerate(FEATURES, start=1)
+    ]
+    geojson = root / "buildings.geojson"
+    geojson.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+    paths = {name: root / path.name for name, path in {
+        "FILTERED_CSV": FILTERED_CSV,
+        "FILTERED_ADDRESS_CSV": FILTERED_ADDRESS_CSV,
+        "FILTERED_WATER_CSV": FILTERED_WATER_CSV,
+        "FILTERED_HOTEL_CSV": FILTERED_HOTEL_CSV,
+        "FILTERED_HOTELS_EXTRA_CSV": FILTERED_HOTELS_EXTRA_CSV,
+        "FILTERED_STR_CSV": FILTERED_STR_CSV,
+    }.items()}
+    pd.DataFrame({
+        "TARGET_FID_12_13": [7, 8], "Qu_Terra": 1.0, "Qu_Gronda": 10.0, "SEZ21": 270420000100, "TP_CLS_ED": "A",
+        "Superficie": 100.0, "TipoFun": "0", "SpecFun": "0", "Dest_Pt_An": "H", "Codice": "ISLA",
+        "POP21": 5, "ABI21": 3, "FAM21": 2, "EDI21": 2,
+    }).to_csv(paths["FILTERED_CSV"], index=False)
+    pd.DataFrame({"TARGET_FID_12_13": [7.0], "Full_sesti": ["CN1"], "Codice_1": ["ISLA"]}).to_csv(paths["FILTERED_ADDRESS_CSV"], index=False)
+    pd.DataFrame({
+        "FID": [1], "Cat_Tariffa": ["Uso domestico residente"], "Condominio": [None], "Componenti": [2.0],
+        "Nuclei_domestici": [1.0], "Nuclei_commerciali": [None], "Nuclei_non_residenti": [None],
+        "Consumo_medio_2024": [5.0], "ProcessedAddress": ["CN1"],
+    }).to_csv(paths["FILTERED_WATER_CSV"], index=False)
+    for name in ("FILTERED_HOTEL_CSV", "FILTERED_HOTELS_EXTRA_CSV", "FILTERED_STR_CSV"):
+        pd.DataFrame({"FID": [], "ADDRESS": []}).to_csv(paths[name], index=False)
+    return geojson, paths
+
+def test_duplicate_building_ids():
+    with tempfile.TemporaryDirectory() as tmp:
+        geojson, paths = _write_inputs(Path(tmp))
+        saved = {name: getattr(dataset, name) for name in paths}
+        for name, path in paths.items():
+            setattr(dataset, name, path)
+        try:
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                ds = Dataset(str(geojson))
+        finally:
+            for name, path in saved.items():
+                setattr(dataset, name, path)
+
+    duplicates = [b for b in ds.buildings if b.id == 7]
+    assert len(duplicates) == 2
+    # The last building with the id (in hierarchy order) is both the lookup result and the one with the addresses
+    assert ds.building(7) is duplicates[-1]
+    assert [a.address for a in ds.building(7).addresses] == ["CN1"]
+    assert [m.id for m in ds.building(7).addresses[0].meters] == [1]
+    assert duplicates[0].addresses == []
+    assert "1 buildings share an id" in out.getvalue()
+    print("✅ Duplicate building ids resolve to the building holding their addresses")
+
+if __name__ == "__main__":
+    test_duplicate_building_ids()
@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import json
+import tempfile
+from file_utils import iter_geojson_features
+
+CHUNK_SIZES = [1, 2, 3, 7, 64]
+
+# Numbers split after ".", "e", "e-" or "e+" at small chunk sizes, as members and bare array elements
+DOCUMENTS = [
+    '{ "features" : [ 12345678901234567890 , 1.25 ] }',
+    '{"type": "FeatureCollection", "scale": 1.5e-3, "count": 2E+10, "features": [-0.75, 3e2, 10]}',
+    json.dumps({
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "properties": {"TARGET_FID_12_13": i, "Qu_Gronda": 12.345 * i, "name": f"b{i}", "flag": i % 2 == 0},
+                "geometry": {"type": "Polygon", "coordinates": [[[12.33 + i, 45.43], [12.34, 45.44e0], [12.33 + i, 45.43]]]},
+            }
+            for i in range(5)
+        ],
+        "total": 5.0,
+    }),
+]
+
+def test_stream_matches_json_load():
+    with tempfile.TemporaryDirectory() as tmp:
+        for n, doc in enumerate(DOCUMENTS):
+            path = Path(tmp) / f"doc{n}.geojson"
+            path.write_text(doc, encoding="utf-8")
+            expected = json.loads(doc)["features"]
+            for chunk_size in CHUNK_SIZES:
+                features = list(iter_geojson_features(str(path), chunk_size=chunk_size))
+                assert features == expected, f"document {n}, chunk_size {chunk_size}: {features!r}"
+    print(f"✅ Streamed features match json.load for chunk sizes {CHUNK_SIZES}")
+
+if __name__ == "__main__":
+    test_stream_matches_json_load()